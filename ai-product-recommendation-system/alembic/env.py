@@ -0,0 +1,64 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, make_url
+
+from app.core.config import get_settings
+from app.core.database import Base
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+config = context.config
+target_metadata = Base.metadata
+
+# The API passes its own connection in; only the CLI configures logging
+connection = config.attributes.get("connection")
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Leave the full-text objects from 0003_product_search out of autogenerate."""
+    if type_ == "table" and name.startswith("products_fts"):
+        return False
+    if name in ("search_vector", "ix_products_search_vector"):
+        return False
+    return True
+
+
+def _configure(dialect: str, **kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can't ALTER most things in place; batch mode copies the table
+        render_as_batch=dialect == "sqlite",
+        **kwargs,
+    )
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout (``alembic upgrade head --sql``)."""
+    url = make_url(get_settings().database_url)
+    _configure(url.get_backend_name(), url=url, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    if connection is not None:
+        _configure(connection.dialect.name, connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(get_settings().database_url)
+    with engine.connect() as conn:
+        _configure(conn.dialect.name, connection=conn)
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
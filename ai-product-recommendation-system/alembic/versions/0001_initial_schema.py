@@ -0,0 +1,79 @@
+"""Initial schema: products, users and user_interactions.
+
+Matches what ``Base.metadata.create_all`` produced before migrations were
+introduced, so existing databases are stamped at this revision.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("category", sa.String(100), nullable=False),
+        sa.Column("subcategory", sa.String(100)),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("manufacturer", sa.String(255)),
+        sa.Column("description", sa.Text()),
+        sa.Column("quantity_in_stock", sa.Integer(), nullable=False),
+        sa.Column("is_featured", sa.Boolean(), nullable=False),
+        sa.Column("is_on_sale", sa.Boolean(), nullable=False),
+        sa.Column("sale_price", sa.Float()),
+        sa.Column("weight", sa.Float()),
+        sa.Column("dimensions", sa.String(100)),
+        sa.Column("release_date", sa.DateTime()),
+        sa.Column("rating", sa.Float()),
+        sa.Column("image_url", sa.String(500)),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("full_name", sa.String(255)),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("phone", sa.String(50)),
+        sa.Column("address", sa.String(500)),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_superuser", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "user_interactions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("interaction_type", sa.String(20), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("rating_value", sa.Float()),
+        sa.Column("quantity", sa.Integer()),
+        sa.Column("session_id", sa.String(100)),
+        sa.Column("interaction_metadata", sa.JSON()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_interactions")
+    op.drop_index("ix_users_username", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
+    op.drop_table("products")
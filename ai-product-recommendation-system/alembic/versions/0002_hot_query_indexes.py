@@ -0,0 +1,49 @@
+"""Composite indexes for the hot product and interaction queries.
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_hot_query_indexes"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_products_category_subcategory", "products", ["category", "subcategory"])
+    op.create_index("ix_products_featured_rating", "products", ["is_featured", "rating"])
+    op.create_index("ix_products_on_sale_rating", "products", ["is_on_sale", "rating"])
+    op.create_index("ix_products_price", "products", ["price"])
+    op.create_index("ix_products_created_at_id", "products", ["created_at", "id"])
+
+    op.create_index(
+        "ix_user_interactions_user_timestamp",
+        "user_interactions",
+        ["user_id", sa.text("timestamp DESC"), "id"],
+    )
+    op.create_index(
+        "ix_user_interactions_user_type_timestamp",
+        "user_interactions",
+        ["user_id", "interaction_type", "timestamp"],
+    )
+    op.create_index(
+        "ix_user_interactions_product_type_timestamp",
+        "user_interactions",
+        ["product_id", "interaction_type", "timestamp"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_interactions_product_type_timestamp", table_name="user_interactions")
+    op.drop_index("ix_user_interactions_user_type_timestamp", table_name="user_interactions")
+    op.drop_index("ix_user_interactions_user_timestamp", table_name="user_interactions")
+    op.drop_index("ix_products_created_at_id", table_name="products")
+    op.drop_index("ix_products_price", table_name="products")
+    op.drop_index("ix_products_on_sale_rating", table_name="products")
+    op.drop_index("ix_products_featured_rating", table_name="products")
+    op.drop_index("ix_products_category_subcategory", table_name="products")
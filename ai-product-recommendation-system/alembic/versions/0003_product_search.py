@@ -0,0 +1,66 @@
+"""Full-text search index over products (SQLite FTS5 / PostgreSQL tsvector).
+
+Revision ID: 0003_product_search
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0003_product_search"
+down_revision = "0002_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+# DDL as of this revision; app.services.product_search queries these objects
+SQLITE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, description, manufacturer, category, subcategory, "
+    "content='products', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, description, manufacturer, category, subcategory) "
+    "VALUES (new.id, new.name, new.description, new.manufacturer, new.category, new.subcategory); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description, manufacturer, category, subcategory) "
+    "VALUES ('delete', old.id, old.name, old.description, old.manufacturer, old.category, old.subcategory); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description, manufacturer, category, subcategory) "
+    "VALUES ('delete', old.id, old.name, old.description, old.manufacturer, old.category, old.subcategory); "
+    "INSERT INTO products_fts(rowid, name, description, manufacturer, category, subcategory) "
+    "VALUES (new.id, new.name, new.description, new.manufacturer, new.category, new.subcategory); END",
+    # Index rows that existed before the FTS table was created
+    "INSERT INTO products_fts(products_fts) VALUES ('rebuild')",
+]
+
+POSTGRESQL_STATEMENTS = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(manufacturer, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(subcategory, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector)",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == "sqlite":
+        statements = SQLITE_STATEMENTS
+    elif dialect == "postgresql":
+        statements = POSTGRESQL_STATEMENTS
+    else:
+        statements = []  # other databases use the ILIKE fallback
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for trigger in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS products_fts_{trigger}")
+        op.execute("DROP TABLE IF EXISTS products_fts")
+    elif bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_products_search_vector")
+        op.execute("ALTER TABLE products DROP COLUMN IF EXISTS search_vector")
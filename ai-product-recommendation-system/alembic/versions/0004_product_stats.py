@@ -0,0 +1,35 @@
+"""Materialized product stats row.
+
+Revision ID: 0004_product_stats
+Revises: 0003_product_search
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_product_stats"
+down_revision = "0003_product_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("total_products", sa.Integer(), nullable=False),
+        sa.Column("featured_count", sa.Integer(), nullable=False),
+        sa.Column("on_sale_count", sa.Integer(), nullable=False),
+        sa.Column("in_stock_count", sa.Integer(), nullable=False),
+        sa.Column("price_sum", sa.Float(), nullable=False),
+        sa.Column("rating_sum", sa.Float(), nullable=False),
+        sa.Column("rating_count", sa.Integer(), nullable=False),
+        sa.Column("min_price", sa.Float()),
+        sa.Column("max_price", sa.Float()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("product_stats")
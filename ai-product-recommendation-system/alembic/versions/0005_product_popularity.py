@@ -0,0 +1,58 @@
+"""Denormalized product popularity score.
+
+Revision ID: 0005_product_popularity
+Revises: 0004_product_stats
+Create Date: 2026-10-17
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "0005_product_popularity"
+down_revision = "0004_product_stats"
+branch_labels = None
+depends_on = None
+
+# Scoring as of this revision (app.services.product_popularity): weight per
+# type, doubled every half-life after EPOCH. If popularity_half_life_days is
+# configured differently, run app.scripts.rebuild_popularity after upgrading.
+EPOCH = datetime(2024, 1, 1)
+HALF_LIFE_SECONDS = 7.0 * 86400
+WEIGHTS = {"view": 1.0, "like": 3.0, "rating": 3.0, "add_to_cart": 5.0, "purchase": 10.0}
+
+products = sa.table("products", sa.column("id", sa.Integer), sa.column("popularity", sa.Float))
+interactions = sa.table(
+    "user_interactions",
+    sa.column("product_id", sa.Integer),
+    sa.column("interaction_type", sa.String),
+    sa.column("timestamp", sa.DateTime),
+)
+
+
+def backfill(conn) -> None:
+    scores = defaultdict(float)
+    rows = conn.execute(sa.select(interactions.c.product_id, interactions.c.interaction_type, interactions.c.timestamp))
+    for product_id, interaction_type, timestamp in rows:
+        half_lives = (timestamp - EPOCH).total_seconds() / HALF_LIFE_SECONDS
+        scores[product_id] += WEIGHTS.get(interaction_type, 0.0) * 2.0 ** half_lives
+    if scores:
+        conn.execute(
+            products.update().where(products.c.id == sa.bindparam("product_id")).values(popularity=sa.bindparam("score")),
+            [{"product_id": product_id, "score": score} for product_id, score in scores.items()],
+        )
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("popularity", sa.Float(), nullable=False, server_default="0"))
+    op.create_index("ix_products_popularity_id", "products", ["popularity", "id"])
+    # Offline scripts leave every score at 0 until app.scripts.rebuild_popularity runs
+    if not context.is_offline_mode():
+        backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_popularity_id", table_name="products")
+    op.drop_column("products", "popularity")
@@ -0,0 +1,24 @@
+"""Idempotency key for batched interaction ingestion.
+
+Revision ID: 0006_interaction_event_id
+Revises: 0005_product_popularity
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_interaction_event_id"
+down_revision = "0005_product_popularity"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("user_interactions", sa.Column("event_id", sa.String(length=36)))
+    op.create_index("ix_user_interactions_event_id", "user_interactions", ["event_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_interactions_event_id", table_name="user_interactions")
+    op.drop_column("user_interactions", "event_id")
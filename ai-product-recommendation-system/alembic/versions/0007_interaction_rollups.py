@@ -0,0 +1,96 @@
+"""Daily interaction rollups for analytics.
+
+Revision ID: 0007_interaction_rollups
+Revises: 0006_interaction_event_id
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_interaction_rollups"
+down_revision = "0006_interaction_event_id"
+branch_labels = None
+depends_on = None
+
+interactions = sa.table(
+    "user_interactions",
+    sa.column("user_id", sa.Integer),
+    sa.column("product_id", sa.Integer),
+    sa.column("interaction_type", sa.String),
+    sa.column("timestamp", sa.DateTime),
+    sa.column("rating_value", sa.Float),
+)
+products = sa.table("products", sa.column("id", sa.Integer), sa.column("category", sa.String))
+
+
+def backfill() -> None:
+    """Fill the rollups from raw interactions with one INSERT ... SELECT per table."""
+    if op.get_context().dialect.name == "sqlite":
+        day = sa.func.date(interactions.c.timestamp)
+    else:
+        day = sa.cast(interactions.c.timestamp, sa.Date)
+    day = day.label("day")
+    count = sa.func.count().label("count")
+    totals = [
+        interactions.c.interaction_type,
+        day,
+        count,
+        sa.func.coalesce(sa.func.sum(interactions.c.rating_value), 0.0).label("rating_sum"),
+        sa.func.count(interactions.c.rating_value).label("rating_count"),
+    ]
+    columns = ["interaction_type", "day", "count", "rating_sum", "rating_count"]
+    for key, name in (("user_id", "user_daily_interactions"), ("product_id", "product_daily_interactions")):
+        target = [key, *columns]
+        select = sa.select(interactions.c[key], *totals).group_by(
+            interactions.c[key], interactions.c.interaction_type, day
+        )
+        op.execute(sa.table(name, *(sa.column(column) for column in target)).insert().from_select(target, select))
+
+    select = (
+        sa.select(interactions.c.user_id, products.c.category, interactions.c.interaction_type, day, count)
+        .join_from(interactions, products, products.c.id == interactions.c.product_id)
+        .where(products.c.category.isnot(None))
+        .group_by(interactions.c.user_id, products.c.category, interactions.c.interaction_type, day)
+    )
+    target = ["user_id", "category", "interaction_type", "day", "count"]
+    op.execute(
+        sa.table("user_category_daily_interactions", *(sa.column(column) for column in target))
+        .insert().from_select(target, select)
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_daily_interactions",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("interaction_type", sa.String(20), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("rating_sum", sa.Float(), nullable=False),
+        sa.Column("rating_count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "product_daily_interactions",
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("interaction_type", sa.String(20), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("rating_sum", sa.Float(), nullable=False),
+        sa.Column("rating_count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "user_category_daily_interactions",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("category", sa.String(100), primary_key=True),
+        sa.Column("interaction_type", sa.String(20), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+    backfill()
+
+
+def downgrade() -> None:
+    op.drop_table("user_category_daily_interactions")
+    op.drop_table("product_daily_interactions")
+    op.drop_table("user_daily_interactions")
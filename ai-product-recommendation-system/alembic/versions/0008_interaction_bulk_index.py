@@ -0,0 +1,26 @@
+"""Index for the per-product bulk interaction lookup.
+
+Revision ID: 0008_interaction_bulk_index
+Revises: 0007_interaction_rollups
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_interaction_bulk_index"
+down_revision = "0007_interaction_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_user_interactions_user_product_timestamp",
+        "user_interactions",
+        ["user_id", "product_id", sa.text("timestamp DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_interactions_user_product_timestamp", table_name="user_interactions")
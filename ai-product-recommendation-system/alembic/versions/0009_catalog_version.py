@@ -0,0 +1,68 @@
+"""Catalog version on the product_stats row.
+
+Revision ID: 0009_catalog_version
+Revises: 0008_interaction_bulk_index
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_catalog_version"
+down_revision = "0008_interaction_bulk_index"
+branch_labels = None
+depends_on = None
+
+STATS_ROW_ID = 1
+
+products = sa.table(
+    "products",
+    sa.column("id", sa.Integer),
+    sa.column("price", sa.Float),
+    sa.column("rating", sa.Float),
+    sa.column("is_featured", sa.Boolean),
+    sa.column("is_on_sale", sa.Boolean),
+    sa.column("quantity_in_stock", sa.Integer),
+)
+COLUMNS = [
+    "id", "total_products", "featured_count", "on_sale_count", "in_stock_count",
+    "price_sum", "rating_sum", "rating_count", "min_price", "max_price", "updated_at", "version",
+]
+product_stats = sa.table("product_stats", *(sa.column(column) for column in COLUMNS))
+
+
+def _count_if(condition):
+    return sa.func.coalesce(sa.func.sum(sa.case((condition, 1), else_=0)), 0)
+
+
+def backfill() -> None:
+    """Materialize the row if it doesn't exist yet, so every product write bumps its version."""
+    aggregates = sa.select(
+        sa.literal(STATS_ROW_ID),
+        sa.func.count(products.c.id),
+        _count_if(products.c.is_featured == sa.true()),
+        _count_if(products.c.is_on_sale == sa.true()),
+        _count_if(products.c.quantity_in_stock > 0),
+        sa.func.coalesce(sa.func.sum(products.c.price), 0.0),
+        sa.func.coalesce(sa.func.sum(products.c.rating), 0.0),
+        sa.func.count(products.c.rating),
+        sa.func.min(products.c.price),
+        sa.func.max(products.c.price),
+        sa.func.current_timestamp(),
+        sa.literal(1),
+    ).subquery()
+    # An aggregate always yields a row, so the existence check filters the outer select
+    select = sa.select(aggregates).where(~sa.exists().where(product_stats.c.id == STATS_ROW_ID))
+    op.execute(product_stats.insert().from_select(COLUMNS, select))
+
+
+def upgrade() -> None:
+    op.add_column(
+        "product_stats",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+    backfill()
+
+
+def downgrade() -> None:
+    op.drop_column("product_stats", "version")
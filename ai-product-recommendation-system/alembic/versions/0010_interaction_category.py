@@ -0,0 +1,31 @@
+"""Product category at event time on each interaction.
+
+Revision ID: 0010_interaction_category
+Revises: 0009_catalog_version
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_interaction_category"
+down_revision = "0009_catalog_version"
+branch_labels = None
+depends_on = None
+
+interactions = sa.table("user_interactions", sa.column("product_id", sa.Integer), sa.column("category", sa.String))
+products = sa.table("products", sa.column("id", sa.Integer), sa.column("category", sa.String))
+
+
+def upgrade() -> None:
+    op.add_column("user_interactions", sa.Column("category", sa.String(length=100)))
+    # Earlier events only have the product's current category to go by
+    op.execute(interactions.update().values(
+        category=sa.select(products.c.category)
+        .where(products.c.id == interactions.c.product_id)
+        .scalar_subquery()
+    ))
+
+
+def downgrade() -> None:
+    op.drop_column("user_interactions", "category")
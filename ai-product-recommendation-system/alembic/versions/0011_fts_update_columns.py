@@ -0,0 +1,39 @@
+"""Reindex products_fts only when indexed columns change.
+
+Revision ID: 0011_fts_update_columns
+Revises: 0010_interaction_category
+Create Date: 2026-10-17
+
+The update trigger from 0003_product_search fired on any UPDATE of products,
+so every popularity increment rewrote the product's FTS5 row.
+"""
+from alembic import op
+
+
+revision = "0011_fts_update_columns"
+down_revision = "0010_interaction_category"
+branch_labels = None
+depends_on = None
+
+TRIGGER_BODY = (
+    "BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description, manufacturer, category, subcategory) "
+    "VALUES ('delete', old.id, old.name, old.description, old.manufacturer, old.category, old.subcategory); "
+    "INSERT INTO products_fts(rowid, name, description, manufacturer, category, subcategory) "
+    "VALUES (new.id, new.name, new.description, new.manufacturer, new.category, new.subcategory); END"
+)
+
+
+def _replace_trigger(event: str) -> None:
+    op.execute("DROP TRIGGER IF EXISTS products_fts_update")
+    op.execute(f"CREATE TRIGGER products_fts_update {event} ON products {TRIGGER_BODY}")
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == "sqlite":
+        _replace_trigger("AFTER UPDATE OF name, description, manufacturer, category, subcategory")
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == "sqlite":
+        _replace_trigger("AFTER UPDATE")
@@ -2,9 +2,11 @@ from datetime import timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..core.database import get_db
+from ..core.database import get_async_db, get_db
 from ..core.security import (
     create_access_token,
     get_password_hash,
@@ -63,6 +65,14 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     return user
 
 
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
@@ -71,21 +81,39 @@ def get_current_user(
     token = credentials.credentials
     username = verify_token(token)
     if username is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("Could not validate credentials")
     user = get_user_by_username(db, username)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("User not found")
     return user
 
 
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """``get_current_user`` for async routers, without a threadpool hop."""
+    username = verify_token(credentials.credentials)
+    if username is None:
+        raise _unauthorized("Could not validate credentials")
+    user = await db.scalar(select(User).where(User.username == username))
+    # Return the connection to the pool before the handler runs: write handlers
+    # use their own session, and two held connections per request can starve the pool
+    await db.commit()
+    if user is None:
+        raise _unauthorized("User not found")
+    return user
+
+
+async def get_current_superuser_async(current_user: User = Depends(get_current_user_async)) -> User:
+    """``get_current_user_async`` restricted to active superusers."""
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough privileges")
+    return current_user
+
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user."""
     if not current_user.is_active:
@@ -1,38 +1,103 @@
+import math
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, desc, select
 
-from ..core.database import get_db
-from ..api.auth import get_current_user
+from ..core.database import get_async_db, get_async_write_db
+from ..core.pagination import decode_cursor, encode_cursor, keyset_filter, keyset_order, sort_token
+from ..api.auth import get_current_user_async
 from ..models.user import User
 from ..models.user_interaction import UserInteraction
+from ..models.interaction_rollup import (
+    ProductDailyInteractions,
+    UserCategoryDailyInteractions,
+    UserDailyInteractions
+)
 from ..models.product import Product
+from ..services import product_popularity
+from ..services.interaction_counters import get_interaction_counters
+from ..services.interaction_rollups import apply_rollups
+from ..services.interaction_writer import get_interaction_writer
 from ..schemas.user_interaction import (
     UserInteractionCreate,
+    UserInteractionBatch,
+    UserInteractionBatchAccepted,
+    UserInteractionBulkQuery,
     UserInteractionResponse,
     UserInteractionHistory,
     UserInteractionAnalytics,
     ProductInteractionStats,
+    ProductInteractions,
     InteractionType
 )
 
 router = APIRouter()
 
 
+def rollup_totals(rows) -> tuple:
+    """Per-type counts and the average rating from summed daily rollup rows."""
+    counts = {kind.value: 0 for kind in InteractionType}
+    rating_sum, rating_count = 0.0, 0
+    for interaction_type, count, type_rating_sum, type_rating_count in rows:
+        counts[interaction_type] = count
+        if interaction_type == 'rating':
+            rating_sum, rating_count = type_rating_sum, type_rating_count
+    return counts, (rating_sum / rating_count if rating_count else None)
+
+
+async def record_derived(db: AsyncSession, interaction: UserInteraction, sign: int = 1) -> dict:
+    """Apply an interaction to its product's popularity and the daily rollups.
+
+    Both services are shared with the sync batch writer, so they run through
+    ``run_sync`` on this session's connection and transaction. Returns the
+    event to hand to the stats counters once the transaction commits.
+    """
+    event = {
+        "user_id": interaction.user_id,
+        "product_id": interaction.product_id,
+        "category": interaction.category,
+        "interaction_type": interaction.interaction_type,
+        "timestamp": interaction.timestamp,
+        "rating_value": interaction.rating_value,
+    }
+
+    def record(session: Session) -> None:
+        product_popularity.record_interaction(
+            session, event["product_id"], event["interaction_type"], event["timestamp"], sign=sign
+        )
+        apply_rollups(session.connection(), [event], sign=sign)
+
+    await db.run_sync(record)
+    return event
+
+
 @router.post("/interactions", response_model=UserInteractionResponse)
 async def create_interaction(
     interaction: UserInteractionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_write_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Log a user interaction with a product"""
+    """Log a user interaction with a product and return the stored row.
+
+    High-volume events (views) should use ``POST /interactions/batch``.
+    """
     # Validate that the product exists
-    product = db.query(Product).filter(Product.id == interaction.product_id).first()
-    if not product:
+    category = await db.scalar(select(Product.category).where(Product.id == interaction.product_id))
+    if category is None:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    # A retried event returns the row stored the first time
+    event_id = str(interaction.event_id or uuid.uuid4())
+    existing = await db.scalar(select(UserInteraction).where(UserInteraction.event_id == event_id))
+    if existing:
+        if existing.user_id != current_user.id:
+            raise HTTPException(status_code=409, detail="event_id is already in use")
+        return existing
+    
     # Create the interaction
     db_interaction = UserInteraction(
         user_id=current_user.id,
@@ -41,16 +106,63 @@ async def create_interaction(
         rating_value=interaction.rating_value,
         quantity=interaction.quantity,
         session_id=interaction.session_id,
-        interaction_metadata=interaction.interaction_metadata
+        interaction_metadata=interaction.interaction_metadata,
+        timestamp=datetime.utcnow(),
+        event_id=event_id,
+        category=category
     )
     
     db.add(db_interaction)
-    db.commit()
-    db.refresh(db_interaction)
+    event = await record_derived(db, db_interaction)
+    await db.commit()
+    get_interaction_counters().apply([event])
     
     return db_interaction
 
 
+@router.post(
+    "/interactions/batch",
+    response_model=UserInteractionBatchAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_interactions_batch(
+    batch: UserInteractionBatch,
+    current_user: User = Depends(get_current_user_async)
+):
+    """Queue up to 1000 interactions for a bulk write and return their event ids.
+
+    Events are written within ``interaction_flush_interval`` seconds. Events
+    for unknown products are dropped at write time; resending an
+    ``event_id`` that was already accepted does not record it twice. Answers
+    503 with ``Retry-After`` while the write queue is full.
+    """
+    now = datetime.utcnow()
+    event_ids = [event.event_id or uuid.uuid4() for event in batch.events]
+    rows = [
+        {
+            "user_id": current_user.id,
+            "product_id": event.product_id,
+            "interaction_type": event.interaction_type.value,
+            "timestamp": now,
+            "rating_value": event.rating_value,
+            "quantity": event.quantity,
+            "session_id": event.session_id,
+            "interaction_metadata": event.interaction_metadata,
+            "event_id": str(event_id),
+        }
+        for event, event_id in zip(batch.events, event_ids)
+    ]
+    
+    writer = get_interaction_writer()
+    if not writer.submit(rows):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Interaction queue is full, retry shortly",
+            headers={"Retry-After": str(math.ceil(writer.flush_interval))},
+        )
+    return UserInteractionBatchAccepted(accepted=len(rows), event_ids=event_ids)
+
+
 @router.get("/interactions/history", response_model=UserInteractionHistory)
 async def get_interaction_history(
     page: int = Query(1, ge=1),
@@ -58,106 +170,125 @@ async def get_interaction_history(
     interaction_type: Optional[InteractionType] = None,
     product_id: Optional[int] = None,
     days_back: Optional[int] = Query(None, ge=1, le=365),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor of the previous page"),
+    include_total: Optional[bool] = Query(
+        None, description="Count all matching interactions (costs a full scan); default: only without a cursor"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get user's interaction history with optional filtering"""
-    query = db.query(UserInteraction).filter(UserInteraction.user_id == current_user.id)
+    """Get user's interaction history with optional filtering.
+
+    Use ``cursor`` (keyset pagination on timestamp, id) instead of ``page``
+    for deep pages. The total is counted for offset pages unless
+    ``include_total=false``; cursor pages skip it unless ``include_total=true``.
+    """
+    query = select(UserInteraction).where(UserInteraction.user_id == current_user.id)
     
     # Apply filters
     if interaction_type:
-        query = query.filter(UserInteraction.interaction_type == interaction_type.value)
+        query = query.where(UserInteraction.interaction_type == interaction_type.value)
     
     if product_id:
-        query = query.filter(UserInteraction.product_id == product_id)
+        query = query.where(UserInteraction.product_id == product_id)
     
     if days_back:
         cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-        query = query.filter(UserInteraction.timestamp >= cutoff_date)
+        query = query.where(UserInteraction.timestamp >= cutoff_date)
     
     # Get total count
-    total_count = query.count()
+    # Cursor pages skip the count unless asked: the client has it from the first page
+    if include_total is None:
+        include_total = cursor is None
+    total_count = None
+    if include_total:
+        total_count = await db.scalar(select(func.count()).select_from(query.subquery()))
     
-    # Apply pagination and ordering
-    interactions = query.order_by(desc(UserInteraction.timestamp)).offset(
-        (page - 1) * per_page
-    ).limit(per_page).all()
+    # Apply pagination and ordering: keyset when a cursor is given, offset otherwise
+    query = query.order_by(*keyset_order(UserInteraction.timestamp, UserInteraction.id, descending=True))
+    token = sort_token("timestamp", "desc")
+    if cursor:
+        timestamp, last_id = decode_cursor(cursor, token)
+        query = query.where(
+            keyset_filter(UserInteraction.timestamp, UserInteraction.id, timestamp, last_id, descending=True)
+        )
+    else:
+        query = query.offset((page - 1) * per_page)
+    
+    interactions = list(await db.scalars(query.limit(per_page + 1)))
+    next_cursor = None
+    if len(interactions) > per_page:
+        interactions = interactions[:per_page]
+        last = interactions[-1]
+        next_cursor = encode_cursor(token, last.timestamp, last.id)
     
     return UserInteractionHistory(
         interactions=interactions,
         total_count=total_count,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/interactions/analytics", response_model=UserInteractionAnalytics)
 async def get_user_analytics(
     days_back: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get user interaction analytics"""
-    cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-    
-    # Base query for the time period
-    base_query = db.query(UserInteraction).filter(
-        UserInteraction.user_id == current_user.id,
-        UserInteraction.timestamp >= cutoff_date
-    )
-    
-    # Get interaction counts by type
-    interaction_counts = base_query.with_entities(
-        UserInteraction.interaction_type,
-        func.count(UserInteraction.id).label('count')
-    ).group_by(UserInteraction.interaction_type).all()
-    
-    # Initialize counts
-    counts = {
-        'view': 0,
-        'like': 0,
-        'add_to_cart': 0,
-        'purchase': 0,
-        'rating': 0
-    }
-    
-    for interaction_type, count in interaction_counts:
-        counts[interaction_type] = count
+    """Get user interaction analytics.
+
+    Counts, average rating and top categories come from the daily rollups,
+    so the window covers whole UTC days.
+    """
+    since = (datetime.utcnow() - timedelta(days=days_back)).date()
+    cutoff_date = datetime.combine(since, datetime.min.time())
     
-    # Get average rating
-    avg_rating = base_query.filter(
-        UserInteraction.interaction_type == 'rating'
-    ).with_entities(
-        func.avg(UserInteraction.rating_value).label('avg_rating')
-    ).scalar()
+    # Get interaction counts by type and the average rating
+    totals = await db.execute(select(
+        UserDailyInteractions.interaction_type,
+        func.sum(UserDailyInteractions.count),
+        func.sum(UserDailyInteractions.rating_sum),
+        func.sum(UserDailyInteractions.rating_count)
+    ).where(
+        UserDailyInteractions.user_id == current_user.id,
+        UserDailyInteractions.day >= since
+    ).group_by(UserDailyInteractions.interaction_type))
+    counts, avg_rating = rollup_totals(totals)
     
     # Get most viewed categories
-    most_viewed_categories = db.query(
-        Product.category,
-        func.count(UserInteraction.id).label('view_count')
-    ).join(
-        UserInteraction, Product.id == UserInteraction.product_id
-    ).filter(
-        UserInteraction.user_id == current_user.id,
-        UserInteraction.interaction_type == 'view',
-        UserInteraction.timestamp >= cutoff_date
-    ).group_by(Product.category).order_by(desc('view_count')).limit(5).all()
+    most_viewed_categories = await db.execute(select(
+        UserCategoryDailyInteractions.category,
+        func.sum(UserCategoryDailyInteractions.count).label('view_count')
+    ).where(
+        UserCategoryDailyInteractions.user_id == current_user.id,
+        UserCategoryDailyInteractions.interaction_type == 'view',
+        UserCategoryDailyInteractions.day >= since
+    ).group_by(UserCategoryDailyInteractions.category).having(
+        func.sum(UserCategoryDailyInteractions.count) > 0
+    ).order_by(desc('view_count')).limit(5))
     
     # Get most liked products
-    most_liked_products = db.query(
+    most_liked_products = await db.execute(select(
         Product.id,
         Product.name,
         func.count(UserInteraction.id).label('like_count')
     ).join(
         UserInteraction, Product.id == UserInteraction.product_id
-    ).filter(
+    ).where(
         UserInteraction.user_id == current_user.id,
         UserInteraction.interaction_type == 'like',
         UserInteraction.timestamp >= cutoff_date
-    ).group_by(Product.id, Product.name).order_by(desc('like_count')).limit(5).all()
+    ).group_by(Product.id, Product.name).order_by(desc('like_count')).limit(5))
     
     # Get recent activity
-    recent_activity = base_query.order_by(desc(UserInteraction.timestamp)).limit(10).all()
+    recent_activity = list(await db.scalars(
+        select(UserInteraction).where(
+            UserInteraction.user_id == current_user.id,
+            UserInteraction.timestamp >= cutoff_date
+        ).order_by(desc(UserInteraction.timestamp)).limit(10)
+    ))
     
     return UserInteractionAnalytics(
         total_views=counts['view'],
@@ -182,46 +313,36 @@ async def get_user_analytics(
 async def get_product_stats(
     product_id: int,
     days_back: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)  # Admin users might want all stats
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)  # Admin users might want all stats
 ):
-    """Get interaction statistics for a specific product"""
-    # Verify product exists
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-    
-    # Get interaction counts by type
-    interaction_counts = db.query(
-        UserInteraction.interaction_type,
-        func.count(UserInteraction.id).label('count')
-    ).filter(
-        UserInteraction.product_id == product_id,
-        UserInteraction.timestamp >= cutoff_date
-    ).group_by(UserInteraction.interaction_type).all()
-    
-    # Initialize counts
-    counts = {
-        'view': 0,
-        'like': 0,
-        'add_to_cart': 0,
-        'purchase': 0,
-        'rating': 0
-    }
-    
-    for interaction_type, count in interaction_counts:
-        counts[interaction_type] = count
-    
-    # Get average rating
-    avg_rating = db.query(
-        func.avg(UserInteraction.rating_value).label('avg_rating')
-    ).filter(
-        UserInteraction.product_id == product_id,
-        UserInteraction.interaction_type == 'rating',
-        UserInteraction.timestamp >= cutoff_date
-    ).scalar()
+    """Get interaction statistics for a specific product.
+
+    Products with activity in the last year are answered from the in-memory
+    counters without a query; counts cover whole UTC days.
+    """
+    counters = get_interaction_counters()
+    totals = counters.totals(product_id, days_back) if counters.ready else None
+    if totals is None:
+        # Verify product exists
+        product = await db.scalar(select(Product.id).where(Product.id == product_id))
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        
+        if counters.ready:
+            totals = rollup_totals([])  # no activity in the window
+        else:
+            since = (datetime.utcnow() - timedelta(days=days_back)).date()
+            totals = rollup_totals(await db.execute(select(
+                ProductDailyInteractions.interaction_type,
+                func.sum(ProductDailyInteractions.count),
+                func.sum(ProductDailyInteractions.rating_sum),
+                func.sum(ProductDailyInteractions.rating_count)
+            ).where(
+                ProductDailyInteractions.product_id == product_id,
+                ProductDailyInteractions.day >= since
+            ).group_by(ProductDailyInteractions.interaction_type)))
+    counts, avg_rating = totals
     
     # Calculate conversion ratios
     view_to_cart_ratio = None
@@ -249,37 +370,83 @@ async def get_product_stats(
 @router.delete("/interactions/{interaction_id}")
 async def delete_interaction(
     interaction_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_write_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Delete a user interaction (for privacy/GDPR compliance)"""
-    interaction = db.query(UserInteraction).filter(
+    interaction = await db.scalar(select(UserInteraction).where(
         UserInteraction.id == interaction_id,
         UserInteraction.user_id == current_user.id
-    ).first()
+    ))
     
     if not interaction:
         raise HTTPException(status_code=404, detail="Interaction not found")
     
-    db.delete(interaction)
-    db.commit()
+    await db.delete(interaction)
+    event = await record_derived(db, interaction, sign=-1)
+    await db.commit()
+    get_interaction_counters().apply([event], sign=-1)
     
     return {"message": "Interaction deleted successfully"}
 
 
-@router.get("/interactions/bulk", response_model=List[UserInteractionResponse])
+async def bulk_interactions(db: AsyncSession, user_id: int, lookup: UserInteractionBulkQuery) -> list:
+    """The user's newest ``lookup.limit`` interactions for each product, grouped by product.
+
+    ROW_NUMBER() ranks each product's events over
+    ``ix_user_interactions_user_product_timestamp``, which yields them already
+    in (product, newest first) order, so no sort of the combined result is
+    needed. Products come back in request order, with an empty list when the
+    user has no matching interactions.
+    """
+    product_ids = list(dict.fromkeys(lookup.product_ids))
+    ranked = select(
+        UserInteraction,
+        func.row_number().over(
+            partition_by=UserInteraction.product_id,
+            order_by=(UserInteraction.timestamp.desc(), UserInteraction.id.desc())
+        ).label('rank')
+    ).where(
+        UserInteraction.user_id == user_id,
+        UserInteraction.product_id.in_(product_ids),
+        UserInteraction.interaction_type.in_([t.value for t in lookup.interaction_types])
+    ).subquery()
+    interaction = aliased(UserInteraction, ranked)
+    
+    grouped = {product_id: [] for product_id in product_ids}
+    for row in await db.scalars(
+        select(interaction).where(ranked.c.rank <= lookup.limit).order_by(
+            ranked.c.product_id, ranked.c.timestamp.desc(), ranked.c.id.desc()
+        )
+    ):
+        grouped[row.product_id].append(row)
+    return [
+        ProductInteractions(product_id=product_id, interactions=interactions)
+        for product_id, interactions in grouped.items()
+    ]
+
+
+@router.get("/interactions/bulk", response_model=List[ProductInteractions])
 async def get_bulk_interactions(
-    product_ids: List[int] = Query(...),
+    product_ids: List[int] = Query(..., max_length=1000),
     interaction_types: List[InteractionType] = Query(...),
-    limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(10, ge=1, le=100, description="Newest interactions returned per product"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get multiple interactions for specific products and types (useful for recommendation engines)"""
-    interactions = db.query(UserInteraction).filter(
-        UserInteraction.user_id == current_user.id,
-        UserInteraction.product_id.in_(product_ids),
-        UserInteraction.interaction_type.in_([t.value for t in interaction_types])
-    ).order_by(desc(UserInteraction.timestamp)).limit(limit).all()
-    
-    return interactions 
\ No newline at end of file
+    """Get the newest interactions per product for specific products and types (useful for recommendation engines).
+
+    Long id lists should use ``POST /interactions/bulk`` to stay under URL length limits.
+    """
+    lookup = UserInteractionBulkQuery(product_ids=product_ids, interaction_types=interaction_types, limit=limit)
+    return await bulk_interactions(db, current_user.id, lookup)
+
+
+@router.post("/interactions/bulk", response_model=List[ProductInteractions])
+async def post_bulk_interactions(
+    lookup: UserInteractionBulkQuery,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """``GET /interactions/bulk`` with the product ids and types in a JSON body."""
+    return await bulk_interactions(db, current_user.id, lookup)
@@ -1,13 +1,26 @@
+import tempfile
+from datetime import datetime
 from typing import List, Optional
 from enum import Enum
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 
-from ..core.database import get_db
+from ..core.conditional import check_not_modified, make_etag
+from ..core.database import engine, get_db
+from ..core.responses import FastJSONResponse, fast_json
+from ..core.pagination import decode_cursor, encode_cursor, keyset_filter, keyset_order, sort_token
+from ..api.auth import get_current_superuser_async
 from ..models.product import Product as ProductModel
-from ..schemas.product import Product, ProductCreate, ProductUpdate
+from ..models.user import User
+from ..schemas.product import Product, ProductCreate, ProductFacets, ProductUpdate
+from ..services import product_cache, product_facets, product_fields, product_popularity, product_stats
+from ..services.interaction_counters import get_interaction_counters
+from ..services.interaction_rollups import delete_product_interactions
+from ..services.product_import import DEFAULT_BATCH_SIZE, import_products
+from ..services.product_search import apply_product_search
 
 router = APIRouter(prefix="/products", tags=["products"])
 
@@ -23,73 +36,139 @@ class SortBy(str, Enum):
     RATING = "rating"
     CREATED_AT = "created_at"
     POPULARITY = "popularity"
+    RELEVANCE = "relevance"
 
 
-@router.get("/", response_model=List[Product])
+# List endpoints return pre-built dicts, possibly narrowed with fields=
+PRODUCT_LIST_RESPONSES = {
+    200: {
+        "model": List[Product],
+        "description": "Products in the `Product` shape. With `fields`, each object "
+                       "holds only the requested fields plus ``id``.",
+    }
+}
+
+
+class FeedFormat(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
+class ProductFilters:
+    """Filter query parameters shared by the product listing and facets."""
+
+    def __init__(
+        self,
+        search: Optional[str] = Query(None, description="Search term for product name or description"),
+        category: Optional[str] = Query(None, description="Filter by category"),
+        subcategory: Optional[str] = Query(None, description="Filter by subcategory"),
+        min_price: Optional[float] = Query(None, ge=0, description="Minimum price filter"),
+        max_price: Optional[float] = Query(None, ge=0, description="Maximum price filter"),
+        min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating filter"),
+        max_rating: Optional[float] = Query(None, ge=0, le=5, description="Maximum rating filter"),
+        is_featured: Optional[bool] = Query(None, description="Filter by featured products"),
+        is_on_sale: Optional[bool] = Query(None, description="Filter by products on sale"),
+        in_stock: Optional[bool] = Query(None, description="Filter by products in stock"),
+    ):
+        self.search = search
+        self.category = category
+        self.subcategory = subcategory
+        self.min_price = min_price
+        self.max_price = max_price
+        self.min_rating = min_rating
+        self.max_rating = max_rating
+        self.is_featured = is_featured
+        self.is_on_sale = is_on_sale
+        self.in_stock = in_stock
+
+    def apply(self, db: Session, query):
+        """Filter a products query; returns it with the search relevance (or None)."""
+        # Full-text search (FTS5 on SQLite, tsvector on PostgreSQL)
+        relevance = None
+        if self.search:
+            query, relevance = apply_product_search(db, query, self.search)
+    
+        # Category and subcategory filters
+        if self.category:
+            query = query.filter(ProductModel.category.ilike(f"%{self.category}%"))
+    
+        if self.subcategory:
+            query = query.filter(ProductModel.subcategory.ilike(f"%{self.subcategory}%"))
+    
+        # Price range filters
+        if self.min_price is not None:
+            query = query.filter(ProductModel.price >= self.min_price)
+    
+        if self.max_price is not None:
+            query = query.filter(ProductModel.price <= self.max_price)
+    
+        # Rating filters
+        if self.min_rating is not None:
+            query = query.filter(ProductModel.rating >= self.min_rating)
+    
+        if self.max_rating is not None:
+            query = query.filter(ProductModel.rating <= self.max_rating)
+    
+        # Boolean filters
+        if self.is_featured is not None:
+            query = query.filter(ProductModel.is_featured == self.is_featured)
+    
+        if self.is_on_sale is not None:
+            query = query.filter(ProductModel.is_on_sale == self.is_on_sale)
+    
+        if self.in_stock is not None:
+            if self.in_stock:
+                query = query.filter(ProductModel.quantity_in_stock > 0)
+            else:
+                query = query.filter(ProductModel.quantity_in_stock == 0)
+        
+        return query, relevance
+
+    def cache_key(self) -> str:
+        """Stable key for this filter combination."""
+        return make_etag(*sorted((key, value) for key, value in vars(self).items() if value is not None))
+
+
+def catalog_not_modified(request: Request, response: Response, db: Session = Depends(get_db)) -> None:
+    """Conditional GET for catalog lists: the ETag covers the catalog version and the query."""
+    stats = product_stats.load_product_stats(db)
+    parts = [stats.version, request.url.path, sorted(request.query_params.multi_items())]
+    last_modified = stats.updated_at
+    if request.query_params.get("sort_by") == SortBy.POPULARITY.value:
+        # Interactions reorder this listing without a catalog write
+        parts.append(product_popularity.ranking_window())
+        last_modified = None
+    check_not_modified(request, response, make_etag(*parts), last_modified)
+
+
+@router.get(
+    "/",
+    response_class=FastJSONResponse,
+    responses=PRODUCT_LIST_RESPONSES,
+    dependencies=[Depends(catalog_not_modified)],
+)
 def read_products(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of products to skip"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     limit: int = Query(20, ge=1, le=100, description="Number of products to return"),
-    search: Optional[str] = Query(None, description="Search term for product name or description"),
-    category: Optional[str] = Query(None, description="Filter by category"),
-    subcategory: Optional[str] = Query(None, description="Filter by subcategory"),
-    min_price: Optional[float] = Query(None, ge=0, description="Minimum price filter"),
-    max_price: Optional[float] = Query(None, ge=0, description="Maximum price filter"),
-    min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating filter"),
-    max_rating: Optional[float] = Query(None, ge=0, le=5, description="Maximum rating filter"),
-    is_featured: Optional[bool] = Query(None, description="Filter by featured products"),
-    is_on_sale: Optional[bool] = Query(None, description="Filter by products on sale"),
-    in_stock: Optional[bool] = Query(None, description="Filter by products in stock"),
+    filters: ProductFilters = Depends(),
     sort_by: SortBy = Query(SortBy.CREATED_AT, description="Sort by field"),
     sort_order: SortOrder = Query(SortOrder.DESC, description="Sort order"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,price (id is always included)"),
     db: Session = Depends(get_db)
 ):
     """
     Get products with comprehensive filtering, search, and sorting capabilities.
+
+    Pages can be fetched with ``skip`` or, for deep pages, with keyset
+    pagination: pass the ``X-Next-Cursor`` response header back as ``cursor``.
     """
-    query = db.query(ProductModel)
-    
-    # Search functionality
-    if search:
-        search_filter = or_(
-            ProductModel.name.ilike(f"%{search}%"),
-            ProductModel.description.ilike(f"%{search}%"),
-            ProductModel.manufacturer.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
-    
-    # Category and subcategory filters
-    if category:
-        query = query.filter(ProductModel.category.ilike(f"%{category}%"))
-    
-    if subcategory:
-        query = query.filter(ProductModel.subcategory.ilike(f"%{subcategory}%"))
+    selected = product_fields.parse_fields(fields)
+    query = db.query(*product_fields.columns(selected))
     
-    # Price range filters
-    if min_price is not None:
-        query = query.filter(ProductModel.price >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(ProductModel.price <= max_price)
-    
-    # Rating filters
-    if min_rating is not None:
-        query = query.filter(ProductModel.rating >= min_rating)
-    
-    if max_rating is not None:
-        query = query.filter(ProductModel.rating <= max_rating)
-    
-    # Boolean filters
-    if is_featured is not None:
-        query = query.filter(ProductModel.is_featured == is_featured)
-    
-    if is_on_sale is not None:
-        query = query.filter(ProductModel.is_on_sale == is_on_sale)
-    
-    if in_stock is not None:
-        if in_stock:
-            query = query.filter(ProductModel.quantity_in_stock > 0)
-        else:
-            query = query.filter(ProductModel.quantity_in_stock == 0)
+    # Search and filters (shared with /facets)
+    query, relevance = filters.apply(db, query)
     
     # Sorting
     if sort_by == SortBy.NAME:
@@ -97,51 +176,75 @@ def read_products(
     elif sort_by == SortBy.PRICE:
         order_field = ProductModel.price
     elif sort_by == SortBy.RATING:
-        order_field = ProductModel.rating
+        order_field = func.coalesce(ProductModel.rating, 0.0)
     elif sort_by == SortBy.POPULARITY:
-        # For now, use rating as popularity proxy
-        order_field = ProductModel.rating
+        order_field = ProductModel.popularity
+    elif sort_by == SortBy.RELEVANCE and relevance is not None:
+        order_field = relevance
     else:  # CREATED_AT
         order_field = ProductModel.created_at
     
-    if sort_order == SortOrder.DESC:
-        query = query.order_by(order_field.desc())
+    # Select the sort key after the product columns so the next cursor can be built
+    descending = sort_order == SortOrder.DESC
+    query = query.add_columns(order_field).order_by(
+        *keyset_order(order_field, ProductModel.id, descending)
+    )
+    
+    # Pagination: keyset when a cursor is given, offset otherwise
+    token = sort_token(sort_by.value, sort_order.value)
+    if cursor:
+        value, last_id = decode_cursor(cursor, token)
+        query = query.filter(keyset_filter(order_field, ProductModel.id, value, last_id, descending))
     else:
-        query = query.order_by(order_field.asc())
+        query = query.offset(skip)
+    
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(token, last_row[-1], last_row[selected.index("id")])
     
-    # Pagination
-    products = query.offset(skip).limit(limit).all()
-    return products
+    return fast_json(product_fields.rows_to_dicts(rows, selected), response)
 
 
-@router.get("/search", response_model=List[Product])
+@router.get("/search", response_class=FastJSONResponse, responses=PRODUCT_LIST_RESPONSES)
 def search_products(
+    response: Response,
     q: str = Query(..., description="Search query"),
     limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,price (id is always included)"),
     db: Session = Depends(get_db)
 ):
     """
-    Dedicated search endpoint for products.
+    Dedicated search endpoint for products, ranked by relevance.
     """
-    search_filter = or_(
-        ProductModel.name.ilike(f"%{q}%"),
-        ProductModel.description.ilike(f"%{q}%"),
-        ProductModel.manufacturer.ilike(f"%{q}%"),
-        ProductModel.category.ilike(f"%{q}%"),
-        ProductModel.subcategory.ilike(f"%{q}%")
+    selected = product_fields.parse_fields(fields)
+
+    def load():
+        query = db.query(*product_fields.columns(selected))
+        query, relevance = apply_product_search(db, query, q)
+        if relevance is not None:
+            query = query.order_by(relevance.desc(), ProductModel.id)
+        return product_fields.rows_to_dicts(query.limit(limit).all(), selected)
+
+    key = product_cache.group_key(
+        "search", limit, product_fields.fields_key(selected), " ".join(q.lower().split())
     )
-    
-    products = db.query(ProductModel).filter(search_filter).limit(limit).all()
-    return products
+    return fast_json(product_cache.read_through(key, product_cache.search_ttl(), load), response)
 
 
-@router.get("/categories", response_model=List[str])
+@router.get("/categories", response_model=List[str], dependencies=[Depends(catalog_not_modified)])
 def get_categories(db: Session = Depends(get_db)):
     """
     Get all unique product categories.
     """
-    categories = db.query(ProductModel.category).distinct().all()
-    return [category[0] for category in categories if category[0]]
+    def load():
+        categories = db.query(ProductModel.category).distinct().all()
+        return [category[0] for category in categories if category[0]]
+
+    return product_cache.read_through(
+        product_cache.group_key("categories"), product_cache.catalog_ttl(), load
+    )
 
 
 @router.get("/categories/{category}/subcategories", response_model=List[str])
@@ -152,38 +255,84 @@ def get_subcategories_by_category(
     """
     Get all subcategories for a specific category.
     """
-    subcategories = db.query(ProductModel.subcategory).filter(
-        ProductModel.category.ilike(f"%{category}%")
-    ).distinct().all()
-    return [subcategory[0] for subcategory in subcategories if subcategory[0]]
+    def load():
+        subcategories = db.query(ProductModel.subcategory).filter(
+            ProductModel.category.ilike(f"%{category}%")
+        ).distinct().all()
+        return [subcategory[0] for subcategory in subcategories if subcategory[0]]
+
+    return product_cache.read_through(
+        product_cache.group_key("subcategories", category.lower()), product_cache.catalog_ttl(), load
+    )
 
 
-@router.get("/featured", response_model=List[Product])
+@router.get(
+    "/featured",
+    response_class=FastJSONResponse,
+    responses=PRODUCT_LIST_RESPONSES,
+    dependencies=[Depends(catalog_not_modified)],
+)
 def get_featured_products(
+    response: Response,
     limit: int = Query(10, ge=1, le=50, description="Number of featured products to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,price (id is always included)"),
     db: Session = Depends(get_db)
 ):
     """
     Get featured products.
     """
-    products = db.query(ProductModel).filter(
-        ProductModel.is_featured == True
-    ).order_by(ProductModel.rating.desc()).limit(limit).all()
-    return products
+    selected = product_fields.parse_fields(fields)
+
+    def load():
+        rows = db.query(*product_fields.columns(selected)).filter(
+            ProductModel.is_featured == True
+        ).order_by(ProductModel.rating.desc()).limit(limit).all()
+        return product_fields.rows_to_dicts(rows, selected)
+
+    key = product_cache.group_key("featured", limit, product_fields.fields_key(selected))
+    return fast_json(product_cache.read_through(key, product_cache.catalog_ttl(), load), response)
 
 
-@router.get("/on-sale", response_model=List[Product])
+@router.get(
+    "/on-sale",
+    response_class=FastJSONResponse,
+    responses=PRODUCT_LIST_RESPONSES,
+    dependencies=[Depends(catalog_not_modified)],
+)
 def get_sale_products(
+    response: Response,
     limit: int = Query(20, ge=1, le=100, description="Number of sale products to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,price (id is always included)"),
     db: Session = Depends(get_db)
 ):
     """
     Get products currently on sale.
     """
-    products = db.query(ProductModel).filter(
-        ProductModel.is_on_sale == True
-    ).order_by(ProductModel.rating.desc()).limit(limit).all()
-    return products
+    selected = product_fields.parse_fields(fields)
+
+    def load():
+        rows = db.query(*product_fields.columns(selected)).filter(
+            ProductModel.is_on_sale == True
+        ).order_by(ProductModel.rating.desc()).limit(limit).all()
+        return product_fields.rows_to_dicts(rows, selected)
+
+    key = product_cache.group_key("on-sale", limit, product_fields.fields_key(selected))
+    return fast_json(product_cache.read_through(key, product_cache.catalog_ttl(), load), response)
+
+
+@router.get("/facets", response_model=ProductFacets, dependencies=[Depends(catalog_not_modified)])
+def get_product_facets(filters: ProductFilters = Depends(), db: Session = Depends(get_db)):
+    """
+    Get facet counts (categories, subcategories, price and rating ranges,
+    on-sale/featured/in-stock) for the products matching the listing filters.
+    """
+    def load():
+        query, _ = filters.apply(db, db.query(ProductModel))
+        return product_facets.compute_facets(query)
+
+    return product_cache.read_through(
+        product_cache.group_key("facets", filters.cache_key()), product_cache.catalog_ttl(), load
+    )
 
 
 @router.get("/stats")
@@ -191,41 +340,26 @@ def get_product_stats(db: Session = Depends(get_db)):
     """
     Get overall product statistics.
     """
-    total_products = db.query(ProductModel).count()
-    featured_count = db.query(ProductModel).filter(ProductModel.is_featured == True).count()
-    on_sale_count = db.query(ProductModel).filter(ProductModel.is_on_sale == True).count()
-    in_stock_count = db.query(ProductModel).filter(ProductModel.quantity_in_stock > 0).count()
-    
-    avg_price = db.query(func.avg(ProductModel.price)).scalar() or 0
-    avg_rating = db.query(func.avg(ProductModel.rating)).scalar() or 0
-    
-    price_range = db.query(
-        func.min(ProductModel.price),
-        func.max(ProductModel.price)
-    ).first()
-    
-    return {
-        "total_products": total_products,
-        "featured_count": featured_count,
-        "on_sale_count": on_sale_count,
-        "in_stock_count": in_stock_count,
-        "average_price": round(avg_price, 2),
-        "average_rating": round(avg_rating, 2),
-        "price_range": {
-            "min": price_range[0] or 0,
-            "max": price_range[1] or 0
-        }
-    }
+    return product_stats.get_product_stats(db)
 
 
 @router.get("/{product_id}", response_model=Product)
-def read_product(product_id: int, db: Session = Depends(get_db)):
+def read_product(product_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Get a specific product by ID.
     """
-    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
-    if not product:
+    def load():
+        product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+        return product_cache.serialize([product])[0] if product else None
+
+    product = product_cache.read_through(
+        product_cache.product_key(product_id), product_cache.catalog_ttl(), load
+    )
+    if product is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+
+    updated_at = datetime.fromisoformat(product["updated_at"])
+    check_not_modified(request, response, make_etag(product_id, product["updated_at"]), updated_at)
     return product
 
 
@@ -236,11 +370,49 @@ def create_product(product_in: ProductCreate, db: Session = Depends(get_db)):
     """
     product = ProductModel(**product_in.dict())
     db.add(product)
+    db.flush()
+    product_stats.record_product_change(db, None, product_stats.stats_snapshot(product))
     db.commit()
+    product_cache.invalidate_product(product.id, None, product_cache.listing_snapshot(product))
     db.refresh(product)
     return product
 
 
+@router.post("/bulk")
+async def bulk_upsert_products(
+    request: Request,
+    format: Optional[FeedFormat] = Query(None, description="Body format; detected from Content-Type or the body when omitted"),
+    delete_missing: bool = Query(False, description="Delete products whose ids are not in the feed"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000, description="Rows per upsert batch"),
+    current_user: User = Depends(get_current_superuser_async),
+):
+    """
+    Upsert products from a JSON array or NDJSON body, keyed on ``id``.
+    Superusers only.
+
+    Unchanged products are not rewritten; invalid rows are counted and
+    skipped. Returns inserted/updated/unchanged/deleted counts. With
+    ``delete_missing`` an empty feed is rejected, and nothing is deleted if
+    any row failed validation (``delete_skipped`` says why).
+    """
+    fmt = format.value if format else None
+    content_type = request.headers.get("content-type", "")
+    if fmt is None and ("ndjson" in content_type or "jsonl" in content_type):
+        fmt = FeedFormat.NDJSON.value
+
+    # Spool the body to disk so the import streams it without holding it in memory
+    with tempfile.TemporaryFile() as spool:
+        async for chunk in request.stream():
+            await run_in_threadpool(spool.write, chunk)
+        spool.seek(0)
+        try:
+            return await run_in_threadpool(
+                import_products, spool, engine, fmt, batch_size, delete_missing
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
 @router.put("/{product_id}", response_model=Product)
 def update_product(product_id: int, product_in: ProductUpdate, db: Session = Depends(get_db)):
     """
@@ -250,10 +422,15 @@ def update_product(product_id: int, product_in: ProductUpdate, db: Session = Dep
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
+    before = product_stats.stats_snapshot(product)
+    listed_before = product_cache.listing_snapshot(product)
     for field, value in product_in.dict(exclude_unset=True).items():
         setattr(product, field, value)
+    product_stats.record_product_change(db, before, product_stats.stats_snapshot(product))
+    listed_after = product_cache.listing_snapshot(product)
 
     db.commit()
+    product_cache.invalidate_product(product_id, listed_before, listed_after)
     db.refresh(product)
     return product
 
@@ -267,6 +444,13 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
+    before = product_stats.stats_snapshot(product)
+    listed_before = product_cache.listing_snapshot(product)
+    delete_product_interactions(db, [product_id])
     db.delete(product)
+    db.flush()
+    product_stats.record_product_change(db, before, None)
     db.commit()
+    product_cache.invalidate_product(product_id, listed_before, None)
+    get_interaction_counters().forget(product_id)
     return None 
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""Key-value caches for read-through endpoints.
+
+``MemoryCache`` is an in-process LRU with per-entry TTLs. ``RedisCache``
+wraps any Redis-compatible client (redis-py, fakeredis) so entries are shared
+between workers. Values must be JSON-serializable.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """Thread-safe LRU cache; entries are (expires_at, value)."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache on a Redis-compatible client. Errors are logged and treated as
+    misses, so an unavailable Redis slows requests down instead of failing them."""
+
+    def __init__(self, client):
+        from redis.exceptions import RedisError
+
+        self.client = client
+        self._errors = (RedisError, OSError)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCache":
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5))
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(key)
+        except self._errors as exc:
+            logger.warning("Cache get failed for %s: %s", key, exc)
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        try:
+            self.client.set(key, json.dumps(value, separators=(",", ":")), ex=ttl)
+        except self._errors as exc:
+            logger.warning("Cache set failed for %s: %s", key, exc)
+
+    def delete(self, *keys: str) -> None:
+        try:
+            if keys:
+                self.client.delete(*keys)
+        except self._errors as exc:
+            logger.warning("Cache delete failed for %s: %s", keys, exc)
+
+    def delete_prefix(self, prefix: str) -> None:
+        try:
+            batch = []
+            for key in self.client.scan_iter(match=f"{prefix}*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    self.client.delete(*batch)
+                    batch = []
+            if batch:
+                self.client.delete(*batch)
+        except self._errors as exc:
+            logger.warning("Cache delete failed for prefix %s: %s", prefix, exc)
+
+    def clear(self) -> None:
+        self.delete_prefix("")
+
+
+class NullCache:
+    """Disables caching (``cache_backend=none``)."""
+
+    def get(self, key: str) -> None:
+        return None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def delete_prefix(self, prefix: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+@lru_cache()
+def get_cache():
+    """Return the cache selected by ``cache_backend`` (memory | redis | none)."""
+    settings = get_settings()
+    if settings.cache_backend == "redis":
+        return RedisCache.from_url(settings.redis_url)
+    if settings.cache_backend == "none":
+        return NullCache()
+    return MemoryCache(settings.cache_max_entries)
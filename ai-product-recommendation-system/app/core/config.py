@@ -14,6 +14,30 @@ class Settings(BaseSettings):
     database_url: str = (
         f"sqlite:///{Path(__file__).resolve().parent.parent.parent}/sqlite.db"
     )
+    # Apply Alembic migrations on startup; turn off when deploys run
+    # ``alembic upgrade head`` themselves
+    auto_migrate: bool = True
+    # Serve /products/stats from a single incrementally updated row
+    materialize_product_stats: bool = False
+    # Interactions count half as much toward popularity after this many days
+    popularity_half_life_days: float = 7.0
+
+    # Batched interaction ingestion (POST /interactions/batch)
+    interaction_batch_size: int = 500  # rows per bulk insert
+    interaction_flush_interval: float = 1.0  # seconds before a partial batch is written
+    interaction_max_pending: int = 20000  # buffered events before requests get 503
+    interaction_max_attempts: int = 3  # failed writes before a batch is split to find bad rows
+
+    # Serve /products/{id}/stats from in-memory counters loaded from the rollups
+    interaction_counters_enabled: bool = True
+    interaction_counters_sync_interval: float = 60.0  # seconds between reloads of recent days
+
+    # Caching
+    cache_backend: str = "memory"  # memory | redis | none
+    redis_url: str = "redis://localhost:6379/0"
+    cache_max_entries: int = 10000
+    catalog_cache_ttl: int = 3600  # seconds
+    search_cache_ttl: int = 900
     
     # JWT Authentication
     secret_key: str = "your-secret-key-here-please-change-in-production"
@@ -1,16 +1,116 @@
-from sqlalchemy import create_engine
+import asyncio
+import weakref
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.util import await_only
 
 from .config import get_settings
 
 settings = get_settings()
 
+# SQLite: seconds a connection waits for another writer before "database is locked"
+SQLITE_BUSY_TIMEOUT = 30
+
+
+def _connect_args(url: str) -> dict:
+    return {"timeout": SQLITE_BUSY_TIMEOUT} if url.startswith("sqlite") else {}
+
+
 # Create SQLAlchemy engine
-engine = create_engine(settings.database_url, echo=settings.environment == "development", future=True)
+engine = create_engine(
+    settings.database_url,
+    echo=settings.environment == "development",
+    future=True,
+    connect_args=_connect_args(settings.database_url),
+)
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# Async drivers for the same database, used by routers that run on the event loop
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in ``url`` for its async counterpart."""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS[parsed.get_backend_name()]).render_as_string(hide_password=False)
+
+
+_async_url = async_database_url(settings.database_url)
+async_engine = create_async_engine(
+    _async_url,
+    echo=settings.environment == "development",
+    # SQLite: how long BEGIN IMMEDIATE waits for another process's writer
+    connect_args=_connect_args(_async_url),
+)
+
+# Objects stay usable after commit; async sessions cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+# Sessions for handlers that write; the option only matters on SQLite (see below).
+# The connection, and so the write lock, is taken at the first query, not earlier.
+AsyncWriteSessionLocal = async_sessionmaker(
+    bind=async_engine.execution_options(sqlite_write=True), autoflush=False, expire_on_commit=False
+)
+
+if async_engine.dialect.name == "sqlite":
+    # Concurrent async requests would otherwise deadlock on SQLite: two deferred
+    # transactions that both read and then write fail with "database is locked".
+    # Take over BEGIN so write sessions can start with BEGIN IMMEDIATE (queueing
+    # on busy_timeout instead), and use WAL so readers never wait for the writer.
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _sqlite_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+    # SQLite's busy handler polls rather than queueing, so under load some
+    # writers starve; in-process writers wait their turn on a lock instead.
+    # It is held from BEGIN IMMEDIATE to COMMIT/ROLLBACK, not for the whole
+    # request, with one lock per event loop (asyncio locks can't be shared).
+    _sqlite_write_locks = weakref.WeakKeyDictionary()
+
+    def _sqlite_write_lock() -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = _sqlite_write_locks.get(loop)
+        if lock is None:
+            lock = _sqlite_write_locks[loop] = asyncio.Lock()
+        return lock
+
+    def _release_write_lock(info: dict) -> None:
+        lock = info.pop("sqlite_write_lock", None)
+        if lock is not None:
+            lock.release()
+
+    @event.listens_for(async_engine.sync_engine, "begin")
+    def _sqlite_begin(conn):
+        if not conn.get_execution_options().get("sqlite_write"):
+            conn.exec_driver_sql("BEGIN")
+            return
+        # Runs in SQLAlchemy's greenlet on the event loop, so it can await the lock
+        lock = _sqlite_write_lock()
+        await_only(lock.acquire())
+        conn.info["sqlite_write_lock"] = lock
+        try:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        except Exception:
+            _release_write_lock(conn.info)
+            raise
+
+    @event.listens_for(async_engine.sync_engine, "commit")
+    @event.listens_for(async_engine.sync_engine, "rollback")
+    def _sqlite_end(conn):
+        _release_write_lock(conn.info)
+
+    @event.listens_for(async_engine.sync_engine.pool, "checkin")
+    def _sqlite_checkin(dbapi_connection, connection_record):
+        # A connection invalidated mid-transaction ends without COMMIT or ROLLBACK
+        _release_write_lock(connection_record.info)
+
 # Base class for models
 Base = declarative_base()
 
@@ -21,4 +121,17 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close() 
+
+
+async def get_async_db():
+    """Provide an async session for handlers that run on the event loop."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_write_db():
+    """Like ``get_async_db``, for handlers that write: on SQLite each transaction
+    takes the write lock when it begins, so concurrent writers queue instead of failing."""
+    async with AsyncWriteSessionLocal() as db:
+        yield db
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Revision matching the tables that create_all used to build
+BASELINE_REVISION = "0001_initial_schema"
+
+
+def alembic_config() -> Config:
+    """Alembic config for this project, usable from any working directory."""
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    return config
+
+
+def run_migrations(engine: Engine) -> None:
+    """Upgrade the database to the latest revision.
+
+    Databases created by ``Base.metadata.create_all`` before migrations
+    existed have no ``alembic_version`` table; they are stamped at the
+    baseline first so only the later revisions run.
+    """
+    config = alembic_config()
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        tables = set(inspect(conn).get_table_names())
+        if "products" in tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    """Build an opaque cursor from the last row's sort key and id."""
+    payload = {"s": sort, "id": last_id}
+    if isinstance(value, datetime):
+        payload["dt"] = value.isoformat()
+    else:
+        payload["v"] = value
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort: str) -> tuple:
+    """Return ``(value, last_id)`` from a cursor issued for the same sort."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload["s"] != sort:
+            raise ValueError("cursor was issued for a different sort order")
+        value = datetime.fromisoformat(payload["dt"]) if "dt" in payload else payload["v"]
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {exc}",
+        )
+
+
+def keyset_filter(sort_expr, id_column, value: Any, last_id: int, descending: bool):
+    """Rows strictly after ``(value, last_id)`` in ``ORDER BY sort_expr, id``."""
+    if descending:
+        return or_(sort_expr < value, and_(sort_expr == value, id_column < last_id))
+    return or_(sort_expr > value, and_(sort_expr == value, id_column > last_id))
+
+
+def keyset_order(sort_expr, id_column, descending: bool) -> tuple:
+    """ORDER BY clauses matching keyset_filter, with id as the tie-breaker."""
+    if descending:
+        return sort_expr.desc(), id_column.desc()
+    return sort_expr.asc(), id_column.asc()
+
+
+def sort_token(*parts: Optional[str]) -> str:
+    """Identify the ordering a cursor belongs to, e.g. ``price:desc``."""
+    return ":".join(part for part in parts if part)
@@ -0,0 +1,36 @@
+"""JSON responses that skip FastAPI's generic encoder.
+
+Endpoints that already hold plain dicts and lists return ``FastJSONResponse``
+directly; it is rendered by orjson when installed and by the standard
+library otherwise.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_json(content: Any, response: Response) -> FastJSONResponse:
+    """Render ``content``, keeping headers already set on the injected ``response``."""
+    return FastJSONResponse(content, headers=dict(response.headers))
@@ -1,18 +1,40 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
-from .core.database import Base, engine
+from .core.database import engine
 from .api.products import router as products_router
 from .api.auth import router as auth_router
 from .api.interactions import router as interactions_router
 from .core.config import get_settings
-
-# Create database tables (in production, use Alembic migrations instead)
-Base.metadata.create_all(bind=engine)
+from .core.migrations import run_migrations
+from .services.interaction_counters import get_interaction_counters
+from .services.interaction_writer import get_interaction_writer
 
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name, version="1.0.0")
+# Bring the schema (tables, indexes, full-text search) up to date
+if settings.auto_migrate:
+    run_migrations(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Per-product stats counters, loaded before the writer starts counting into them
+    counters = get_interaction_counters()
+    if settings.interaction_counters_enabled:
+        await run_in_threadpool(counters.start)
+    # Background bulk writer for POST /interactions/batch; drained on shutdown
+    writer = get_interaction_writer()
+    writer.start()
+    yield
+    await run_in_threadpool(writer.stop)
+    await run_in_threadpool(counters.stop)
+
+
+app = FastAPI(title=settings.app_name, version="1.0.0", lifespan=lifespan)
 
 # CORS (adjust origins for production)
 app.add_middleware(
@@ -21,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API routers
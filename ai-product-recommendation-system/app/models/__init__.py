@@ -0,0 +1,5 @@
+from .product import Product
+from .user import User
+from .user_interaction import UserInteraction
+from .product_stats import ProductStats
+from .interaction_rollup import UserDailyInteractions, ProductDailyInteractions, UserCategoryDailyInteractions
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Date, Float, ForeignKey, Integer, String
+
+from ..core.database import Base
+
+
+class UserDailyInteractions(Base):
+    """Per-user interaction counts for one type on one (UTC) day."""
+
+    __tablename__ = "user_daily_interactions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    interaction_type = Column(String(20), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    # Sum and count of rating_value, so windows can be averaged by summing rows
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    rating_count = Column(Integer, nullable=False, default=0)
+
+
+class ProductDailyInteractions(Base):
+    """Per-product interaction counts for one type on one (UTC) day."""
+
+    __tablename__ = "product_daily_interactions"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    interaction_type = Column(String(20), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    rating_count = Column(Integer, nullable=False, default=0)
+
+
+class UserCategoryDailyInteractions(Base):
+    """Per-user interaction counts by product category (at event time) and day."""
+
+    __tablename__ = "user_category_daily_interactions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String(100), primary_key=True)
+    interaction_type = Column(String(20), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
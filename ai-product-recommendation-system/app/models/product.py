@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, String, Text
+
+from ..core.database import Base
+
+
+class Product(Base):
+    """Catalog product."""
+
+    __tablename__ = "products"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    category = Column(String(100), nullable=False)
+    subcategory = Column(String(100))
+    price = Column(Float, nullable=False)
+    manufacturer = Column(String(255))
+    description = Column(Text)
+
+    quantity_in_stock = Column(Integer, nullable=False, default=0)
+    is_featured = Column(Boolean, nullable=False, default=False)
+    is_on_sale = Column(Boolean, nullable=False, default=False)
+    sale_price = Column(Float)
+
+    weight = Column(Float)
+    dimensions = Column(String(100))
+    release_date = Column(DateTime)
+    rating = Column(Float, default=0.0)
+    image_url = Column(String(500))
+    # Time-decayed interaction score, see services/product_popularity.py
+    popularity = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Category filters and the subcategory listing
+        Index("ix_products_category_subcategory", "category", "subcategory"),
+        # /featured and /on-sale: filter on the flag, order by rating
+        Index("ix_products_featured_rating", "is_featured", "rating"),
+        Index("ix_products_on_sale_rating", "is_on_sale", "rating"),
+        # Price range filters and price sorting
+        Index("ix_products_price", "price"),
+        # Default listing order (created_at, id) used by keyset pagination
+        Index("ix_products_created_at_id", "created_at", "id"),
+        # Popularity sorting, with id as the keyset tie-breaker
+        Index("ix_products_popularity_id", "popularity", "id"),
+    )
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, Integer
+
+from ..core.database import Base
+
+
+class ProductStats(Base):
+    """Single materialized row of catalog-wide aggregates.
+
+    Sums and counts rather than averages, so product writes can apply deltas.
+    """
+
+    __tablename__ = "product_stats"
+
+    id = Column(Integer, primary_key=True)  # always 1
+    total_products = Column(Integer, nullable=False, default=0)
+    featured_count = Column(Integer, nullable=False, default=0)
+    on_sale_count = Column(Integer, nullable=False, default=0)
+    in_stock_count = Column(Integer, nullable=False, default=0)
+    price_sum = Column(Float, nullable=False, default=0.0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    min_price = Column(Float)
+    max_price = Column(Float)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped by every product write; catalog list ETags are derived from it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Index, Integer, String
+
+from ..core.database import Base
+
+
+class UserInteraction(Base):
+    """A user's interaction with a product (view, like, add_to_cart, purchase, rating)."""
+
+    __tablename__ = "user_interactions"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    interaction_type = Column(String(20), nullable=False)
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    rating_value = Column(Float)  # For rating interactions (1-5)
+    quantity = Column(Integer)  # For add_to_cart/purchase interactions
+    session_id = Column(String(100))
+    interaction_metadata = Column(JSON)
+    # Product category when the event happened, so deleting the event undoes
+    # the category rollup it was counted in even if the product moved since
+    category = Column(String(100))
+    # Idempotency key for batched ingestion; retried events with the same id are skipped
+    event_id = Column(String(36), unique=True, index=True)
+
+    __table_args__ = (
+        # History and recent activity: one user's events, newest first
+        Index("ix_user_interactions_user_timestamp", "user_id", timestamp.desc(), "id"),
+        # User analytics: counts and joins filtered by type within a time window
+        Index("ix_user_interactions_user_type_timestamp", "user_id", "interaction_type", "timestamp"),
+        # Product stats: per-product counts by type within a time window
+        Index("ix_user_interactions_product_type_timestamp", "product_id", "interaction_type", "timestamp"),
+        # Bulk lookup: one user's newest events per product, in window order
+        Index("ix_user_interactions_user_product_timestamp", "user_id", "product_id", timestamp.desc(), id.desc()),
+    )
@@ -1,7 +1,9 @@
 from .user import UserCreate, User, UserUpdate
-from .product import ProductCreate, Product, ProductUpdate
+from .product import ProductCreate, Product, ProductUpdate, ProductFacets
 from .user_interaction import (
     UserInteractionCreate,
+    UserInteractionBatch,
+    UserInteractionBatchAccepted,
     UserInteractionResponse,
     UserInteractionHistory,
     UserInteractionAnalytics,
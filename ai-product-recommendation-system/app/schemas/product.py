@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -48,4 +48,27 @@ class Product(ProductInDBBase):
 
 
 class ProductInDB(ProductInDBBase):
-    """Internal schema with potential sensitive fields.""" 
\ No newline at end of file
+    """Internal schema with potential sensitive fields.""" 
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class RangeFacetCount(BaseModel):
+    label: str
+    min: Optional[float] = None  # inclusive
+    max: Optional[float] = None  # exclusive; None means no upper bound
+    count: int
+
+
+class ProductFacets(BaseModel):
+    """Counts for the filter sidebar, under the request's filters."""
+    total: int
+    categories: List[FacetCount]
+    subcategories: List[FacetCount]
+    price_ranges: List[RangeFacetCount]
+    rating_ranges: List[RangeFacetCount]
+    on_sale: int
+    featured: int
+    in_stock: int
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from uuid import UUID
+from pydantic import BaseModel, Field
 from enum import Enum
 
 
@@ -19,6 +20,22 @@ class UserInteractionCreate(BaseModel):
     quantity: Optional[int] = None  # For add_to_cart/purchase interactions
     session_id: Optional[str] = None  # For tracking user sessions
     interaction_metadata: Optional[dict] = None  # Additional interaction data
+    event_id: Optional[UUID] = None  # Idempotency key; generated when omitted
+
+
+class UserInteractionBatch(BaseModel):
+    events: list[UserInteractionCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class UserInteractionBatchAccepted(BaseModel):
+    accepted: int
+    event_ids: list[UUID]  # In request order; rows are written shortly after
+
+
+class UserInteractionBulkQuery(BaseModel):
+    product_ids: list[int] = Field(..., min_length=1, max_length=1000)
+    interaction_types: list[InteractionType] = Field(..., min_length=1)
+    limit: int = Field(10, ge=1, le=100)  # Newest interactions returned per product
 
 
 class UserInteractionResponse(BaseModel):
@@ -31,6 +48,7 @@ class UserInteractionResponse(BaseModel):
     quantity: Optional[int] = None
     session_id: Optional[str] = None
     interaction_metadata: Optional[dict] = None
+    event_id: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -38,9 +56,15 @@ class UserInteractionResponse(BaseModel):
 
 class UserInteractionHistory(BaseModel):
     interactions: list[UserInteractionResponse]
-    total_count: int
+    total_count: Optional[int] = None  # None when not counted (cursor pages by default)
     page: int
     per_page: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+
+
+class ProductInteractions(BaseModel):
+    product_id: int
+    interactions: list[UserInteractionResponse]  # Newest first
 
 
 class UserInteractionAnalytics(BaseModel):
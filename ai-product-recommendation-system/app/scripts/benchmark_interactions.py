@@ -0,0 +1,141 @@
+"""Concurrency benchmark for the interactions API.
+
+Fires requests at a running server from many concurrent clients and reports
+throughput and latency per endpoint. Meanwhile a probe polls ``GET /``, which
+does no database work: its latency shows whether handlers block the event
+loop, which stalls every other request on the worker. Run it against one
+uvicorn worker before and after a change to compare:
+
+    uvicorn app.main:app --workers 1
+    python -m app.scripts.benchmark_interactions --concurrency 50 --requests 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+BENCH_USER = {"email": "bench@example.com", "username": "bench", "password": "benchpassword"}
+
+PROBE_INTERVAL = 0.05  # seconds between event-loop probes
+
+ENDPOINTS = {
+    "history": "/api/interactions/history?per_page=20",
+    "analytics": "/api/interactions/analytics?days_back=30",
+    "product-stats": "/api/products/{product_id}/stats?days_back=30",
+    "create": "/api/interactions",
+}
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    await client.post("/api/auth/register", json=BENCH_USER)  # 400 if it already exists
+    response = await client.post(
+        "/api/auth/login", json={"email": BENCH_USER["email"], "password": BENCH_USER["password"]}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def seed(client: httpx.AsyncClient, headers: dict, product_id: int, count: int) -> None:
+    """Give the bench user some history so reads return real rows."""
+    kinds = ("view", "like", "add_to_cart")
+    for i in range(count):
+        response = await client.post(
+            "/api/interactions",
+            json={"product_id": product_id, "interaction_type": kinds[i % len(kinds)]},
+            headers=headers,
+        )
+        response.raise_for_status()
+
+
+def _percentile(ordered: list, fraction: float) -> float:
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+
+async def run(client: httpx.AsyncClient, headers: dict, name: str, product_id: int,
+              concurrency: int, total: int) -> dict:
+    path = ENDPOINTS[name].format(product_id=product_id)
+    latencies, errors, probes = [], 0, []
+    remaining = iter(range(total))
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            await client.get("/")
+            probes.append(time.perf_counter() - started)
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                if name == "create":
+                    response = await client.post(
+                        path, json={"product_id": product_id, "interaction_type": "view"}, headers=headers
+                    )
+                else:
+                    response = await client.get(path, headers=headers)
+            except httpx.TransportError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    prober = asyncio.create_task(probe())
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+
+    latencies.sort()
+    return {
+        "endpoint": name,
+        "requests": total,
+        "errors": errors,
+        "req_per_s": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+        "probe_p95_ms": round(_percentile(sorted(probes), 0.95) * 1000, 1),
+    }
+
+
+async def main(args) -> None:
+    # Expire idle connections before uvicorn's 5s keep-alive timeout closes them under us
+    limits = httpx.Limits(
+        max_connections=args.concurrency + 1,
+        max_keepalive_connections=args.concurrency + 1,
+        keepalive_expiry=2,
+    )
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        headers = await login(client)
+        await seed(client, headers, args.product_id, args.seed)
+        print(
+            f"{'endpoint':<15}{'requests':>10}{'errors':>8}{'req/s':>10}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'probe p95 ms':>14}"
+        )
+        for name in args.endpoints:
+            result = await run(client, headers, name, args.product_id, args.concurrency, args.requests)
+            print(
+                f"{result['endpoint']:<15}{result['requests']:>10}{result['errors']:>8}"
+                f"{result['req_per_s']:>10}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+                f"{result['probe_p95_ms']:>14}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the interactions API under concurrent load.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint")
+    parser.add_argument("--product-id", type=int, default=1, help="an existing product")
+    parser.add_argument("--seed", type=int, default=30, help="interactions to create before measuring")
+    parser.add_argument(
+        "--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS),
+    )
+    asyncio.run(main(parser.parse_args()))
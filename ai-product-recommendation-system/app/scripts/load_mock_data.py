@@ -1,87 +1,51 @@
-import json
+import argparse
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any
 
-from ..core.database import Base, SessionLocal, engine
+from ..core.database import SessionLocal, engine
+from ..core.migrations import run_migrations
 from ..models.product import Product
+from ..services.product_import import DEFAULT_BATCH_SIZE, import_products
 
-# Ensure tables exist
-Base.metadata.create_all(bind=engine)
+# Ensure the schema is up to date
+run_migrations(engine)
 
-def parse_date(date_str: str) -> datetime:
-    """Parse date string in MM/DD/YYYY format to datetime object."""
-    try:
-        return datetime.strptime(date_str, "%m/%d/%Y")
-    except (ValueError, TypeError):
-        return datetime.utcnow()
+def print_progress(summary: dict):
+    """Print running import counts and throughput."""
+    print(
+        f"Processed {summary['received']:,} products "
+        f"({summary['inserted']:,} new, {summary['updated']:,} updated, "
+        f"{summary['unchanged']:,} unchanged, {summary['errors']:,} errors) "
+        f"- {summary['rows_per_second']:,} rows/s"
+    )
 
-def map_mock_data_to_model(mock_item: Dict[str, Any]) -> Dict[str, Any]:
-    """Map mock data fields to model fields."""
-    mapped_data = {
-        'id': mock_item.get('product_id'),
-        'name': mock_item.get('product_name'),
-        'category': mock_item.get('category'),
-        'subcategory': mock_item.get('subcategory'),
-        'price': mock_item.get('price'),
-        'manufacturer': mock_item.get('manufacturer'),
-        'description': mock_item.get('description'),
-        'quantity_in_stock': mock_item.get('quantity_in_stock', 0),
-        'is_featured': mock_item.get('is_featured', False),
-        'is_on_sale': mock_item.get('is_on_sale', False),
-        'sale_price': mock_item.get('sale_price'),
-        'weight': mock_item.get('weight'),
-        'dimensions': mock_item.get('dimensions'),
-        'release_date': parse_date(mock_item.get('release_date', '')),
-        'rating': mock_item.get('rating', 0.0),
-        'image_url': mock_item.get('image_url'),
-    }
-    
-    # Remove None values
-    return {k: v for k, v in mapped_data.items() if v is not None}
+def load_mock_products(
+    mock_json_path: Path,
+    delete_missing: bool = True,
+    fmt: str = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+):
+    """Stream products from a JSON or NDJSON file into the database.
 
-def clear_existing_products():
-    """Clear existing products from database."""
-    with SessionLocal() as session:
-        session.query(Product).delete()
-        session.commit()
-        print("Cleared existing products from database.")
-
-def load_mock_products(mock_json_path: Path, clear_existing: bool = True):
-    """Load mock products from JSON file into database."""
+    Existing products are upserted in place rather than cleared and reloaded;
+    with ``delete_missing`` products not in the file are removed afterwards.
+    """
     if not mock_json_path.exists():
         raise FileNotFoundError(f"Mock data file not found: {mock_json_path}")
-    
-    with mock_json_path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    if clear_existing:
-        clear_existing_products()
+    with mock_json_path.open("rb") as f:
+        summary = import_products(
+            f, engine, fmt=fmt, batch_size=batch_size,
+            delete_missing=delete_missing, progress=print_progress,
+        )
 
-    with SessionLocal() as session:
-        loaded_count = 0
-        error_count = 0
-        
-        for item in data:
-            try:
-                mapped_data = map_mock_data_to_model(item)
-                product = Product(**mapped_data)
-                session.add(product)
-                loaded_count += 1
-                
-                # Commit in batches to avoid memory issues
-                if loaded_count % 100 == 0:
-                    session.commit()
-                    print(f"Loaded {loaded_count} products...")
-                    
-            except Exception as e:
-                error_count += 1
-                print(f"Error loading product {item.get('product_id', 'unknown')}: {e}")
-                continue
-        
-        # Final commit
-        session.commit()
-        print(f"Successfully loaded {loaded_count} products with {error_count} errors.")
+    if summary["deleted"]:
+        print(f"Deleted {summary['deleted']:,} products missing from the feed.")
+    if summary["delete_skipped"]:
+        print(f"Did not delete missing products: {summary['delete_skipped']}.")
+    for sample in summary["error_samples"]:
+        print(f"Error in record {sample['record']}: {sample['error']}")
+    print(f"Finished in {summary['seconds']}s.")
+    return summary
 
 def get_product_stats():
     """Get basic statistics about loaded products."""
@@ -99,9 +63,18 @@ def get_product_stats():
 
 if __name__ == "__main__":
     project_root = Path(__file__).resolve().parents[2]
-    mock_file = project_root / "mock_data.json"
-    
+
+    parser = argparse.ArgumentParser(description="Load a product feed (JSON array or NDJSON).")
+    parser.add_argument("path", nargs="?", type=Path, default=project_root / "mock_data.json")
+    parser.add_argument("--format", choices=["json", "ndjson"], help="detected from the file when omitted")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--delete-missing", action=argparse.BooleanOptionalAction, default=True,
+        help="delete products that are not in the feed (default: yes)",
+    )
+    args = parser.parse_args()
+
     print("Loading mock data...")
-    load_mock_products(mock_file)
+    load_mock_products(args.path, args.delete_missing, args.format, args.batch_size)
     get_product_stats()
-    print("Mock data loading completed!") 
\ No newline at end of file
+    print("Mock data loading completed!")
@@ -0,0 +1,12 @@
+from ..core.database import engine
+from ..core.migrations import run_migrations
+from ..services.product_popularity import rebuild_popularity
+
+# Ensure the schema is up to date
+run_migrations(engine)
+
+if __name__ == "__main__":
+    print("Rebuilding product popularity from interactions...")
+    with engine.begin() as conn:
+        scored = rebuild_popularity(conn)
+    print(f"Scored {scored:,} products.")
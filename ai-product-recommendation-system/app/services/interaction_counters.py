@@ -0,0 +1,250 @@
+"""In-memory sliding-window interaction counters for product stats.
+
+``/products/{id}/stats`` is called by every product page. Rather than summing
+``product_daily_interactions`` rows per request, each process keeps the last
+``WINDOW_DAYS`` days of counts per (product, interaction type) in compact
+``array`` rings with one slot per day, so any ``days_back`` up to 365 is
+answered by summing at most 366 integers per type without a query.
+
+The daily rollups stay the source of truth. Counters are loaded from them at
+startup and take each interaction this process commits; every
+``interaction_counters_sync_interval`` seconds a background thread reloads
+the two most recent days, which brings in events written by other workers,
+and drops products that no longer exist. Events and deletes this process
+applies while a sync is reading are recorded and replayed over the reloaded
+days, so the sync never wipes them. Between syncs a process can be a few
+events off. Other workers' changes to older days (deleting an old
+interaction) are seen after a restart.
+
+Memory is about 1.5 KB per (product, type) with activity in the window, plus
+4.4 KB per rated product.
+"""
+
+import logging
+import threading
+from array import array
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from ..core.config import get_settings
+from ..core.database import engine
+from ..models.interaction_rollup import ProductDailyInteractions
+from ..models.product import Product
+from ..schemas.user_interaction import InteractionType
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = 366  # days_back up to 365, plus today
+SYNC_DAYS = 2  # reload yesterday too, so events written around midnight are picked up
+LOAD_CHUNK_SIZE = 10000
+
+INTERACTION_TYPES = tuple(kind.value for kind in InteractionType)
+
+
+def _slot(day: date) -> int:
+    return day.toordinal() % WINDOW_DAYS
+
+
+def _window_sum(values: array, start: int, end: int) -> float:
+    """Sum ring slots ``start`` through ``end``, wrapping around."""
+    if start <= end:
+        return sum(values[start:end + 1])
+    return sum(values[start:]) + sum(values[:end + 1])
+
+
+class ProductInteractionCounters:
+    """Per-day interaction counts for the last ``WINDOW_DAYS`` days, by product and type."""
+
+    def __init__(self, engine: Engine, sync_interval: float):
+        self.engine = engine
+        self.sync_interval = sync_interval
+        self.ready = False
+        self._counts: Dict[Tuple[int, str], array] = {}
+        self._ratings: Dict[int, Tuple[array, array]] = {}  # product -> (rating sums, rating counts)
+        self._today = date.min
+        # Changes applied while a sync reads the rollups, replayed over its snapshot
+        self._recorded: Optional[List[tuple]] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def _advance(self, today: date) -> None:
+        """Zero the slots of days that entered the window since the last call."""
+        if today <= self._today:
+            return
+        for offset in range(min((today - self._today).days, WINDOW_DAYS)):
+            self._clear(_slot(today - timedelta(days=offset)))
+        self._today = today
+
+    def _clear(self, slot: int) -> None:
+        for values in self._counts.values():
+            values[slot] = 0
+        for sums, counts in self._ratings.values():
+            sums[slot] = 0.0
+            counts[slot] = 0
+
+    def _add(self, product_id: int, interaction_type: str, day: date,
+             count: int, rating_sum: float, rating_count: int) -> None:
+        slot = _slot(day)
+        values = self._counts.get((product_id, interaction_type))
+        if values is None:
+            values = self._counts[product_id, interaction_type] = array("i", [0]) * WINDOW_DAYS
+        values[slot] += count
+        if interaction_type == "rating" and rating_count:
+            ratings = self._ratings.get(product_id)
+            if ratings is None:
+                ratings = self._ratings[product_id] = (
+                    array("d", [0.0]) * WINDOW_DAYS, array("i", [0]) * WINDOW_DAYS
+                )
+            ratings[0][slot] += rating_sum
+            ratings[1][slot] += rating_count
+
+    def _rows(self, conn, since: date):
+        table = ProductDailyInteractions.__table__
+        return conn.execution_options(yield_per=LOAD_CHUNK_SIZE).execute(
+            select(
+                table.c.product_id,
+                table.c.interaction_type,
+                table.c.day,
+                table.c.count,
+                table.c.rating_sum,
+                table.c.rating_count,
+            ).where(table.c.day >= since)
+        )
+
+    def load(self) -> None:
+        """Rebuild every counter from the rollups."""
+        today = datetime.utcnow().date()
+        with self._lock, self.engine.connect() as conn:
+            self._counts.clear()
+            self._ratings.clear()
+            self._today = today
+            for row in self._rows(conn, today - timedelta(days=WINDOW_DAYS - 1)):
+                self._add(*row)
+            self.ready = True
+
+    def sync(self) -> None:
+        """Replace the last ``SYNC_DAYS`` days with the rollups' values.
+
+        ``apply`` and ``forget`` calls made while the rollups are read are
+        recorded and replayed after the replacement; calls made before were
+        committed before the read, so the snapshot already has them.
+        """
+        since = datetime.utcnow().date() - timedelta(days=SYNC_DAYS - 1)
+        with self._lock:
+            self._recorded = []
+        try:
+            with self.engine.connect() as conn:
+                rows = self._rows(conn, since).all()
+                product_ids = set(conn.scalars(select(Product.id)))
+        except Exception:
+            with self._lock:
+                self._recorded = None
+            raise
+        with self._lock:
+            recorded, self._recorded = self._recorded, None
+            self._advance(since + timedelta(days=SYNC_DAYS - 1))
+            for offset in range(SYNC_DAYS):
+                self._clear(_slot(since + timedelta(days=offset)))
+            for row in rows:
+                self._add(*row)
+            for product_id in {product_id for product_id, _ in self._counts} - product_ids:
+                self._forget(product_id)
+            for change in recorded:
+                if change[0] == "forget":
+                    self._forget(change[1])
+                else:  # older days were not replaced and already count the events
+                    self._count(change[1], change[2], since)
+
+    def apply(self, events: Iterable[dict], sign: int = 1) -> None:
+        """Count committed events (``sign=-1`` removes them); takes rollup event dicts."""
+        if not self.ready:
+            return
+        events = list(events)
+        with self._lock:
+            self._advance(datetime.utcnow().date())
+            self._count(events, sign)
+            if self._recorded is not None:
+                self._recorded.append(("apply", events, sign))
+
+    def _count(self, events: List[dict], sign: int, since: date = date.min) -> None:
+        for event in events:
+            day = event["timestamp"].date()
+            if day < since or not 0 <= (self._today - day).days < WINDOW_DAYS:
+                continue
+            rating = event["rating_value"]
+            if rating is None:
+                self._add(event["product_id"], event["interaction_type"], day, sign, 0.0, 0)
+            else:
+                self._add(event["product_id"], event["interaction_type"], day, sign, sign * rating, sign)
+
+    def totals(self, product_id: int, days_back: int) -> Optional[Tuple[Dict[str, int], Optional[float]]]:
+        """Per-type counts and average rating since ``days_back`` days ago.
+
+        Matches summing the product's daily rollups over the same whole UTC
+        days. None if the product has no counters (no activity in the window).
+        """
+        if not 0 <= days_back < WINDOW_DAYS:
+            raise ValueError(f"days_back must be between 0 and {WINDOW_DAYS - 1}")
+        with self._lock:
+            self._advance(datetime.utcnow().date())
+            start, end = _slot(self._today - timedelta(days=days_back)), _slot(self._today)
+            rows = {kind: self._counts.get((product_id, kind)) for kind in INTERACTION_TYPES}
+            if not any(values is not None for values in rows.values()):
+                return None
+            counts = {
+                kind: int(_window_sum(values, start, end)) if values is not None else 0
+                for kind, values in rows.items()
+            }
+            average_rating = None
+            ratings = self._ratings.get(product_id)
+            if ratings is not None:
+                rating_count = _window_sum(ratings[1], start, end)
+                if rating_count:
+                    average_rating = _window_sum(ratings[0], start, end) / rating_count
+        return counts, average_rating
+
+    def forget(self, product_id: int) -> None:
+        """Drop a deleted product's counters."""
+        with self._lock:
+            self._forget(product_id)
+            if self._recorded is not None:
+                self._recorded.append(("forget", product_id))
+
+    def _forget(self, product_id: int) -> None:
+        for kind in INTERACTION_TYPES:
+            self._counts.pop((product_id, kind), None)
+        self._ratings.pop(product_id, None)
+
+    def start(self) -> None:
+        """Load the counters and start the periodic sync."""
+        if self._thread is not None:
+            return
+        self.load()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="interaction-counters", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception as exc:  # keep serving the last good counts through database outages
+                logger.warning("Interaction counter sync failed: %s", exc)
+
+
+@lru_cache()
+def get_interaction_counters() -> ProductInteractionCounters:
+    """Process-wide counters configured from settings."""
+    return ProductInteractionCounters(engine, sync_interval=get_settings().interaction_counters_sync_interval)
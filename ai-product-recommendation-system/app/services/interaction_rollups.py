@@ -0,0 +1,113 @@
+"""Daily interaction rollups for the analytics endpoints.
+
+Every ingest path adds its events to three tables keyed by day: user x type,
+product x type and user x category x type. Counts are applied with
+``INSERT ... ON CONFLICT DO UPDATE SET count = count + excluded.count``, so
+concurrent writers never read-modify-write a row, and a ``days_back`` window
+is answered by summing at most one row per day per key instead of scanning
+raw events.
+
+Days are UTC calendar days, so a window covers whole days: ``days_back=30``
+counts everything since midnight 30 days ago. Categories are recorded as
+they were when the event happened: each interaction row stores its own, which
+deletes and rebuilds use.
+"""
+
+from collections import defaultdict
+from typing import Collection, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+
+from ..models.interaction_rollup import (
+    ProductDailyInteractions,
+    UserCategoryDailyInteractions,
+    UserDailyInteractions,
+)
+from ..models.user_interaction import UserInteraction
+
+REBUILD_CHUNK_SIZE = 10000
+
+# Events are dicts with these keys (rating_value may be None)
+EVENT_FIELDS = ("user_id", "product_id", "category", "interaction_type", "timestamp", "rating_value")
+
+
+def _upsert(conn: Connection, model, rows: list) -> None:
+    if not rows:
+        return
+    table = model.__table__
+    keys = [column.name for column in table.primary_key]
+    statement = (postgresql if conn.dialect.name == "postgresql" else sqlite).insert(table)
+    excluded = statement.excluded
+    totals = [name for name in rows[0] if name not in keys]
+    conn.execute(
+        statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: table.c[name] + excluded[name] for name in totals},
+        ),
+        rows,
+    )
+
+
+def apply_rollups(conn: Connection, events: Iterable[dict], sign: int = 1) -> None:
+    """Add events to (or with ``sign=-1`` remove them from) the daily rollups."""
+    users = defaultdict(lambda: [0, 0.0, 0])
+    products = defaultdict(lambda: [0, 0.0, 0])
+    categories = defaultdict(int)
+    for event in events:
+        day = event["timestamp"].date()
+        kind = event["interaction_type"]
+        rating = event["rating_value"]
+        for totals in (users[event["user_id"], kind, day], products[event["product_id"], kind, day]):
+            totals[0] += sign
+            if rating is not None:
+                totals[1] += sign * rating
+                totals[2] += sign
+        if event["category"] is not None:
+            categories[event["user_id"], event["category"], kind, day] += sign
+
+    def daily(id_name: str, groups: dict) -> list:
+        return [
+            {id_name: key, "interaction_type": kind, "day": day,
+             "count": count, "rating_sum": rating_sum, "rating_count": rating_count}
+            for (key, kind, day), (count, rating_sum, rating_count) in groups.items()
+        ]
+
+    _upsert(conn, UserDailyInteractions, daily("user_id", users))
+    _upsert(conn, ProductDailyInteractions, daily("product_id", products))
+    _upsert(conn, UserCategoryDailyInteractions, [
+        {"user_id": user_id, "category": category, "interaction_type": kind, "day": day, "count": count}
+        for (user_id, category, kind, day), count in categories.items()
+    ])
+
+
+def delete_product_interactions(conn, product_ids: Collection[int]) -> None:
+    """Delete the interactions and per-product rollups of products being deleted.
+
+    This is what ``ON DELETE CASCADE`` does where foreign keys are enforced;
+    SQLite doesn't enforce them. Per-user rollups keep counting the events,
+    as they do after a cascade. Takes a Connection or Session, in the
+    transaction that deletes the products.
+    """
+    for model in (UserInteraction, ProductDailyInteractions):
+        conn.execute(model.__table__.delete().where(model.__table__.c.product_id.in_(product_ids)))
+
+
+def rebuild_rollups(conn: Connection) -> None:
+    """Recompute all rollups from raw interactions, e.g. after they drifted."""
+    for model in (UserDailyInteractions, ProductDailyInteractions, UserCategoryDailyInteractions):
+        conn.execute(model.__table__.delete())
+
+    rows = conn.execution_options(yield_per=REBUILD_CHUNK_SIZE).execute(
+        select(
+            UserInteraction.user_id,
+            UserInteraction.product_id,
+            UserInteraction.category,
+            UserInteraction.interaction_type,
+            UserInteraction.timestamp,
+            UserInteraction.rating_value,
+        )
+    )
+    for chunk in rows.partitions():
+        apply_rollups(conn, [dict(zip(EVENT_FIELDS, row)) for row in chunk])
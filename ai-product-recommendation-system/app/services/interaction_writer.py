@@ -0,0 +1,221 @@
+"""Buffered, batched interaction ingestion.
+
+``POST /interactions/batch`` hands events to an in-process ``InteractionWriter``
+and returns at once. A background thread drains the buffer whenever it
+reaches ``interaction_batch_size`` events or ``interaction_flush_interval``
+seconds have passed, writing each drain in one transaction: a multi-row
+insert plus bulk popularity and daily rollup updates. Committed events are
+then added to the in-process stats counters.
+
+The buffer is bounded: ``submit`` refuses a request that would overflow it
+and the endpoint answers 503, so a slow database pushes back on clients
+instead of growing memory. The bound counts batches being written or
+waiting for a retry, so requeued events never push it past the limit.
+
+A failed batch is retried before newer events. While the database is
+unreachable or locked it is retried as is; a batch that keeps failing for
+any other reason (e.g. a row referencing a deleted user) is split in half
+after ``interaction_max_attempts`` tries, down to the single row at fault,
+which is logged and dropped. Events carry a client- or server-generated
+``event_id``; inserts skip ids already stored, so retrying a request whose
+events were accepted does not record them twice.
+
+Accepted events live only in memory until flushed. They are drained on
+shutdown, but a crashed process loses up to one buffer of events, which is
+the trade-off this path makes for view-style telemetry.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import Deque, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import DisconnectionError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+
+from ..core.config import get_settings
+from ..core.database import engine
+from ..models.product import Product
+from ..models.user_interaction import UserInteraction
+from . import product_popularity
+from .interaction_counters import get_interaction_counters
+from .interaction_rollups import apply_rollups
+
+logger = logging.getLogger(__name__)
+
+# Columns of inserted rows needed for popularity and the daily rollups
+ROLLUP_COLUMNS = ("user_id", "product_id", "category", "interaction_type", "timestamp", "rating_value")
+
+
+def _insert_statement(dialect: str):
+    table = UserInteraction.__table__
+    statement = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+    return statement.on_conflict_do_nothing(index_elements=[table.c.event_id]).returning(
+        *(table.c[name] for name in ROLLUP_COLUMNS)
+    )
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Errors that say nothing about the rows: outages, lock and pool timeouts."""
+    return isinstance(exc, (DisconnectionError, OperationalError, PoolTimeoutError))
+
+
+class InteractionWriter:
+    """Bounded buffer of interaction rows with a background bulk writer."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+        max_attempts: int = 3,
+    ):
+        if engine.dialect.name not in ("sqlite", "postgresql"):
+            raise ValueError(f"Batched interaction writes are not supported on {engine.dialect.name}")
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.stats = {
+            "accepted": 0, "rejected": 0, "written": 0, "duplicates": 0,
+            "dropped": 0, "failures": 0, "dead_lettered": 0,
+        }
+        self._pending: List[dict] = []
+        # Failed batches with their failure counts, written before _pending
+        self._retry: Deque[Tuple[List[dict], int]] = deque()
+        self._held = 0  # accepted rows not yet stored or dropped
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+
+    def submit(self, rows: List[dict]) -> bool:
+        """Queue rows for writing; False (nothing queued) if the buffer is full."""
+        with self._condition:
+            if self._held + len(rows) > self.max_pending:
+                self.stats["rejected"] += len(rows)
+                return False
+            self._pending.extend(rows)
+            self._held += len(rows)
+            self.stats["accepted"] += len(rows)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+            return True
+
+    def pending(self) -> int:
+        """Accepted rows not yet stored, including batches being written or retried."""
+        with self._condition:
+            return self._held
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="interaction-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write whatever is still buffered."""
+        if self._thread is not None:
+            with self._condition:
+                self._stopping = True
+                self._condition.notify()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """Write everything buffered now; returns the number of rows taken."""
+        taken = 0
+        while True:
+            with self._condition:
+                if self._retry:
+                    batch, failures = self._retry.popleft()
+                else:
+                    batch, failures = self._pending[:self.batch_size], 0
+                    del self._pending[:self.batch_size]
+            if not batch:
+                return taken
+            taken += len(batch)
+            self._write(batch, failures)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._stopping and len(self._pending) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception as exc:  # keep the writer alive through database outages
+                logger.warning("Interaction flush failed, retrying: %s", exc)
+                time.sleep(self.flush_interval)
+
+    def _requeue(self, batch: List[dict], failures: int, exc: Exception) -> None:
+        """Queue a failed batch to be retried first, split or dead-lettered."""
+        retries = [(batch, failures)]
+        if failures >= self.max_attempts and not _is_transient(exc):
+            if len(batch) == 1:
+                self.stats["dead_lettered"] += 1
+                logger.error("Dropping interaction after %d failed writes: %r (%s)", failures, batch[0], exc)
+                with self._condition:
+                    self._held -= 1
+                return
+            # Halves have already failed together: split again on their first failure
+            middle = len(batch) // 2
+            retries = [(batch[:middle], self.max_attempts - 1), (batch[middle:], self.max_attempts - 1)]
+        with self._condition:
+            self._retry.extendleft(reversed(retries))
+
+    def _write(self, batch: List[dict], failures: int = 0) -> None:
+        try:
+            with self._write_lock, self.engine.begin() as conn:
+                product_ids = {row["product_id"] for row in batch}
+                categories = dict(conn.execute(
+                    select(Product.id, Product.category).where(Product.id.in_(product_ids))
+                ).all())
+                rows = [
+                    {**row, "category": categories[row["product_id"]]}
+                    for row in batch if row["product_id"] in categories
+                ]
+                inserted = conn.execute(_insert_statement(conn.dialect.name), rows).all() if rows else []
+
+                events = [dict(zip(ROLLUP_COLUMNS, row)) for row in inserted]
+                scores = defaultdict(float)
+                for event in events:
+                    scores[event["product_id"]] += product_popularity.contribution(
+                        event["interaction_type"], event["timestamp"]
+                    )
+                product_popularity.add_scores(conn, scores)
+                apply_rollups(conn, events)
+        except Exception as exc:
+            self.stats["failures"] += 1
+            self._requeue(batch, failures + 1, exc)
+            raise
+
+        with self._condition:
+            self._held -= len(batch)
+        self.stats["dropped"] += len(batch) - len(rows)
+        self.stats["duplicates"] += len(rows) - len(inserted)
+        self.stats["written"] += len(inserted)
+        get_interaction_counters().apply(events)
+
+
+@lru_cache()
+def get_interaction_writer() -> InteractionWriter:
+    """Process-wide writer configured from settings."""
+    settings = get_settings()
+    return InteractionWriter(
+        engine,
+        batch_size=settings.interaction_batch_size,
+        flush_interval=settings.interaction_flush_interval,
+        max_pending=settings.interaction_max_pending,
+        max_attempts=settings.interaction_max_attempts,
+    )
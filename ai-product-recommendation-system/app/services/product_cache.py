@@ -0,0 +1,96 @@
+"""Read-through caching for the catalog endpoints.
+
+Keys live under ``products:`` and are grouped by endpoint, so a product write
+drops only the groups it can change: its own detail entry, the featured and
+on-sale lists it was or is part of, category lists when its category moves,
+and cached searches and facet counts.
+
+The deletes reach only the cache they run against. With the default
+in-process cache, other workers keep serving their copies until the entry's
+TTL runs out, even though list ETags (derived from the ``product_stats``
+version) already changed; run several workers with ``cache_backend=redis``.
+"""
+
+from typing import Callable, Optional
+
+from ..core.cache import get_cache
+from ..core.config import get_settings
+from ..models.product import Product as ProductModel
+from ..schemas.product import Product
+
+PREFIX = "products:"
+
+# Product fields that decide membership or order of a cached group
+LISTING_FIELDS = ("category", "subcategory", "is_featured", "is_on_sale")
+
+
+def product_key(product_id: int) -> str:
+    return f"{PREFIX}detail:{product_id}"
+
+
+def group_key(group: str, *parts) -> str:
+    return ":".join([f"{PREFIX}{group}", *(str(part) for part in parts)])
+
+
+def serialize(products) -> list:
+    """ORM products as JSON-ready dicts in the response schema."""
+    return [Product.model_validate(product).model_dump(mode="json") for product in products]
+
+
+def read_through(key: str, ttl: int, load: Callable):
+    """Return the cached value for ``key``, calling ``load`` on a miss.
+
+    ``None`` results (e.g. not found) are not cached.
+    """
+    cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        if value is not None:
+            cache.set(key, value, ttl)
+    return value
+
+
+def catalog_ttl() -> int:
+    return get_settings().catalog_cache_ttl
+
+
+def search_ttl() -> int:
+    return get_settings().search_cache_ttl
+
+
+def listing_snapshot(product: ProductModel) -> dict:
+    """The fields that place a product in cached groups, taken before a write."""
+    return {field: getattr(product, field) for field in LISTING_FIELDS}
+
+
+def invalidate_product(product_id: int, before: Optional[dict], after: Optional[dict]) -> None:
+    """Drop the cache entries a create (``before=None``), update or delete
+    (``after=None``) can change. Call after the write is committed."""
+    cache = get_cache()
+    cache.delete(product_key(product_id))
+    states = [state for state in (before, after) if state is not None]
+
+    # Featured and on-sale lists show full products, so any edit of a
+    # member matters, as does joining or leaving the list
+    if any(state["is_featured"] for state in states):
+        cache.delete_prefix(group_key("featured"))
+    if any(state["is_on_sale"] for state in states):
+        cache.delete_prefix(group_key("on-sale"))
+
+    category_changed = before is None or after is None or (
+        before["category"] != after["category"] or before["subcategory"] != after["subcategory"]
+    )
+    if category_changed:
+        cache.delete(group_key("categories"))
+        # Subcategory lookups match categories by substring, so no single key
+        cache.delete_prefix(group_key("subcategories"))
+
+    # Any write can move counts in any filter combination
+    cache.delete_prefix(group_key("facets"))
+    cache.delete_prefix(group_key("search"))
+
+
+def invalidate_all() -> None:
+    """Drop every product cache entry, e.g. after a bulk import."""
+    get_cache().delete_prefix(PREFIX)
@@ -0,0 +1,84 @@
+"""Facet counts for the product filter sidebar.
+
+Every facet comes from one GROUP BY over the filtered products: rows are
+grouped by category, subcategory, price bucket, rating bucket and the three
+flags, and the (few) groups are rolled up into per-facet counts in Python.
+"""
+
+from collections import Counter
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import case, func
+
+from ..models.product import Product
+
+# (min inclusive, max exclusive); None means open-ended
+PRICE_RANGES: Sequence[Tuple[float, Optional[float]]] = (
+    (0, 25), (25, 50), (50, 100), (100, 250), (250, 500), (500, None),
+)
+RATING_RANGES: Sequence[Tuple[float, Optional[float]]] = (
+    (0, 1), (1, 2), (2, 3), (3, 4), (4, None),
+)
+
+
+def _bucket(column, ranges) -> case:
+    """Index of the range a value falls in."""
+    return case(
+        *((column < upper, index) for index, (_, upper) in enumerate(ranges) if upper is not None),
+        else_=len(ranges) - 1,
+    )
+
+
+def _label(lower: float, upper: Optional[float]) -> str:
+    return f"{lower:g}+" if upper is None else f"{lower:g}-{upper:g}"
+
+
+def _ranges(counts: Counter, ranges) -> list:
+    return [
+        {"label": _label(lower, upper), "min": lower, "max": upper, "count": counts[index]}
+        for index, (lower, upper) in enumerate(ranges)
+    ]
+
+
+def _values(counts: Counter) -> list:
+    return [
+        {"value": value, "count": count}
+        for value, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+def compute_facets(query) -> dict:
+    """Facet counts for the products matched by ``query`` (a filtered products query)."""
+    price_bucket = _bucket(Product.price, PRICE_RANGES)
+    rating_bucket = _bucket(func.coalesce(Product.rating, 0.0), RATING_RANGES)
+    in_stock = case((Product.quantity_in_stock > 0, True), else_=False)
+    dimensions = (
+        Product.category, Product.subcategory, price_bucket, rating_bucket,
+        Product.is_on_sale, Product.is_featured, in_stock,
+    )
+    groups = query.with_entities(*dimensions, func.count()).group_by(*dimensions).all()
+
+    total = 0
+    categories, subcategories, prices, ratings = Counter(), Counter(), Counter(), Counter()
+    flags = Counter()
+    for category, subcategory, price, rating, on_sale, featured, stocked, count in groups:
+        total += count
+        categories[category] += count
+        if subcategory:
+            subcategories[subcategory] += count
+        prices[price] += count
+        ratings[rating] += count
+        flags["on_sale"] += count if on_sale else 0
+        flags["featured"] += count if featured else 0
+        flags["in_stock"] += count if stocked else 0
+
+    return {
+        "total": total,
+        "categories": _values(categories),
+        "subcategories": _values(subcategories),
+        "price_ranges": _ranges(prices, PRICE_RANGES),
+        "rating_ranges": _ranges(ratings, RATING_RANGES),
+        "on_sale": flags["on_sale"],
+        "featured": flags["featured"],
+        "in_stock": flags["in_stock"],
+    }
@@ -0,0 +1,59 @@
+"""Column projections for product list endpoints.
+
+List endpoints select plain column tuples instead of ORM objects, which
+skips the identity map and Pydantic validation, and may narrow the columns
+with ``fields=``. Rows come out as dicts in the ``Product`` schema's shape.
+"""
+
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+from ..models.product import Product as ProductModel
+from ..schemas.product import Product
+
+# Response field order, as the Product schema serializes it
+PRODUCT_FIELDS = tuple(Product.model_fields)
+
+_DATETIME_FIELDS = frozenset(
+    name for name in PRODUCT_FIELDS
+    if getattr(ProductModel, name).type.python_type is datetime
+)
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validate a comma-separated ``fields=`` value; ``id`` is always included."""
+    if not fields:
+        return PRODUCT_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(PRODUCT_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    requested.add("id")
+    return tuple(name for name in PRODUCT_FIELDS if name in requested)
+
+
+def columns(fields: Sequence[str]) -> list:
+    return [getattr(ProductModel, name) for name in fields]
+
+
+def rows_to_dicts(rows, fields: Sequence[str]) -> list:
+    """Turn column tuples (in ``fields`` order) into JSON-ready dicts."""
+    dates = [index for index, name in enumerate(fields) if name in _DATETIME_FIELDS]
+    items = []
+    for row in rows:
+        values = list(row[:len(fields)])
+        for index in dates:
+            if values[index] is not None:
+                values[index] = values[index].isoformat()
+        items.append(dict(zip(fields, values)))
+    return items
+
+
+def fields_key(fields: Sequence[str]) -> str:
+    """Short cache-key part for a projection."""
+    return "all" if tuple(fields) == PRODUCT_FIELDS else ",".join(fields)
@@ -0,0 +1,313 @@
+"""Streaming bulk import of product feeds.
+
+Feeds are a JSON array or NDJSON, read incrementally in fixed-size chunks,
+validated row by row and upserted in batches with
+``INSERT ... ON CONFLICT (id) DO UPDATE``. Unchanged rows are skipped by the
+upsert's ``WHERE``, so re-importing a feed only writes what differs; with
+``delete_missing`` products absent from the feed are removed, which syncs
+the table to the feed without clearing it first. Pruning is refused for an
+empty feed and skipped when any record failed validation.
+
+Rows replace whole products: fields missing from a row get their defaults.
+Each batch commits on its own, so an interrupted import keeps its progress.
+"""
+
+import codecs
+import io
+import json
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models.product import Product
+from ..schemas.product import ProductCreate
+from . import product_cache
+from .interaction_counters import get_interaction_counters
+from .interaction_rollups import delete_product_interactions
+from .product_stats import sync_product_stats
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_BATCH_SIZE = 1000
+MAX_ERROR_SAMPLES = 20
+
+# Feed keys that differ from the model's column names (mock_data.json style)
+FEED_ALIASES = {"product_id": "id", "product_name": "name"}
+
+IMPORT_FIELDS = ("id",) + tuple(ProductCreate.model_fields)
+UPDATE_FIELDS = tuple(ProductCreate.model_fields)
+
+
+@lru_cache(maxsize=8192)
+def _parse_date_string(value: str) -> datetime:
+    if "/" in value:  # the feed's MM/DD/YYYY; strptime is slow enough to matter here
+        month, day, year = value.split("/")
+        return datetime(int(year), int(month), int(day))
+    return datetime.fromisoformat(value)
+
+
+def _parse_release_date(value):
+    """Accept ISO dates and the feed's ``MM/DD/YYYY``."""
+    if not value or isinstance(value, datetime):
+        return value or None
+    return _parse_date_string(value)
+
+
+def map_record(item: dict) -> dict:
+    """Validate one feed record into a full row of product columns."""
+    data = {FEED_ALIASES.get(key, key): value for key, value in item.items()}
+    data = {key: value for key, value in data.items() if key in IMPORT_FIELDS and value is not None}
+    if "release_date" in data:
+        try:
+            data["release_date"] = _parse_release_date(data["release_date"])
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"release_date: {exc}")
+
+    row = ProductCreate.model_validate(data).model_dump()
+    row["id"] = data.get("id")
+    if row["id"] is not None and not isinstance(row["id"], int):
+        raise ValueError("id must be an integer")
+    return row
+
+
+def _iter_json_array(stream) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array from a text stream."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof, started = "", 0, False, False
+
+    def fill() -> None:
+        nonlocal buffer, pos, eof
+        chunk = stream.read(CHUNK_SIZE)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            fill()
+            continue
+
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError("Expected a JSON array of products")
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        if end == len(buffer) and not eof:  # a number may continue in the next chunk
+            fill()
+            continue
+        pos = end
+        yield item
+
+
+def _iter_ndjson(stream) -> Iterator[dict]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_records(stream, fmt: Optional[str] = None) -> Iterator[dict]:
+    """Yield feed records from a binary stream.
+
+    ``fmt`` is ``json`` or ``ndjson``; when omitted it is sniffed from the
+    first non-blank character (``[`` for a JSON array).
+    """
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)
+    if fmt is None:
+        head = stream.peek(64)
+        head = head[len(codecs.BOM_UTF8):] if head.startswith(codecs.BOM_UTF8) else head
+        fmt = "json" if head.lstrip()[:1] == b"[" else "ndjson"
+
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    return _iter_json_array(text) if fmt == "json" else _iter_ndjson(text)
+
+
+def _upsert_statement(dialect: str, now: datetime):
+    table = Product.__table__
+    # Timestamps are one statement-level value per batch, not a parameter per row
+    statement = (postgresql if dialect == "postgresql" else sqlite).insert(table).values(
+        created_at=now, updated_at=now
+    )
+
+    excluded = statement.excluded
+    changed = or_(*(table.c[field].is_distinct_from(excluded[field]) for field in UPDATE_FIELDS))
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={**{field: excluded[field] for field in UPDATE_FIELDS}, "updated_at": now},
+        where=changed,
+    ).returning(table.c.id)
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        )
+    return str(exc)
+
+
+class ProductImporter:
+    """Accumulates validated rows and writes them in upsert batches."""
+
+    def __init__(self, engine: Engine, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.engine = engine
+        self.batch_size = batch_size
+        if engine.dialect.name not in ("sqlite", "postgresql"):
+            raise ValueError(f"Bulk upsert is not supported on {engine.dialect.name}")
+        self.seen_ids = set()
+        self.started = time.perf_counter()
+        self.stats = {
+            "received": 0,
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "deleted": 0,
+            "errors": 0,
+            "error_samples": [],
+            "delete_skipped": None,
+        }
+        self._keyed = {}
+        self._unkeyed = []
+
+    def add(self, item) -> None:
+        self.stats["received"] += 1
+        raw_id = item.get("id", item.get("product_id")) if isinstance(item, dict) else None
+        if isinstance(raw_id, int):
+            self.seen_ids.add(raw_id)  # never prune a product whose row failed validation
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("record is not an object")
+            row = map_record(item)
+        except (ValidationError, ValueError) as exc:
+            self.stats["errors"] += 1
+            if len(self.stats["error_samples"]) < MAX_ERROR_SAMPLES:
+                self.stats["error_samples"].append({"record": self.stats["received"], "error": _describe(exc)})
+            return
+
+        if row["id"] is None:
+            self._unkeyed.append(row)
+        else:
+            self._keyed[row["id"]] = row  # last occurrence wins within a batch
+        if len(self._keyed) + len(self._unkeyed) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._keyed and not self._unkeyed:
+            return
+        rows, unkeyed = list(self._keyed.values()), self._unkeyed
+        self._keyed, self._unkeyed = {}, []
+        now = datetime.utcnow()
+
+        with self.engine.begin() as conn:
+            if rows:
+                existing = set(conn.scalars(
+                    select(Product.id).where(Product.id.in_([row["id"] for row in rows]))
+                ))
+                upsert = _upsert_statement(conn.dialect.name, now)
+                changed = len(conn.execute(upsert, rows).all())
+                inserted = len(rows) - len(existing)
+                self.stats["inserted"] += inserted
+                self.stats["updated"] += changed - inserted
+                self.stats["unchanged"] += len(rows) - changed
+            if unkeyed:
+                for row in unkeyed:
+                    del row["id"]
+                statement = insert(Product.__table__).values(created_at=now, updated_at=now)
+                inserted = conn.scalars(statement.returning(Product.id), unkeyed).all()
+                self.seen_ids.update(inserted)  # new products are part of the feed
+                self.stats["inserted"] += len(inserted)
+
+    def delete_missing(self) -> None:
+        """Delete products whose ids did not appear in the feed, with their
+        interactions, rollups and in-memory counters.
+
+        Skipped when records failed validation: a bad row may have carried
+        the id of a product that should stay.
+        """
+        if self.stats["errors"]:
+            self.stats["delete_skipped"] = f"{self.stats['errors']} records failed validation"
+            return
+        with self.engine.begin() as conn:
+            stale = [
+                product_id for product_id in conn.scalars(select(Product.id))
+                if product_id not in self.seen_ids
+            ]
+            for start in range(0, len(stale), self.batch_size):
+                chunk = stale[start:start + self.batch_size]
+                delete_product_interactions(conn, chunk)
+                conn.execute(Product.__table__.delete().where(Product.id.in_(chunk)))
+        counters = get_interaction_counters()
+        for product_id in stale:
+            counters.forget(product_id)
+        self.stats["deleted"] = len(stale)
+
+    def summary(self) -> dict:
+        seconds = time.perf_counter() - self.started
+        return {
+            **self.stats,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(self.stats["received"] / seconds) if seconds else 0,
+        }
+
+
+def import_products(
+    stream,
+    engine: Engine,
+    fmt: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    delete_missing: bool = False,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Upsert every product in a JSON/NDJSON feed and return import counts.
+
+    ``progress`` is called with the running summary after each batch. Product
+    caches and the materialized stats row are refreshed at the end, also when
+    the feed turns out to be malformed part way.
+    """
+    importer = ProductImporter(engine, batch_size)
+    try:
+        try:
+            for item in iter_records(stream, fmt):
+                importer.add(item)
+                if progress is not None and importer.stats["received"] % batch_size == 0:
+                    progress(importer.summary())
+        except ValueError as exc:
+            # Batches before the bad input are already committed; don't prune on a partial feed
+            importer.flush()
+            raise ValueError(f"Malformed feed after {importer.stats['received']} records: {exc}")
+        if delete_missing and not importer.stats["received"]:
+            raise ValueError("Refusing to delete missing products: the feed is empty")
+        importer.flush()
+        if delete_missing:
+            importer.delete_missing()
+    finally:
+        with Session(engine) as db:
+            sync_product_stats(db)
+            db.commit()
+        product_cache.invalidate_all()
+
+    summary = importer.summary()
+    if progress is not None:
+        progress(summary)
+    return summary
@@ -0,0 +1,115 @@
+"""Time-decayed product popularity.
+
+Each interaction contributes its type's weight, halved every
+``popularity_half_life_days``. Rather than decaying every product's score as
+time passes, contributions are stored scaled up by ``2 ** (age of the event
+since EPOCH / half-life)``: all scores shrink by the same factor over time, so
+the stored value ranks products exactly like the decayed one. Logging an
+interaction is then a single ``popularity = popularity + x`` on its product,
+and sorting by popularity is a scan of ``ix_products_popularity_id``.
+
+Changing the weights or the half-life only affects new events until
+``rebuild_popularity`` recomputes every score from ``user_interactions``.
+"""
+
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..models.product import Product
+from ..models.user_interaction import UserInteraction
+
+# Fixed origin of the scale; scores grow by 2x per half-life after it. A float
+# holds about 1000 half-lives (19 years at 7 days): move EPOCH forward and
+# rebuild well before then.
+EPOCH = datetime(2024, 1, 1)
+
+INTERACTION_WEIGHTS = {
+    "view": 1.0,
+    "like": 3.0,
+    "rating": 3.0,
+    "add_to_cart": 5.0,
+    "purchase": 10.0,
+}
+
+# Score updates are not product edits: suppress updated_at's onupdate so
+# product ETags and Last-Modified don't change with every interaction
+KEEP_UPDATED_AT = {"updated_at": Product.__table__.c.updated_at}
+
+# Listings sorted by popularity change with every interaction; their ETags
+# roll over this often instead of on every logged event
+RANKING_WINDOW_SECONDS = 60
+
+
+def _half_lives(timestamp: datetime) -> float:
+    half_life = get_settings().popularity_half_life_days * 86400
+    return (timestamp - EPOCH).total_seconds() / half_life
+
+
+def contribution(interaction_type: str, timestamp: Optional[datetime] = None) -> float:
+    """Stored-score increment for one interaction at ``timestamp``."""
+    weight = INTERACTION_WEIGHTS.get(interaction_type, 0.0)
+    return weight * 2.0 ** _half_lives(timestamp or datetime.utcnow())
+
+
+def record_interaction(db: Session, product_id: int, interaction_type: str,
+                       timestamp: Optional[datetime] = None, sign: int = 1) -> None:
+    """Add (or with ``sign=-1`` remove) one interaction's share of a product's score.
+
+    Runs in the caller's transaction so the score commits with the interaction.
+    """
+    delta = sign * contribution(interaction_type, timestamp)
+    if delta:
+        db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(popularity=Product.popularity + delta, **KEEP_UPDATED_AT)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def add_scores(conn: Connection, scores: Dict[int, float]) -> None:
+    """Add precomputed contributions to many products in one executemany."""
+    if not scores:
+        return
+    table = Product.__table__
+    conn.execute(
+        update(table)
+        .where(table.c.id == bindparam("product_id"))
+        .values(popularity=table.c.popularity + bindparam("delta"), **KEEP_UPDATED_AT),
+        [{"product_id": product_id, "delta": delta} for product_id, delta in scores.items()],
+    )
+
+
+def ranking_window() -> int:
+    """Current ETag window for popularity-sorted listings."""
+    return int(time.time() // RANKING_WINDOW_SECONDS)
+
+
+def rebuild_popularity(conn: Connection, batch_size: int = 1000) -> int:
+    """Recompute every product's score from its interactions; returns products scored.
+
+    Takes a Connection so Alembic migrations can backfill with it.
+    """
+    scores = defaultdict(float)
+    rows = conn.execution_options(yield_per=10000).execute(
+        select(UserInteraction.product_id, UserInteraction.interaction_type, UserInteraction.timestamp)
+    )
+    for product_id, interaction_type, timestamp in rows:
+        scores[product_id] += contribution(interaction_type, timestamp)
+
+    conn.execute(update(Product).values(popularity=0.0, **KEEP_UPDATED_AT))
+    items = [{"product_id": product_id, "score": score} for product_id, score in scores.items()]
+    table = Product.__table__
+    statement = update(table).where(table.c.id == bindparam("product_id")).values(
+        popularity=bindparam("score"), **KEEP_UPDATED_AT
+    )
+    for start in range(0, len(items), batch_size):
+        conn.execute(statement, items[start:start + batch_size])
+    return len(items)
@@ -0,0 +1,84 @@
+"""Full-text search over products.
+
+SQLite uses an FTS5 table kept in sync by triggers; PostgreSQL uses a
+generated ``tsvector`` column with a GIN index. Both are created by the
+``0003_product_search`` migration. Other databases fall back to ``ILIKE``
+filters.
+"""
+
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import Float, Integer, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+
+from ..models.product import Product
+
+SEARCH_COLUMNS = ("name", "description", "manufacturer", "category", "subcategory")
+
+# Relative column weights in products_fts column order (SEARCH_COLUMNS):
+# name matches count most, then category fields
+FTS5_WEIGHTS = (10.0, 1.0, 3.0, 2.0, 2.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(search: str) -> list:
+    return _TOKEN_RE.findall(search.lower())
+
+
+def rebuild_product_search(engine: Engine) -> None:
+    """Re-index every product, e.g. after rows were changed with triggers disabled."""
+    table = Product.__tablename__
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+def _ranked_matches(db: Session, search: str):
+    """Subquery of (product_id, rank) for matching products; higher rank is better."""
+    tokens = _tokens(search)
+    if not tokens:
+        return None
+    table = Product.__tablename__
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        # Quoted prefix terms, so user input can't inject FTS5 query syntax
+        match = " ".join(f'"{token}"*' for token in tokens)
+        weights = ", ".join(str(weight) for weight in FTS5_WEIGHTS)
+        statement = text(
+            f"SELECT rowid AS product_id, -bm25({table}_fts, {weights}) AS rank "
+            f"FROM {table}_fts WHERE {table}_fts MATCH :match"
+        )
+    elif dialect == "postgresql":
+        match = " & ".join(f"{token}:*" for token in tokens)
+        statement = text(
+            f"SELECT id AS product_id, ts_rank(search_vector, to_tsquery('english', :match)) AS rank "
+            f"FROM {table} WHERE search_vector @@ to_tsquery('english', :match)"
+        )
+    else:
+        return None
+
+    return (
+        statement.bindparams(match=match)
+        .columns(product_id=Integer, rank=Float)
+        .subquery("search_matches")
+    )
+
+
+def apply_product_search(db: Session, query: Query, search: str) -> Tuple[Query, Optional[object]]:
+    """Restrict a product query to full-text matches.
+
+    Returns the filtered query and a relevance expression to order by (higher
+    is better), or ``None`` when the database has no full-text backend and
+    the ``ILIKE`` fallback was used.
+    """
+    matches = _ranked_matches(db, search)
+    if matches is not None:
+        query = query.join(matches, Product.id == matches.c.product_id)
+        return query, matches.c.rank
+
+    fallback = or_(*(getattr(Product, column).ilike(f"%{search}%") for column in SEARCH_COLUMNS))
+    return query.filter(fallback), None
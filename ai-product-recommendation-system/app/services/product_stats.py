@@ -0,0 +1,185 @@
+"""Catalog-wide product statistics.
+
+``compute_product_stats`` gets every figure in one conditional-aggregate
+query. When ``materialize_product_stats`` is enabled the figures are kept in
+a single ``product_stats`` row instead, which product writes update with
+deltas, so reading them costs one primary-key lookup.
+
+The row also carries the catalog ``version`` that list ETags are derived
+from. Every product write bumps it in the write's own transaction, so all
+workers see the new version as soon as the write commits.
+"""
+
+import operator
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..models.product import Product
+from ..models.product_stats import ProductStats
+
+STATS_ROW_ID = 1
+
+# Product fields that contribute to the stats
+STATS_FIELDS = ("price", "is_featured", "is_on_sale", "quantity_in_stock", "rating")
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _aggregates(db: Session) -> dict:
+    row = db.query(
+        func.count(Product.id),
+        _count_if(Product.is_featured == True),
+        _count_if(Product.is_on_sale == True),
+        _count_if(Product.quantity_in_stock > 0),
+        func.coalesce(func.sum(Product.price), 0.0),
+        func.coalesce(func.sum(Product.rating), 0.0),
+        func.count(Product.rating),
+        func.min(Product.price),
+        func.max(Product.price),
+    ).one()
+    return dict(zip(
+        ("total_products", "featured_count", "on_sale_count", "in_stock_count",
+         "price_sum", "rating_sum", "rating_count", "min_price", "max_price"),
+        row,
+    ))
+
+
+def _present(values) -> dict:
+    """Shape sums and counts the way /products/stats returns them."""
+    total = values["total_products"]
+    rating_count = values["rating_count"]
+    return {
+        "total_products": total,
+        "featured_count": values["featured_count"],
+        "on_sale_count": values["on_sale_count"],
+        "in_stock_count": values["in_stock_count"],
+        "average_price": round(values["price_sum"] / total, 2) if total else 0,
+        "average_rating": round(values["rating_sum"] / rating_count, 2) if rating_count else 0,
+        "price_range": {
+            "min": values["min_price"] or 0,
+            "max": values["max_price"] or 0
+        }
+    }
+
+
+def compute_product_stats(db: Session) -> dict:
+    """Scan the product table once with conditional aggregates."""
+    return _present(_aggregates(db))
+
+
+def refresh_product_stats(db: Session) -> ProductStats:
+    """Recompute the materialized row from scratch (after bulk loads, or to repair
+    drift) and bump the catalog version."""
+    db.flush()  # include pending product writes
+    stats = db.get(ProductStats, STATS_ROW_ID, with_for_update=True)
+    if stats is None:
+        stats = ProductStats(id=STATS_ROW_ID, version=0)
+        db.add(stats)
+    for field, value in _aggregates(db).items():
+        setattr(stats, field, value)
+    stats.version += 1
+    db.flush()
+    return stats
+
+
+def sync_product_stats(db: Session) -> None:
+    """Recompute the materialized row after bulk writes."""
+    refresh_product_stats(db)
+
+
+def load_product_stats(db: Session) -> ProductStats:
+    """The materialized row, created (and committed) if a database predates it."""
+    stats = db.get(ProductStats, STATS_ROW_ID)
+    if stats is not None:
+        return stats
+    try:
+        stats = refresh_product_stats(db)
+        db.commit()
+    except IntegrityError:  # another request created it first
+        db.rollback()
+        stats = db.get(ProductStats, STATS_ROW_ID)
+    return stats
+
+
+def get_product_stats(db: Session) -> dict:
+    """Stats from the materialized row when enabled, otherwise a single aggregate query."""
+    if not get_settings().materialize_product_stats:
+        return compute_product_stats(db)
+
+    stats = load_product_stats(db)
+    return _present({field: getattr(stats, field) for field in (
+        "total_products", "featured_count", "on_sale_count", "in_stock_count",
+        "price_sum", "rating_sum", "rating_count", "min_price", "max_price",
+    )})
+
+
+def stats_snapshot(product: Product) -> dict:
+    """The stat-relevant fields of a product, taken before and after a write."""
+    return {field: getattr(product, field) for field in STATS_FIELDS}
+
+
+def _deltas(snapshot: dict, sign: int) -> dict:
+    rated = snapshot["rating"] is not None
+    return {
+        "total_products": sign,
+        "featured_count": sign * bool(snapshot["is_featured"]),
+        "on_sale_count": sign * bool(snapshot["is_on_sale"]),
+        "in_stock_count": sign * ((snapshot["quantity_in_stock"] or 0) > 0),
+        "price_sum": sign * snapshot["price"],
+        "rating_sum": sign * snapshot["rating"] if rated else 0.0,
+        "rating_count": sign * rated,
+    }
+
+
+def _extreme(column, aggregate, removed: Optional[float], added: Optional[float], improves):
+    """SQL for the new min or max price after removing and/or adding a price."""
+    whens = []
+    if removed is not None:
+        # Min and max can't be un-applied: re-read through the price index
+        whens.append((column == removed, select(aggregate(Product.price)).scalar_subquery()))
+    if added is not None:
+        whens.append((column.is_(None) | improves(column, added), added))
+    return case(*whens, else_=column) if whens else column
+
+
+def record_product_change(db: Session, before: Optional[dict], after: Optional[dict]) -> None:
+    """Apply one product create (``before=None``), update or delete (``after=None``)
+    to the materialized row and bump the catalog version, in the caller's
+    transaction.
+
+    Call it for every product write, including ones that leave the stats
+    fields alone: the version must move whenever a listing can change.
+    Deltas are applied with ``SET column = column + delta`` in a single
+    UPDATE, so concurrent writers never overwrite each other's increments
+    (SQLite has no ``FOR UPDATE``).
+    """
+    table = ProductStats.__table__
+    if before == after:
+        db.execute(update(table).where(table.c.id == STATS_ROW_ID).values(version=table.c.version + 1))
+        return
+    deltas = Counter()
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot is not None:
+            deltas.update(_deltas(snapshot, sign))
+
+    removed = before["price"] if before is not None else None
+    added = after["price"] if after is not None else None
+    if removed is not None:
+        db.flush()  # the extremes may be re-read from the product table
+    db.execute(
+        update(table)
+        .where(table.c.id == STATS_ROW_ID)
+        .values(
+            **{field: table.c[field] + delta for field, delta in deltas.items()},
+            min_price=_extreme(table.c.min_price, func.min, removed, added, operator.gt),
+            max_price=_extreme(table.c.max_price, func.max, removed, added, operator.lt),
+            version=table.c.version + 1,
+        )
+    )
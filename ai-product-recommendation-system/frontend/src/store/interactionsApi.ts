@@ -2,6 +2,8 @@ import { createApi, fetchBaseQuery } from '@reduxjs/toolkit/query/react';
 import type { 
   UserInteraction,
   UserInteractionCreate,
+  UserInteractionBatch,
+  UserInteractionBatchAccepted,
   UserInteractionHistory,
   UserInteractionAnalytics,
   ProductInteractionStats,
@@ -9,6 +11,7 @@ import type {
   InteractionAnalyticsParams,
   ProductStatsParams,
   BulkInteractionParams,
+  ProductInteractions,
   InteractionType
 } from '../types/interaction';
 
@@ -39,6 +42,15 @@ export const interactionsApi = createApi({
       invalidatesTags: ['Interaction', 'InteractionHistory', 'InteractionAnalytics', 'ProductStats'],
     }),
 
+    // Queue interactions for a bulk write; ids come back before the rows are stored
+    trackInteractionsBatch: builder.mutation<UserInteractionBatchAccepted, UserInteractionBatch>({
+      query: (batch) => ({
+        url: 'interactions/batch',
+        method: 'POST',
+        body: batch,
+      }),
+    }),
+
     // Get interaction history
     getInteractionHistory: builder.query<UserInteractionHistory, InteractionHistoryParams>({
       query: (params = {}) => ({
@@ -46,6 +58,8 @@ export const interactionsApi = createApi({
         params: {
           page: params.page || 1,
           per_page: params.per_page || 20,
+          ...(params.cursor && { cursor: params.cursor }),
+          ...(params.include_total !== undefined && { include_total: params.include_total }),
           ...(params.interaction_type && { interaction_type: params.interaction_type }),
           ...(params.product_id && { product_id: params.product_id }),
           ...(params.days_back && { days_back: params.days_back }),
@@ -76,15 +90,12 @@ export const interactionsApi = createApi({
       ],
     }),
 
-    // Get bulk interactions
-    getBulkInteractions: builder.query<UserInteraction[], BulkInteractionParams>({
-      query: ({ product_ids, interaction_types, limit = 100 }) => ({
+    // Get the newest interactions per product; POST keeps long id lists out of the URL
+    getBulkInteractions: builder.query<ProductInteractions[], BulkInteractionParams>({
+      query: ({ product_ids, interaction_types, limit = 10 }) => ({
         url: 'interactions/bulk',
-        params: {
-          product_ids: product_ids.join(','),
-          interaction_types: interaction_types.join(','),
-          limit,
-        },
+        method: 'POST',
+        body: { product_ids, interaction_types, limit },
       }),
       providesTags: ['Interaction'],
     }),
@@ -102,6 +113,7 @@ export const interactionsApi = createApi({
 
 export const {
   useTrackInteractionMutation,
+  useTrackInteractionsBatchMutation,
   useGetInteractionHistoryQuery,
   useGetUserAnalyticsQuery,
   useGetProductStatsQuery,
@@ -112,13 +124,17 @@ export const {
 // Helper functions for common interactions
 export const useInteractionTracking = () => {
   const [trackInteraction, { isLoading: isTracking, error }] = useTrackInteractionMutation();
+  const [trackInteractionsBatch] = useTrackInteractionsBatchMutation();
 
+  // Views are high-volume and need no stored row back, so they go through the batch queue
   const trackView = async (productId: number, interaction_metadata?: Record<string, any>) => {
     try {
-      await trackInteraction({
-        product_id: productId,
-        interaction_type: InteractionType.VIEW,
-        interaction_metadata,
+      await trackInteractionsBatch({
+        events: [{
+          product_id: productId,
+          interaction_type: InteractionType.VIEW,
+          interaction_metadata,
+        }],
       }).unwrap();
     } catch (err) {
       console.error('Failed to track view:', err);
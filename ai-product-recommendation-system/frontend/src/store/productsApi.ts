@@ -5,11 +5,26 @@ import type {
   ProductSearchParams, 
   ProductStats, 
   ProductCreate, 
-  ProductUpdate 
+  ProductUpdate,
+  ProductFacets
 } from '../types/product';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
+// Filter query params shared by the product list and its facet counts
+const filterParams = (filters: ProductFilters) => ({
+  ...(filters.search && { search: filters.search }),
+  ...(filters.category && { category: filters.category }),
+  ...(filters.subcategory && { subcategory: filters.subcategory }),
+  ...(filters.min_price !== undefined && { min_price: filters.min_price }),
+  ...(filters.max_price !== undefined && { max_price: filters.max_price }),
+  ...(filters.min_rating !== undefined && { min_rating: filters.min_rating }),
+  ...(filters.max_rating !== undefined && { max_rating: filters.max_rating }),
+  ...(filters.is_featured !== undefined && { is_featured: filters.is_featured }),
+  ...(filters.is_on_sale !== undefined && { is_on_sale: filters.is_on_sale }),
+  ...(filters.in_stock !== undefined && { in_stock: filters.in_stock }),
+});
+
 export const productsApi = createApi({
   reducerPath: 'productsApi',
   baseQuery: fetchBaseQuery({
@@ -32,16 +47,7 @@ export const productsApi = createApi({
         params: {
           skip: filters.skip || 0,
           limit: filters.limit || 20,
-          ...(filters.search && { search: filters.search }),
-          ...(filters.category && { category: filters.category }),
-          ...(filters.subcategory && { subcategory: filters.subcategory }),
-          ...(filters.min_price !== undefined && { min_price: filters.min_price }),
-          ...(filters.max_price !== undefined && { max_price: filters.max_price }),
-          ...(filters.min_rating !== undefined && { min_rating: filters.min_rating }),
-          ...(filters.max_rating !== undefined && { max_rating: filters.max_rating }),
-          ...(filters.is_featured !== undefined && { is_featured: filters.is_featured }),
-          ...(filters.is_on_sale !== undefined && { is_on_sale: filters.is_on_sale }),
-          ...(filters.in_stock !== undefined && { in_stock: filters.in_stock }),
+          ...filterParams(filters),
           ...(filters.sort_by && { sort_by: filters.sort_by }),
           ...(filters.sort_order && { sort_order: filters.sort_order }),
         },
@@ -49,6 +55,15 @@ export const productsApi = createApi({
       providesTags: ['Product'],
     }),
 
+    // Facet counts for the filter sidebar, under the same filters as getProducts
+    getProductFacets: builder.query<ProductFacets, ProductFilters>({
+      query: (filters = {}) => ({
+        url: 'facets',
+        params: filterParams(filters),
+      }),
+      providesTags: ['Product'],
+    }),
+
     // Search products
     searchProducts: builder.query<Product[], ProductSearchParams>({
       query: ({ q, limit = 20 }) => ({
@@ -142,6 +157,7 @@ export const productsApi = createApi({
 
 export const {
   useGetProductsQuery,
+  useGetProductFacetsQuery,
   useSearchProductsQuery,
   useGetProductQuery,
   useGetCategoriesQuery,
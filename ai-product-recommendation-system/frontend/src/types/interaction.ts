@@ -15,6 +15,17 @@ export interface UserInteractionCreate {
   quantity?: number; // For add_to_cart/purchase interactions
   session_id?: string; // For tracking user sessions
   interaction_metadata?: Record<string, any>; // Additional interaction data
+  event_id?: string; // Idempotency key (UUID); generated by the server when omitted
+}
+
+// POST /interactions/batch: events are queued and written shortly after
+export interface UserInteractionBatch {
+  events: UserInteractionCreate[]; // 1-1000 events
+}
+
+export interface UserInteractionBatchAccepted {
+  accepted: number;
+  event_ids: string[];
 }
 
 export interface UserInteraction {
@@ -27,13 +38,15 @@ export interface UserInteraction {
   quantity?: number;
   session_id?: string;
   interaction_metadata?: Record<string, any>;
+  event_id?: string;
 }
 
 export interface UserInteractionHistory {
   interactions: UserInteraction[];
-  total_count: number;
+  total_count?: number | null; // null when not counted (cursor pages unless include_total)
   page: number;
   per_page: number;
+  next_cursor?: string | null; // pass back as `cursor` for the next page
 }
 
 export interface UserInteractionAnalytics {
@@ -71,6 +84,8 @@ export interface ProductInteractionStats {
 export interface InteractionHistoryParams {
   page?: number;
   per_page?: number;
+  cursor?: string;
+  include_total?: boolean;
   interaction_type?: InteractionType;
   product_id?: number;
   days_back?: number;
@@ -91,7 +106,13 @@ export interface ProductStatsParams {
 export interface BulkInteractionParams {
   product_ids: number[];
   interaction_types: InteractionType[];
-  limit?: number;
+  limit?: number; // newest interactions per product
+}
+
+// One product's interactions in a bulk lookup, newest first
+export interface ProductInteractions {
+  product_id: number;
+  interactions: UserInteraction[];
 }
 
 // UI-specific types
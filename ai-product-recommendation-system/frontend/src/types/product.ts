@@ -98,6 +98,30 @@ export interface ProductStats {
   };
 }
 
+// Facet counts for the filter sidebar (GET /products/facets)
+export interface FacetCount {
+  value: string;
+  count: number;
+}
+
+export interface RangeFacetCount {
+  label: string;
+  min: number | null;
+  max: number | null; // exclusive; null means no upper bound
+  count: number;
+}
+
+export interface ProductFacets {
+  total: number;
+  categories: FacetCount[];
+  subcategories: FacetCount[];
+  price_ranges: RangeFacetCount[];
+  rating_ranges: RangeFacetCount[];
+  on_sale: number;
+  featured: number;
+  in_stock: number;
+}
+
 // UI-specific types
 export interface ProductGridViewType {
   view: 'grid' | 'list';
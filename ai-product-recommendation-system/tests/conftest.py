@@ -0,0 +1,20 @@
+"""Shared fixtures: a SQLite database migrated to the latest revision."""
+
+import os
+
+# Before any app import: tests use their own databases, never ./sqlite.db
+os.environ.setdefault("database_url", "sqlite://")
+os.environ.setdefault("auto_migrate", "false")
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+
+from app.core.migrations import run_migrations  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def migrated_engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}")
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
@@ -0,0 +1,111 @@
+"""Sliding-window interaction counters: ring arithmetic and sync consistency."""
+
+from array import array
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.product import Product
+from app.services import interaction_counters
+from app.services.interaction_counters import WINDOW_DAYS, ProductInteractionCounters, _slot, _window_sum
+from app.services.interaction_rollups import apply_rollups
+
+# A day whose slot is 1, so any window of three days or more wraps past slot 0
+TODAY = date.fromordinal(WINDOW_DAYS * 2000 + 1)
+
+
+class FrozenDatetime(datetime):
+    now_value = datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=12)
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now_value
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(interaction_counters, "datetime", FrozenDatetime)
+    FrozenDatetime.now_value = datetime.combine(TODAY, datetime.min.time()) + timedelta(hours=12)
+    return FrozenDatetime
+
+
+def event(product_id, days_ago=0, kind="view", rating=None) -> dict:
+    timestamp = datetime.combine(TODAY - timedelta(days=days_ago), datetime.min.time()) + timedelta(hours=9)
+    return {"user_id": 1, "product_id": product_id, "category": "Toys",
+            "interaction_type": kind, "timestamp": timestamp, "rating_value": rating}
+
+
+@pytest.fixture
+def counters(migrated_engine, clock):
+    counters = ProductInteractionCounters(migrated_engine, sync_interval=60)
+    counters.load()
+    return counters
+
+
+def test_window_sum_wraps_around_the_ring():
+    values = array("i", range(10))
+    assert _window_sum(values, 2, 4) == 2 + 3 + 4
+    assert _window_sum(values, 8, 1) == 8 + 9 + 0 + 1
+    assert _window_sum(values, 5, 5) == 5
+
+
+def test_totals_across_slot_zero(counters):
+    assert _slot(TODAY) == 1
+    counters.apply([event(7, days_ago=d) for d in (0, 1, 2, 3, 10)])
+    counters.apply([event(7, days_ago=2, kind="rating", rating=4.0), event(7, days_ago=3, kind="rating", rating=2.0)])
+    counts, average = counters.totals(7, 3)
+    assert counts["view"] == 4
+    assert counts["rating"] == 2
+    assert average == pytest.approx(3.0)
+    assert counters.totals(7, 2) == ({**counts, "view": 3, "rating": 1}, pytest.approx(4.0))
+
+
+def test_days_leaving_the_window_are_cleared(counters, clock):
+    counters.apply([event(8, days_ago=1)])
+    clock.now_value += timedelta(days=WINDOW_DAYS - 2)
+    assert counters.totals(8, WINDOW_DAYS - 1)[0]["view"] == 1
+    clock.now_value += timedelta(days=1)  # the event's slot comes round as today's
+    assert counters.totals(8, WINDOW_DAYS - 1)[0]["view"] == 0
+
+
+def seed_product(engine, *events) -> int:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        product_id = conn.execute(
+            insert(Product).values(name="Kite", category="Toys", price=9.0, created_at=now, updated_at=now)
+        ).inserted_primary_key[0]
+        apply_rollups(conn, [{**e, "product_id": product_id} for e in events])
+    return product_id
+
+
+def test_sync_matches_the_rollups(migrated_engine, counters):
+    product_id = seed_product(migrated_engine, event(0), event(0, days_ago=1))
+    counters.apply([event(product_id)])  # also written by this process; the rollups already count it
+    counters.sync()
+    assert counters.totals(product_id, 1)[0]["view"] == 2
+
+
+def test_sync_replays_changes_made_while_it_reads(migrated_engine, counters, monkeypatch):
+    product_id = seed_product(migrated_engine, event(0))
+    gone_id = seed_product(migrated_engine, event(0))
+    counters.load()
+    read = counters._rows
+
+    class ChangedAfterRead:
+        def __init__(self, conn, since):
+            self.result = read(conn, since)
+
+        def all(self):
+            rows = self.result.all()
+            # Committed after the snapshot was taken, applied before the sync swaps it in
+            counters.apply([event(product_id)])
+            counters.forget(gone_id)
+            return rows
+
+    monkeypatch.setattr(counters, "_rows", ChangedAfterRead)
+    counters.sync()
+
+    assert counters.totals(product_id, 0)[0]["view"] == 2
+    assert counters.totals(gone_id, 0) is None
+    assert counters._recorded is None
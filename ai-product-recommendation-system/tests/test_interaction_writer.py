@@ -0,0 +1,112 @@
+"""Batched interaction writes: deduplication, failure handling and the buffer bound."""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app.models.product import Product
+from app.models.user import User
+from app.models.user_interaction import UserInteraction
+from app.services.interaction_writer import InteractionWriter
+
+
+@pytest.fixture(scope="module")
+def ids(migrated_engine):
+    now = datetime.utcnow()
+    with migrated_engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User).values(email="writer@example.com", username="writer", hashed_password="x")
+        ).inserted_primary_key[0]
+        product_id = conn.execute(
+            insert(Product).values(name="Mug", category="Kitchen", price=5.0, created_at=now, updated_at=now)
+        ).inserted_primary_key[0]
+    return user_id, product_id
+
+
+@pytest.fixture
+def writer(migrated_engine):
+    return InteractionWriter(migrated_engine, batch_size=16, flush_interval=0, max_pending=40, max_attempts=2)
+
+
+def row(ids, timestamp=None, event_id=None, product_id=None) -> dict:
+    user_id, default_product = ids
+    return {
+        "user_id": user_id,
+        "product_id": product_id or default_product,
+        "interaction_type": "view",
+        "timestamp": timestamp or datetime.utcnow(),
+        "rating_value": None,
+        "event_id": event_id or str(uuid.uuid4()),
+    }
+
+
+def stored(engine, event_ids) -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).where(UserInteraction.event_id.in_(event_ids)))
+
+
+def drain(writer) -> int:
+    """Flush until nothing is held, as the background thread would; returns failed flushes."""
+    failures = 0
+    while writer.pending():
+        try:
+            writer.flush()
+        except Exception:
+            failures += 1
+    return failures
+
+
+def test_resent_event_ids_are_stored_once(migrated_engine, ids, writer):
+    rows = [row(ids) for _ in range(3)]
+    writer.submit(rows)
+    writer.flush()
+    writer.submit([dict(rows[0])])
+    writer.flush()
+    assert stored(migrated_engine, [r["event_id"] for r in rows]) == 3
+    assert writer.stats["written"] == 3
+    assert writer.stats["duplicates"] == 1
+
+
+def test_unknown_products_are_dropped(migrated_engine, ids, writer):
+    rows = [row(ids), row(ids, product_id=999999)]
+    writer.submit(rows)
+    writer.flush()
+    assert stored(migrated_engine, [r["event_id"] for r in rows]) == 1
+    assert writer.stats["dropped"] == 1
+
+
+def test_bad_row_is_split_out_and_dead_lettered(migrated_engine, ids, writer):
+    rows = [row(ids) for _ in range(15)]
+    rows.insert(6, row(ids, timestamp="not a date"))
+    writer.submit(rows)
+
+    failures = drain(writer)
+
+    assert stored(migrated_engine, [r["event_id"] for r in rows]) == 15
+    assert writer.stats["dead_lettered"] == 1
+    # max_attempts tries of the whole batch, then one failure per halving
+    assert failures == writer.max_attempts + 4
+
+
+def test_transient_errors_retry_the_whole_batch(ids, writer):
+    batch = [row(ids) for _ in range(4)]
+    writer.submit(batch)
+    del writer._pending[:]
+    for failures in range(1, 6):
+        writer._requeue(batch, failures, OperationalError("INSERT", {}, Exception("database is locked")))
+        assert [len(retry) for retry, _ in writer._retry] == [4]
+        writer._retry.clear()
+    assert writer.pending() == 4
+
+
+def test_rows_being_retried_count_toward_max_pending(ids, writer):
+    writer.submit([row(ids, timestamp="not a date") for _ in range(16)])
+    writer.submit([row(ids) for _ in range(24)])
+    with pytest.raises(Exception):
+        writer.flush()  # the first batch fails and waits for a retry
+    assert writer.pending() == 40
+    assert not writer.submit([row(ids)])
+    assert writer.stats["rejected"] == 1
@@ -0,0 +1,92 @@
+"""Keyset cursors: encoding, rejection, and paging through ties in the sort key."""
+
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import get_db
+from app.core.pagination import decode_cursor, encode_cursor
+from app.main import app
+from app.models.product import Product
+
+CATEGORY = "Kites"
+CREATED_AT = datetime(2024, 5, 1, 12, 30, 15, 250000)
+# Runs of equal prices, ratings and creation times, so most page breaks fall inside a tie
+PRICES = [5.0, 5.0, 5.0, 7.5, 7.5, 9.0, 9.0]
+RATINGS = [None, 4.0, None, 4.0, 4.0, None, 2.0]
+
+
+@pytest.fixture(scope="module")
+def product_ids(migrated_engine):
+    with migrated_engine.begin() as conn:
+        return [
+            conn.execute(insert(Product).values(
+                name=f"Kite {i}", category=CATEGORY, price=price, rating=rating,
+                created_at=CREATED_AT, updated_at=CREATED_AT,
+            )).inserted_primary_key[0]
+            for i, (price, rating) in enumerate(zip(PRICES, RATINGS))
+        ]
+
+
+@pytest.fixture
+def client(migrated_engine):
+    sessions = sessionmaker(bind=migrated_engine, autoflush=False)
+
+    def get_test_db():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def pages(client, **params) -> list:
+    """Ids of every page reached by following X-Next-Cursor."""
+    params = {"category": CATEGORY, "limit": 2, "fields": "id", **params}
+    result = []
+    while True:
+        response = client.get("/api/products/", params=params)
+        response.raise_for_status()
+        result.append([product["id"] for product in response.json()])
+        if "X-Next-Cursor" not in response.headers:
+            return result
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+
+@pytest.mark.parametrize("value", [7.5, 3, "Kite 2", None, CREATED_AT])
+def test_cursor_round_trip(value):
+    assert decode_cursor(encode_cursor("price:asc", value, 42), "price:asc") == (value, 42)
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor", "", encode_cursor("price:desc", 7.5, 42)])
+def test_foreign_or_garbled_cursor_is_rejected(token):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(token, "price:asc")
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("sort_by", ["price", "rating", "created_at"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_cursor_pages_through_equal_sort_keys(client, product_ids, sort_by, sort_order):
+    paged = pages(client, sort_by=sort_by, sort_order=sort_order)
+    offset = client.get("/api/products/", params={
+        "category": CATEGORY, "limit": 100, "fields": "id", "sort_by": sort_by, "sort_order": sort_order,
+    }).json()
+    assert [len(page) for page in paged] == [2, 2, 2, 1]
+    assert [i for page in paged for i in page] == [product["id"] for product in offset]
+    assert sorted(i for page in paged for i in page) == sorted(product_ids)
+
+
+def test_cursor_for_another_sort_is_a_bad_request(client, product_ids):
+    response = client.get("/api/products/", params={"category": CATEGORY, "limit": 2, "sort_by": "price"})
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/api/products/", params={"category": CATEGORY, "sort_by": "name", "cursor": cursor})
+    assert response.status_code == 400
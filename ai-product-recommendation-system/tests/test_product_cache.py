@@ -0,0 +1,163 @@
+"""Invalidation precision of the catalog cache, on both cache backends.
+
+Entries are written by the real endpoints and writes go through the API, so
+the keys under test are the ones production builds.
+"""
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import MemoryCache, RedisCache
+from app.core.database import get_db
+from app.main import app
+from app.services import product_cache
+from app.services.product_cache import group_key, product_key
+
+OTHER_KEY = "sessions:42"  # outside the products: namespace
+
+# Catalog reads that go through the cache, by the group their keys fall in
+WARM_URLS = {
+    "featured": "/api/products/featured",
+    "on_sale": "/api/products/on-sale",
+    "categories": "/api/products/categories",
+    "subcategories": "/api/products/categories/electronics/subcategories",
+    "facets": "/api/products/facets?min_price=1",
+    "search": "/api/products/search?q=phone",
+}
+GROUPS = {
+    "featured": group_key("featured"),
+    "on_sale": group_key("on-sale"),
+    "categories": group_key("categories"),
+    "subcategories": group_key("subcategories"),
+    "facets": group_key("facets"),
+    "search": group_key("search"),
+}
+
+
+def listing(category="Electronics", subcategory="Phones", is_featured=False, is_on_sale=False) -> dict:
+    return {"category": category, "subcategory": subcategory, "is_featured": is_featured, "is_on_sale": is_on_sale}
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request, monkeypatch):
+    cache = MemoryCache() if request.param == "memory" else RedisCache(fakeredis.FakeRedis())
+    monkeypatch.setattr(product_cache, "get_cache", lambda: cache)
+    cache.set(OTHER_KEY, {"key": OTHER_KEY}, 60)
+    return cache
+
+
+@pytest.fixture
+def client(migrated_engine, cache):
+    sessions = sessionmaker(bind=migrated_engine, autoflush=False)
+
+    def get_test_db():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def create(client, **fields) -> int:
+    response = client.post("/api/products/", json={"name": "Phone", "price": 10.0, **listing(**fields)})
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def keys(cache) -> list:
+    if isinstance(cache, MemoryCache):
+        return list(cache._entries)
+    return [key.decode() for key in cache.client.keys("*")]
+
+
+def cached(cache, subject=None, other=None) -> set:
+    """Names of the groups with at least one cached entry."""
+    present = set(keys(cache))
+    names = {name for name, prefix in GROUPS.items() if any(key.startswith(prefix) for key in present)}
+    for name, product_id in (("detail", subject), ("other_detail", other)):
+        if product_id is not None and product_key(product_id) in present:
+            names.add(name)
+    return names
+
+
+def warm(client, cache, *product_ids) -> None:
+    for product_id in product_ids:
+        client.get(f"/api/products/{product_id}").raise_for_status()
+    for url in WARM_URLS.values():
+        client.get(url).raise_for_status()
+    assert cached(cache, *product_ids) >= set(GROUPS)
+
+
+def test_create_drops_category_groups_but_not_unrelated_lists(client, cache):
+    other = create(client)
+    warm(client, cache, other)
+    create(client)
+    assert cached(cache, None, other) == {"other_detail", "featured", "on_sale"}
+
+
+def test_plain_update_keeps_category_groups(client, cache):
+    subject, other = create(client), create(client)
+    warm(client, cache, subject, other)
+    client.put(f"/api/products/{subject}", json={"name": "Renamed"}).raise_for_status()
+    assert cached(cache, subject, other) == {"other_detail", "featured", "on_sale", "categories", "subcategories"}
+
+
+def test_becoming_featured_drops_featured_lists(client, cache):
+    subject, other = create(client), create(client)
+    warm(client, cache, subject, other)
+    client.put(f"/api/products/{subject}", json={"is_featured": True}).raise_for_status()
+    assert cached(cache, subject, other) == {"other_detail", "on_sale", "categories", "subcategories"}
+
+
+def test_leaving_sale_drops_on_sale_lists(client, cache):
+    subject, other = create(client, is_on_sale=True), create(client)
+    warm(client, cache, subject, other)
+    client.put(f"/api/products/{subject}", json={"is_on_sale": False}).raise_for_status()
+    assert cached(cache, subject, other) == {"other_detail", "featured", "categories", "subcategories"}
+
+
+@pytest.mark.parametrize("change", [{"category": "Phones"}, {"subcategory": "Tablets"}])
+def test_moving_category_drops_category_groups(client, cache, change):
+    subject, other = create(client), create(client)
+    warm(client, cache, subject, other)
+    client.put(f"/api/products/{subject}", json=change).raise_for_status()
+    assert cached(cache, subject, other) == {"other_detail", "featured", "on_sale"}
+
+
+def test_deleting_featured_product_drops_featured_and_category_groups(client, cache):
+    subject, other = create(client, is_featured=True), create(client)
+    warm(client, cache, subject, other)
+    client.delete(f"/api/products/{subject}").raise_for_status()
+    assert cached(cache, subject, other) == {"other_detail", "on_sale"}
+
+
+def test_invalidate_all_keeps_other_namespaces(client, cache):
+    other = create(client)
+    warm(client, cache, other)
+    product_cache.invalidate_all()
+    assert cached(cache, None, other) == set()
+    assert cache.get(OTHER_KEY) is not None
+
+
+def test_redis_delete_prefix_spans_scan_batches():
+    cache = RedisCache(fakeredis.FakeRedis())
+    for i in range(1200):
+        cache.set(group_key("search", i), [i], 60)
+    cache.set(OTHER_KEY, 1, 60)
+    cache.delete_prefix(group_key("search"))
+    assert cache.client.dbsize() == 1
+
+
+def test_redis_errors_are_misses():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    cache = RedisCache(fakeredis.FakeRedis(server=server))
+    cache.set(product_key(1), {"id": 1}, 60)
+    assert cache.get(product_key(1)) is None
+    cache.delete_prefix(product_cache.PREFIX)  # logged, not raised
@@ -0,0 +1,87 @@
+"""Pruning products missing from a feed, on a migrated SQLite database."""
+
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app.models.interaction_rollup import ProductDailyInteractions
+from app.models.product import Product
+from app.models.user import User
+from app.models.user_interaction import UserInteraction
+from app.services import product_import
+from app.services.interaction_counters import ProductInteractionCounters
+from app.services.interaction_rollups import apply_rollups
+
+
+@pytest.fixture
+def counters(migrated_engine, monkeypatch):
+    counters = ProductInteractionCounters(migrated_engine, sync_interval=60)
+    monkeypatch.setattr(product_import, "get_interaction_counters", lambda: counters)
+    monkeypatch.setattr(product_import.product_cache, "invalidate_all", lambda: None)
+    return counters
+
+
+def feed(*records) -> io.BytesIO:
+    return io.BytesIO(json.dumps(list(records)).encode("utf-8"))
+
+
+def product(product_id=None, **fields) -> dict:
+    record = {"name": "Lamp", "category": "Home", "price": 20.0, **fields}
+    if product_id is not None:
+        record["id"] = product_id
+    return record
+
+
+def count(engine, model, **where) -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(model).filter_by(**where))
+
+
+def add_interaction(engine, product_id: int) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        user_id = conn.scalar(select(User.id).limit(1)) or conn.execute(
+            insert(User).values(email="import@example.com", username="import", hashed_password="x")
+        ).inserted_primary_key[0]
+        event = {"user_id": user_id, "product_id": product_id, "category": "Home",
+                 "interaction_type": "view", "timestamp": now, "rating_value": None}
+        conn.execute(insert(UserInteraction).values(**event))
+        apply_rollups(conn, [event])
+
+
+def test_unkeyed_rows_survive_the_prune(migrated_engine, counters):
+    product_import.import_products(feed(product(9001)), migrated_engine)
+    summary = product_import.import_products(feed(product(9001), product()), migrated_engine, delete_missing=True)
+    assert summary["inserted"] == 1
+    assert count(migrated_engine, Product) == 2
+
+
+def test_prune_removes_interactions_rollups_and_counters(migrated_engine, counters):
+    product_import.import_products(feed(product(9101), product(9102)), migrated_engine)
+    add_interaction(migrated_engine, 9101)
+    add_interaction(migrated_engine, 9102)
+    counters.load()
+    assert counters.totals(9101, 0) is not None
+
+    summary = product_import.import_products(feed(product(9102)), migrated_engine, delete_missing=True)
+
+    assert summary["deleted"] >= 1
+    assert count(migrated_engine, UserInteraction, product_id=9101) == 0
+    assert count(migrated_engine, ProductDailyInteractions, product_id=9101) == 0
+    assert counters.totals(9101, 0) is None
+    assert count(migrated_engine, UserInteraction, product_id=9102) == 1
+
+
+def test_prune_refuses_empty_feed_and_skips_on_errors(migrated_engine, counters):
+    product_import.import_products(feed(product(9201)), migrated_engine)
+    with pytest.raises(ValueError, match="empty"):
+        product_import.import_products(feed(), migrated_engine, delete_missing=True)
+
+    summary = product_import.import_products(feed(product(9202), {"id": 9203, "price": "x"}),
+                                             migrated_engine, delete_missing=True)
+    assert summary["deleted"] == 0
+    assert summary["delete_skipped"] == "1 records failed validation"
+    assert count(migrated_engine, Product, id=9201) == 1
@@ -0,0 +1,51 @@
+"""The FTS5 index follows product text, not the columns hot paths update."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.models.product import Product
+from app.services import product_popularity
+from app.services.product_search import apply_product_search
+
+
+@pytest.fixture
+def product_id(migrated_engine):
+    with migrated_engine.begin() as conn:
+        return conn.execute(
+            insert(Product.__table__).values(
+                name="Trail Runner", category="Shoes", price=90.0,
+                created_at=datetime.utcnow(), updated_at=datetime.utcnow(),
+            ).returning(Product.id)
+        ).scalar_one()
+
+
+def fts_data(engine) -> list:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT id, block FROM products_fts_data ORDER BY id")).all()
+
+
+def search_ids(engine, query: str) -> list:
+    with Session(engine) as db:
+        search, _ = apply_product_search(db, db.query(Product.id), query)
+        return [row.id for row in search.all()]
+
+
+def test_popularity_updates_leave_the_index_alone(migrated_engine, product_id):
+    before = fts_data(migrated_engine)
+    with Session(migrated_engine) as db:
+        for _ in range(50):
+            product_popularity.record_interaction(db, product_id, "view")
+        db.commit()
+    with migrated_engine.begin() as conn:
+        product_popularity.add_scores(conn, {product_id: 1.0})
+    assert fts_data(migrated_engine) == before
+
+
+def test_text_updates_reindex(migrated_engine, product_id):
+    with migrated_engine.begin() as conn:
+        conn.execute(Product.__table__.update().where(Product.id == product_id).values(name="Summit Hiker"))
+    assert product_id in search_ids(migrated_engine, "summit")
+    assert product_id not in search_ids(migrated_engine, "runner")
@@ -4,13 +4,24 @@ A streamlined implementation focusing on core functionality.
 """
 
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import AsyncIterator, List, Dict, Optional
+import json
 import os
 from dotenv import load_dotenv
-import openai
 
-from knowledge_base import search_knowledge, get_all_topics, MCP_KNOWLEDGE
+from context_budget import assemble_context
+from knowledge_base import (
+    search_knowledge,
+    search_knowledge_batch,
+    get_all_topics,
+    reload_knowledge,
+    MCP_KNOWLEDGE
+)
+from llm_backends import get_backend
+from response_cache import ResponseCache, make_cache_key, make_context_key
+from semantic_cache import SemanticCache
 
 # Load environment variables
 load_dotenv()
@@ -22,8 +33,34 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Initialize OpenAI client
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# LLM backend: "openai" (default) or "fake" for offline load testing
+llm = get_backend()
+
+# Context retrieval for /chat: "keyword" (BM25) or "dense" (embeddings)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "keyword")
+
+# Prompt token budget for /chat (system prompt, question, history and context)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "800"))
+MAX_ENTRY_TOKENS = int(os.getenv("MAX_ENTRY_TOKENS", "600"))
+
+# Cache of chat answers; set RESPONSE_CACHE_PATH to persist it in SQLite
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "1000")),
+    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+    path=os.getenv("RESPONSE_CACHE_PATH") or None
+)
+
+# Near-duplicate question cache; answers are reused only for the same retrieved context
+semantic_cache = None
+if os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true":
+    from embeddings import get_embedder
+    semantic_cache = SemanticCache(
+        get_embedder(os.getenv("SEMANTIC_CACHE_MODEL") or None),
+        max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "500")),
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+        ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL", os.getenv("RESPONSE_CACHE_TTL", "3600")))
+    )
 
 # Pydantic models
 class ChatRequest(BaseModel):
@@ -33,6 +70,7 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     response: str
     sources: List[Dict[str, str]] = []
+    token_usage: Dict[str, int] = {}
 
 class KnowledgeItem(BaseModel):
     id: str
@@ -40,6 +78,14 @@ class KnowledgeItem(BaseModel):
     answer: str
     relevance: float
 
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=100)
+    limit: int = Field(5, ge=1, le=20)
+
+class BatchSearchResult(BaseModel):
+    query: str
+    results: List[KnowledgeItem]
+
 # System prompt for the chatbot
 SYSTEM_PROMPT = """You are an expert assistant specialized in Model Context Protocol (MCP). 
 Your job is to help developers understand MCP concepts, implementation patterns, and best practices.
@@ -54,60 +100,155 @@ You have access to a comprehensive knowledge base about MCP. When answering ques
 If a user asks about something not related to MCP, politely redirect them to MCP-related topics.
 """
 
+def retrieve_context(query: str) -> list:
+    """Pick knowledge entries for the chat prompt using the configured mode."""
+    if RETRIEVAL_MODE == "dense":
+        from embeddings import dense_search
+        return dense_search(query)
+    return search_knowledge(query)
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
     return {"message": "MCP Q&A Chatbot API is running"}
 
+def prepare_chat(request: ChatRequest) -> dict:
+    """Retrieve knowledge context and build the prompt, sources and cache key."""
+    # Search knowledge base for relevant information
+    knowledge_results = retrieve_context(request.message)
+    
+    # Fill the prompt token budget with the most relevant context and recent history
+    user_template = "Context from knowledge base:\n{context}\n\nUser question: {message}"
+    assembled = assemble_context(
+        knowledge_results,
+        request.history[-5:],  # Keep at most the last 5 messages for context
+        SYSTEM_PROMPT + user_template.format(context="", message=request.message),
+        budget=CONTEXT_TOKEN_BUDGET,
+        history_budget=HISTORY_TOKEN_BUDGET,
+        max_entry_tokens=MAX_ENTRY_TOKENS
+    )
+    
+    sources = [
+        {"question": result['question'], "relevance": str(result['relevance'])}
+        for result in assembled["results"]
+    ]
+    
+    # Build conversation history
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    
+    # Add previous conversation history
+    for msg in assembled["history"]:
+        messages.append(msg)
+    
+    # Add knowledge context and user message
+    user_content = user_template.format(context=assembled["context"], message=request.message)
+    messages.append({"role": "user", "content": user_content})
+    
+    source_ids = [result['id'] for result in assembled["results"]]
+    return {
+        "message": request.message,
+        "sources": sources,
+        "messages": messages,
+        # Editing the knowledge file changes both keys, so stale answers are not reused
+        "cache_key": make_cache_key(
+            request.message, source_ids, assembled["history"], llm.params, MCP_KNOWLEDGE.fingerprint
+        ),
+        "context_key": make_context_key(
+            source_ids, assembled["history"], llm.params, MCP_KNOWLEDGE.fingerprint
+        ),
+        "token_usage": assembled["usage"]
+    }
+
+def get_cached_answer(prepared: dict) -> Optional[str]:
+    """Answer from the exact cache, or from a near-duplicate question with the same context."""
+    cached = response_cache.get(prepared["cache_key"])
+    if cached is not None:
+        return cached["response"]
+    if semantic_cache is not None:
+        similar = semantic_cache.get(prepared["message"], prepared["context_key"])
+        if similar is not None:
+            return similar["response"]
+    return None
+
+def store_answer(prepared: dict, answer: str) -> None:
+    """Remember an answer in both caches."""
+    response_cache.set(prepared["cache_key"], {"response": answer})
+    if semantic_cache is not None:
+        semantic_cache.set(prepared["message"], prepared["context_key"], answer)
+
+def sse_event(payload: dict) -> str:
+    """Format a payload as a server-sent event."""
+    return f"data: {json.dumps(payload)}\n\n"
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Main chat endpoint."""
     try:
-        # Search knowledge base for relevant information
-        knowledge_results = search_knowledge(request.message)
-        
-        # Build context from knowledge base
-        context = ""
-        sources = []
-        
-        if knowledge_results:
-            context = "Here's relevant information from the MCP knowledge base:\n\n"
-            for result in knowledge_results:
-                context += f"Q: {result['question']}\nA: {result['answer']}\n\n"
-                sources.append({
-                    "question": result['question'],
-                    "relevance": str(result['relevance'])
-                })
-        
-        # Build conversation history
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        prepared = prepare_chat(request)
         
-        # Add previous conversation history
-        for msg in request.history[-5:]:  # Keep last 5 messages for context
-            messages.append(msg)
+        # Reuse a cached answer for the same (or a near-duplicate) question and context
+        cached = get_cached_answer(prepared)
+        if cached is not None:
+            return ChatResponse(
+                response=cached,
+                sources=prepared["sources"],
+                token_usage=prepared["token_usage"]
+            )
         
-        # Add knowledge context and user message
-        user_content = f"Context from knowledge base:\n{context}\n\nUser question: {request.message}"
-        messages.append({"role": "user", "content": user_content})
-        
-        # Call OpenAI API
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",  # Using more cost-effective model
-            messages=messages,
-            max_tokens=1000,
-            temperature=0.7
-        )
-        
-        bot_response = response.choices[0].message.content
+        # Call the LLM backend
+        bot_response = await llm.complete(prepared["messages"])
+        store_answer(prepared, bot_response)
         
         return ChatResponse(
             response=bot_response,
-            sources=sources
+            sources=prepared["sources"],
+            token_usage=prepared["token_usage"]
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Chat endpoint that streams the answer as server-sent events.
+    
+    Emits a ``sources`` event, then ``token`` events as the model produces
+    text, and finally ``done`` (or ``error``).
+    """
+    try:
+        prepared = prepare_chat(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    
+    async def event_stream() -> AsyncIterator[str]:
+        yield sse_event({
+            "type": "sources",
+            "sources": prepared["sources"],
+            "token_usage": prepared["token_usage"]
+        })
+        
+        cached = get_cached_answer(prepared)
+        if cached is not None:
+            yield sse_event({"type": "token", "content": cached})
+            yield sse_event({"type": "done"})
+            return
+        
+        try:
+            chunks = []
+            async for delta in llm.stream(prepared["messages"]):
+                chunks.append(delta)
+                yield sse_event({"type": "token", "content": delta})
+            store_answer(prepared, "".join(chunks))
+            yield sse_event({"type": "done"})
+        except Exception as e:
+            yield sse_event({"type": "error", "detail": f"Error processing request: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/knowledge/search")
 async def search_knowledge_endpoint(query: str) -> List[KnowledgeItem]:
     """Search the knowledge base."""
@@ -117,6 +258,18 @@ async def search_knowledge_endpoint(query: str) -> List[KnowledgeItem]:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching knowledge: {str(e)}")
 
+@app.post("/knowledge/search/batch")
+async def search_knowledge_batch_endpoint(request: BatchSearchRequest) -> List[BatchSearchResult]:
+    """Search the knowledge base for several queries in one request."""
+    try:
+        results = search_knowledge_batch(request.queries, request.limit)
+        return [
+            BatchSearchResult(query=query, results=[KnowledgeItem(**item) for item in items])
+            for query, items in zip(request.queries, results)
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching knowledge: {str(e)}")
+
 @app.get("/knowledge/topics")
 async def get_topics():
     """Get all available topics."""
@@ -126,20 +279,32 @@ async def get_topics():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting topics: {str(e)}")
 
+@app.post("/knowledge/reload")
+async def reload_knowledge_endpoint():
+    """Reload the knowledge file and rebuild the search index."""
+    try:
+        changed = reload_knowledge(force=True)
+        return {"reloaded": changed, "version": MCP_KNOWLEDGE.version, "topics": len(MCP_KNOWLEDGE)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reloading knowledge: {str(e)}")
+
 @app.get("/knowledge/{topic_id}")
 async def get_topic(topic_id: str):
     """Get specific topic information."""
     try:
-        if topic_id not in MCP_KNOWLEDGE:
+        reload_knowledge()
+        topic = MCP_KNOWLEDGE.get(topic_id)  # Loaded lazily from the knowledge file
+        if topic is None:
             raise HTTPException(status_code=404, detail="Topic not found")
         
-        topic = MCP_KNOWLEDGE[topic_id]
         return {
             "id": topic_id,
             "question": topic["question"],
             "answer": topic["answer"],
             "keywords": topic["keywords"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting topic: {str(e)}")
 
@@ -149,9 +314,19 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "MCP Q&A Chatbot",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "llm_backend": llm.name,
+        "response_cache": response_cache.stats(),
+        "semantic_cache": semantic_cache.stats() if semantic_cache is not None else None
     }
 
+@app.get("/cache/semantic")
+async def semantic_cache_stats(limit: int = 20):
+    """Per-entry hit statistics for the semantic cache."""
+    if semantic_cache is None:
+        raise HTTPException(status_code=404, detail="Semantic cache is disabled")
+    return {**semantic_cache.stats(), "top_entries": semantic_cache.entry_stats(limit)}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Token-budgeted prompt assembly for /chat.
+Fills a fixed token budget with knowledge entries by relevance and recent
+history, shortening long code answers instead of sending them whole.
+"""
+
+import math
+import re
+from typing import Dict, List
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken missing or its encoding file unavailable offline
+    _encoding = None
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_CODE_BLOCK_RE = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+
+# Tokens for the per-message framing the chat format adds
+MESSAGE_OVERHEAD_TOKENS = 4
+# Lines of each code block kept when an answer is too long
+CODE_PREVIEW_LINES = 12
+# Do not bother adding a truncated entry smaller than this
+MIN_ENTRY_TOKENS = 40
+
+
+def _piece_tokens(piece: str) -> int:
+    return max(1, math.ceil(len(piece) / 4))
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken, or estimate them when it is unavailable."""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return sum(_piece_tokens(piece) for piece in _PIECE_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text down to at most ``max_tokens`` tokens."""
+    if max_tokens <= 0:
+        return ""
+    if _encoding is not None:
+        tokens = _encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return _encoding.decode(tokens[:max_tokens]).rstrip() + " …"
+
+    used = 0
+    for match in _PIECE_RE.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > max_tokens:
+            return text[:match.start()].rstrip() + " …"
+    return text
+
+
+def shorten_code_blocks(answer: str, max_lines: int = CODE_PREVIEW_LINES) -> str:
+    """Keep only the first lines of every fenced code block in an answer."""
+    def shorten(match: re.Match) -> str:
+        lines = match.group(1).splitlines()
+        if len(lines) <= max_lines:
+            return match.group(0)
+        header = match.group(0).split("\n", 1)[0]
+        kept = "\n".join(lines[:max_lines])
+        return f"{header}\n{kept}\n# ... ({len(lines) - max_lines} more lines omitted)\n```"
+
+    return _CODE_BLOCK_RE.sub(shorten, answer)
+
+
+def fit_answer(answer: str, max_tokens: int) -> str:
+    """Make an answer fit a token limit, shortening code before cutting text."""
+    if count_tokens(answer) <= max_tokens:
+        return answer
+    answer = shorten_code_blocks(answer)
+    if count_tokens(answer) <= max_tokens:
+        return answer
+    return truncate_to_tokens(answer, max_tokens)
+
+
+def assemble_context(
+    knowledge_results: List[dict],
+    history: List[Dict[str, str]],
+    fixed_prompt: str,
+    budget: int,
+    history_budget: int,
+    max_entry_tokens: int
+) -> dict:
+    """Fill the token budget greedily and report how it was spent.
+
+    ``fixed_prompt`` (system prompt and question) is always sent. History is
+    kept newest-first up to ``history_budget``, dropping the oldest messages,
+    and knowledge entries, already sorted by relevance, fill what is left.
+    """
+    fixed_tokens = count_tokens(fixed_prompt) + 2 * MESSAGE_OVERHEAD_TOKENS
+    remaining = max(0, budget - fixed_tokens)
+
+    kept_history = []
+    history_tokens = 0
+    history_limit = min(history_budget, remaining)
+    for msg in reversed(history):
+        tokens = count_tokens(msg.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+        if history_tokens + tokens > history_limit:
+            break
+        kept_history.insert(0, msg)
+        history_tokens += tokens
+    remaining -= history_tokens
+
+    header = "Here's relevant information from the MCP knowledge base:\n\n"
+    entries = []
+    context_tokens = count_tokens(header)
+    for result in knowledge_results:
+        question_part = f"Q: {result['question']}\nA: "
+        available = min(max_entry_tokens, remaining - context_tokens) - count_tokens(question_part)
+        if available < MIN_ENTRY_TOKENS:
+            continue
+        answer = fit_answer(result["answer"], available)
+        entry = f"{question_part}{answer}\n\n"
+        entries.append((result, entry))
+        context_tokens += count_tokens(entry)
+
+    context = ""
+    if entries:
+        context = header + "".join(entry for _, entry in entries)
+    else:
+        context_tokens = 0
+
+    return {
+        "context": context,
+        "results": [result for result, _ in entries],
+        "history": kept_history,
+        "usage": {
+            "budget": budget,
+            "prompt_tokens": fixed_tokens + history_tokens + context_tokens,
+            "fixed_tokens": fixed_tokens,
+            "history_tokens": history_tokens,
+            "context_tokens": context_tokens,
+            "entries_used": len(entries),
+            "entries_dropped": len(knowledge_results) - len(entries),
+            "history_messages_dropped": len(history) - len(kept_history)
+        }
+    }
@@ -0,0 +1,172 @@
+"""
+Dense retrieval for the MCP knowledge base.
+Entry embeddings are precomputed into a NumPy matrix and saved to disk, so a
+query costs one embedding plus a single matrix-vector product.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from knowledge_base import MCP_KNOWLEDGE, reload_knowledge, tokenize
+
+DEFAULT_EMBEDDINGS_PATH = Path(__file__).resolve().parent / "embeddings.npz"
+DEFAULT_EMBEDDING_MODEL = "hashing"
+
+
+class HashingEmbedder:
+    """Deterministic feature-hashing embedder that needs no model download."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _bucket(self, feature: str) -> tuple:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                column, sign = self._bucket(feature)
+                matrix[row, column] += sign
+        return _normalize(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model, used when the package is installed."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.name = f"sentence-transformers:{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, convert_to_numpy=True)
+        return _normalize(vectors.astype(np.float32))
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def get_embedder(spec: Optional[str] = None):
+    """Create an embedder from a spec such as ``hashing``, ``hashing-1024`` or
+    ``sentence-transformers:all-MiniLM-L6-v2``. Falls back to hashing if the
+    requested model is not available locally."""
+    spec = spec or os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+
+    if spec.startswith("sentence-transformers:"):
+        try:
+            return SentenceTransformerEmbedder(spec.split(":", 1)[1])
+        except ImportError:
+            print("⚠️  sentence-transformers not installed, using hashing embedder")
+            return HashingEmbedder()
+
+    if spec.startswith("hashing-"):
+        return HashingEmbedder(int(spec.split("-", 1)[1]))
+    return HashingEmbedder()
+
+
+def entry_text(item: dict) -> str:
+    """Text that represents a knowledge entry in embedding space."""
+    return " ".join([item["question"], " ".join(item["keywords"]), item["answer"]])
+
+
+class DenseIndex:
+    """Embedding matrix over knowledge entries with top-k cosine search."""
+
+    def __init__(self, ids: List[str], matrix: np.ndarray, embedder):
+        self.ids = ids
+        self.matrix = matrix
+        self.embedder = embedder
+
+    @classmethod
+    def build(cls, knowledge: dict, embedder) -> "DenseIndex":
+        ids = list(knowledge)
+        matrix = embedder.embed([entry_text(knowledge[key]) for key in ids])
+        return cls(ids, matrix, embedder)
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            matrix=self.matrix,
+            ids=np.array(self.ids),
+            model=np.array(self.embedder.name),
+        )
+
+    @classmethod
+    def load(cls, path: Path, embedder) -> Optional["DenseIndex"]:
+        """Load a saved index, or None if it was built with another model."""
+        with np.load(path) as data:
+            if str(data["model"]) != embedder.name:
+                return None
+            return cls([str(key) for key in data["ids"]], data["matrix"], embedder)
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """Return the top ``(id, score)`` pairs for a query, best first."""
+        if not self.ids:
+            return []
+        scores = self.matrix @ self.embedder.embed([query])[0]
+        limit = min(limit, len(self.ids))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+_dense_index: Optional[DenseIndex] = None
+_dense_index_version = None
+
+
+def build_embeddings(path: Optional[Path] = None, spec: Optional[str] = None) -> DenseIndex:
+    """Embed every knowledge entry and save the matrix to disk."""
+    path = Path(path or os.getenv("EMBEDDINGS_PATH", DEFAULT_EMBEDDINGS_PATH))
+    index = DenseIndex.build(MCP_KNOWLEDGE, get_embedder(spec))
+    index.save(path)
+    return index
+
+
+def get_dense_index() -> DenseIndex:
+    """Load the precomputed index, embedding in memory if it is missing or stale."""
+    global _dense_index, _dense_index_version
+    reload_knowledge()
+    if _dense_index is None or _dense_index_version != MCP_KNOWLEDGE.version:
+        path = Path(os.getenv("EMBEDDINGS_PATH", DEFAULT_EMBEDDINGS_PATH))
+        embedder = get_embedder()
+        index = DenseIndex.load(path, embedder) if path.exists() else None
+        if index is None or set(index.ids) != set(MCP_KNOWLEDGE):
+            index = DenseIndex.build(MCP_KNOWLEDGE, embedder)
+        _dense_index = index
+        _dense_index_version = MCP_KNOWLEDGE.version
+    return _dense_index
+
+
+def dense_search(query: str, limit: int = 5) -> list:
+    """Embedding-based search with the same result shape as search_knowledge."""
+    results = []
+    for key, score in get_dense_index().search(query, limit):
+        item = MCP_KNOWLEDGE.get(key)
+        if item is None:  # removed by a concurrent reload
+            continue
+        results.append({
+            "id": key,
+            "question": item["question"],
+            "answer": item["answer"],
+            "relevance": round(score, 3)
+        })
+    return results
+
+
+if __name__ == "__main__":
+    index = build_embeddings()
+    print(f"✅ Embedded {len(index.ids)} entries with {index.embedder.name}")
@@ -1,270 +1,268 @@
 """
 Simplified MCP Knowledge Base
-All MCP-related knowledge consolidated in one place for easy access.
+Knowledge entries live in knowledge.jsonl (one JSON object per line) and are
+read lazily by byte offset, so content can be edited and hot-reloaded without
+a code change or restart.
 """
 
-# MCP Knowledge Base - Consolidated
-MCP_KNOWLEDGE = {
-    "what_is_mcp": {
-        "question": "What is Model Context Protocol (MCP)?",
-        "answer": "Model Context Protocol (MCP) is an open standard for AI assistants to connect to external data sources and tools. It enables AI assistants to access real-time information, perform actions, and integrate with various services through a standardized interface. MCP provides a secure, extensible way for AI models to interact with the external world beyond their training data.",
-        "keywords": ["mcp", "model context protocol", "ai assistant", "standard", "protocol"]
-    },
-    
-    "mcp_components": {
-        "question": "What are the core components of MCP?",
-        "answer": "MCP consists of four main components: 1) Servers - provide data sources and tools, 2) Clients - AI assistants that consume server capabilities, 3) Tools - executable functions that perform actions, 4) Resources - data sources that provide information. Servers expose tools and resources through a standardized interface, while clients discover and use these capabilities.",
-        "keywords": ["servers", "clients", "tools", "resources", "components"]
-    },
-    
-    "mcp_vs_rest": {
-        "question": "How does MCP differ from REST APIs?",
-        "answer": "MCP differs from REST APIs in several key ways: MCP is designed for AI-to-machine communication while REST is for human-to-machine communication. MCP provides a tool-based approach where AI assistants can discover and use available capabilities dynamically, unlike REST APIs that require specific endpoints for each operation. MCP also offers context-aware interactions optimized for AI assistant workflows.",
-        "keywords": ["rest", "api", "comparison", "differences", "tools vs endpoints"]
-    },
-    
-    "python_server_example": {
-        "question": "How do I create a basic MCP server in Python?",
-        "answer": """Here's a basic MCP server template in Python:
-
-```python
 import json
-from typing import Any, Dict, List
-
-class MCPServer:
-    def __init__(self):
-        self.tools = {}
-        self.resources = {}
-    
-    def register_tool(self, name: str, handler: callable, schema: Dict):
-        self.tools[name] = {
-            'handler': handler,
-            'schema': schema
-        }
-    
-    def handle_message(self, message: Dict) -> Dict:
-        msg_type = message.get('type')
-        if msg_type == 'initialize':
-            return self.handle_initialize(message)
-        elif msg_type == 'tools/call':
-            return self.handle_tool_call(message)
-        else:
-            return {'error': 'Unknown message type'}
-    
-    def handle_initialize(self, message: Dict) -> Dict:
-        return {
-            'type': 'initialize',
-            'protocolVersion': '2024-11-05',
-            'capabilities': {
-                'tools': list(self.tools.keys()),
-                'resources': list(self.resources.keys())
-            }
-        }
-```""",
-        "keywords": ["python", "server", "template", "example", "code"]
-    },
-    
-    "javascript_server_example": {
-        "question": "How do I create a basic MCP server in JavaScript?",
-        "answer": """Here's a basic MCP server template in JavaScript:
-
-```javascript
-class MCPServer {
-    constructor() {
-        this.tools = new Map();
-        this.resources = new Map();
-    }
-    
-    registerTool(name, handler, schema) {
-        this.tools.set(name, {
-            handler,
-            schema
-        });
-    }
-    
-    async handleMessage(message) {
-        const { type } = message;
-        
-        switch (type) {
-            case 'initialize':
-                return this.handleInitialize(message);
-            case 'tools/call':
-                return await this.handleToolCall(message);
-            default:
-                return { error: 'Unknown message type' };
-        }
-    }
-    
-    handleInitialize(message) {
-        return {
-            type: 'initialize',
-            protocolVersion: '2024-11-05',
-            capabilities: {
-                tools: Array.from(this.tools.keys()),
-                resources: Array.from(this.resources.keys())
-            }
-        };
-    }
-}
-```""",
-        "keywords": ["javascript", "server", "template", "example", "code"]
-    },
-    
-    "tool_example": {
-        "question": "How do I create a tool for MCP?",
-        "answer": """Here's an example of a file reading tool:
-
-```python
-def file_read_tool(params: Dict) -> Dict:
-    try:
-        file_path = params.get('path')
-        if not file_path:
-            return {'error': 'File path is required'}
-        
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        return {
-            'content': content,
-            'size': len(content),
-            'path': file_path
-        }
-    except FileNotFoundError:
-        return {'error': f'File not found: {file_path}'}
-    except Exception as e:
-        return {'error': f'Error reading file: {str(e)}'}
-
-# Tool schema
-tool_schema = {
-    'name': 'file_read',
-    'description': 'Read contents of a file',
-    'inputSchema': {
-        'type': 'object',
-        'properties': {
-            'path': {
-                'type': 'string',
-                'description': 'Path to the file to read'
-            }
-        },
-        'required': ['path']
-    }
-}
-```""",
-        "keywords": ["tool", "example", "file", "read", "schema"]
-    },
-    
-    "client_example": {
-        "question": "How do I create an MCP client?",
-        "answer": """Here's a basic MCP client template:
-
-```python
-import json
-import asyncio
-from typing import Dict, List, Any
-
-class MCPClient:
-    def __init__(self, server_url: str):
-        self.server_url = server_url
-        self.tools = {}
-        self.resources = {}
-        self.initialized = False
-    
-    async def initialize(self):
-        message = {
-            'type': 'initialize',
-            'protocolVersion': '2024-11-05',
-            'capabilities': {}
-        }
-        
-        response = await self.send_message(message)
-        if response.get('type') == 'initialize':
-            self.tools = response.get('capabilities', {}).get('tools', {})
-            self.resources = response.get('capabilities', {}).get('resources', {})
-            self.initialized = True
-            return True
-        return False
-    
-    async def call_tool(self, tool_name: str, arguments: Dict) -> Dict:
-        if not self.initialized:
-            raise Exception('Client not initialized')
-        
-        message = {
-            'type': 'tools/call',
-            'name': tool_name,
-            'arguments': arguments
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+from pathlib import Path
+
+DEFAULT_KNOWLEDGE_PATH = Path(__file__).resolve().parent / "knowledge.jsonl"
+# Seconds between checks of the knowledge file for changes
+RELOAD_CHECK_INTERVAL = float(os.getenv("KNOWLEDGE_RELOAD_INTERVAL", "2"))
+
+
+class KnowledgeStore(Mapping):
+    """Read-only mapping of topic id -> entry backed by a JSONL file.
+
+    Only an id -> (offset, length) index and the questions stay in memory;
+    answers are read from disk on access. Workers share the file through the
+    OS page cache. To update content, replace the file atomically (write a
+    temporary file and rename it over the original); ``reload()`` picks it up.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.version = 0
+        self.fingerprint = ""  # identifies the file contents across restarts, for cache keys
+        self._lock = threading.Lock()
+        self._file = None
+        self._offsets = {}
+        self._questions = {}
+        self._signature = None
+        self._last_check = 0.0
+        self.reload()
+
+    def _file_signature(self) -> tuple:
+        stat = os.stat(self.path)
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def reload(self) -> bool:
+        """Re-read the offset index if the file changed. Returns True on reload."""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return False
+
+        new_file = open(self.path, "rb")
+        offsets = {}
+        questions = {}
+        position = 0
+        for line in new_file:
+            if line.strip():
+                entry = json.loads(line)
+                offsets[entry["id"]] = (position, len(line))
+                questions[entry["id"]] = entry["question"]
+            position += len(line)
+
+        with self._lock:
+            old_file = self._file
+            self._file, self._offsets, self._questions = new_file, offsets, questions
+            self._signature = signature
+            self.fingerprint = "-".join(f"{part:x}" for part in signature)
+            self.version += 1
+        if old_file is not None:
+            old_file.close()
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Cheap, rate-limited check for an updated knowledge file."""
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return False
+        self._last_check = now
+        return self.reload()
+
+    def __getitem__(self, key: str) -> dict:
+        with self._lock:
+            offset, length = self._offsets[key]
+            self._file.seek(offset)
+            line = self._file.read(length)
+        entry = json.loads(line)
+        del entry["id"]
+        return entry
+
+    def __contains__(self, key) -> bool:
+        return key in self._offsets
+
+    def __iter__(self):
+        return iter(list(self._offsets))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def questions(self) -> dict:
+        """Topic id -> question for every entry, without touching the answers."""
+        return dict(self._questions)
+
+
+# MCP Knowledge Base - shared on-disk store
+MCP_KNOWLEDGE = KnowledgeStore(os.getenv("KNOWLEDGE_PATH", DEFAULT_KNOWLEDGE_PATH))
+
+# BM25 parameters and per-field term weights (keywords count the most)
+BM25_K1 = 1.5
+BM25_B = 0.75
+FIELD_WEIGHTS = {"keywords": 3, "question": 2, "answer": 1}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "in", "is", "it", "of", "on", "or", "the", "this", "to",
+    "what", "whats", "when", "where", "which", "with", "you", "your",
+})
+
+
+def tokenize(text: str) -> list:
+    """Lowercase and split text into index terms, dropping stopwords."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+class KnowledgeIndex:
+    """Inverted index over knowledge entries scored with BM25."""
+
+    def __init__(self, knowledge: Mapping):
+        self.ids = list(knowledge)
+        self.postings = defaultdict(list)  # term -> [(doc_index, term_frequency)]
+        self.doc_lengths = []
+
+        for doc_index, key in enumerate(self.ids):
+            item = knowledge[key]
+            terms = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                value = item[field]
+                text = " ".join(value) if isinstance(value, list) else value
+                for token in tokenize(text):
+                    terms[token] += weight
+            for term, frequency in terms.items():
+                self.postings[term].append((doc_index, frequency))
+            self.doc_lengths.append(sum(terms.values()))
+
+        doc_count = len(self.ids)
+        self.avg_doc_length = sum(self.doc_lengths) / doc_count if doc_count else 0.0
+        self.idf = {
+            term: math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
         }
-        
-        return await self.send_message(message)
-```""",
-        "keywords": ["client", "example", "python", "initialize", "call tool"]
-    },
-    
-    "authentication": {
-        "question": "How does authentication work in MCP?",
-        "answer": "MCP supports various authentication mechanisms including API keys, OAuth tokens, and certificate-based authentication. Authorization is handled at the server level, with fine-grained control over which tools and resources each client can access. The protocol includes built-in security features like request signing, token validation, and access control lists.",
-        "keywords": ["authentication", "authorization", "security", "api keys", "oauth"]
-    },
-    
-    "protocol_specs": {
-        "question": "What are the MCP protocol specifications?",
-        "answer": "MCP follows a JSON-RPC 2.0 based protocol with specific message formats for initialization, tool calls, resource requests, and error handling. The protocol supports bidirectional communication, streaming responses, and structured error reporting. Key specifications include the initialization handshake, tool invocation patterns, resource access methods, and error handling conventions.",
-        "keywords": ["protocol", "json-rpc", "specifications", "message format", "bidirectional"]
-    },
-    
-    "common_errors": {
-        "question": "What are common MCP errors and how to fix them?",
-        "answer": """Common MCP errors include:
-
-1. **Connection Errors**: Check server URL and network connectivity
-2. **Authentication Failures**: Verify API keys and credentials
-3. **Tool Not Found**: Ensure tool is registered and name is correct
-4. **Invalid Parameters**: Check parameter types and required fields
-5. **Permission Denied**: Verify authorization settings
-6. **Protocol Version Mismatch**: Ensure client and server use compatible versions
-
-Debug by checking logs, validating message formats, and testing with simple tools first.""",
-        "keywords": ["errors", "troubleshooting", "debug", "connection", "authentication"]
-    },
-    
-    "best_practices": {
-        "question": "What are MCP best practices?",
-        "answer": """MCP best practices include:
-
-1. **Security**: Use proper authentication, validate inputs, implement rate limiting
-2. **Error Handling**: Provide clear error messages and graceful degradation
-3. **Performance**: Use caching, optimize tool execution, handle timeouts
-4. **Documentation**: Document tools and resources clearly
-5. **Testing**: Test tools thoroughly, validate schemas, handle edge cases
-6. **Monitoring**: Log activities, monitor performance, track usage
-
-Follow these practices to build robust and secure MCP servers.""",
-        "keywords": ["best practices", "security", "performance", "documentation", "testing"]
-    }
-}
-
-def search_knowledge(query: str) -> list:
-    """Simple keyword-based search through the knowledge base."""
-    query_lower = query.lower()
+
+    def term_scores(self, term: str) -> list:
+        """BM25 contribution of one term to every document that contains it."""
+        docs = self.postings.get(term)
+        if not docs:
+            return []
+        idf = self.idf[term]
+        contributions = []
+        for doc_index, frequency in docs:
+            norm = 1 - BM25_B + BM25_B * self.doc_lengths[doc_index] / self.avg_doc_length
+            contributions.append((doc_index, idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)))
+        return contributions
+
+    def score(self, query_terms: list, term_cache: dict = None) -> dict:
+        """Return BM25 scores by document index for the given query terms.
+
+        ``term_cache`` lets several queries share per-term posting work.
+        """
+        if term_cache is None:
+            term_cache = {}
+        scores = defaultdict(float)
+        for term in set(query_terms):
+            if term not in term_cache:
+                term_cache[term] = self.term_scores(term)
+            for doc_index, contribution in term_cache[term]:
+                scores[doc_index] += contribution
+        return scores
+
+    def _rank(self, scores: dict, limit: int) -> list:
+        ranked = sorted(scores.items(), key=lambda pair: pair[1], reverse=True)[:limit]
+        return [(self.ids[doc_index], score) for doc_index, score in ranked]
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """Return the top ``(id, score)`` pairs for a query, best first."""
+        return self._rank(self.score(tokenize(query)), limit)
+
+    def search_batch(self, queries: list, limit: int = 5) -> list:
+        """Rank several queries in one pass, scoring each distinct term once."""
+        term_cache = {}
+        ranked_by_terms = {}
+        results = []
+        for query in queries:
+            terms = tuple(sorted(set(tokenize(query))))
+            if terms not in ranked_by_terms:
+                ranked_by_terms[terms] = self._rank(self.score(terms, term_cache), limit)
+            results.append(ranked_by_terms[terms])
+        return results
+
+
+# Built at import time and rebuilt whenever the knowledge file changes
+_index = KnowledgeIndex(MCP_KNOWLEDGE)
+
+
+def rebuild_index() -> None:
+    """Rebuild the search index from the current MCP_KNOWLEDGE contents."""
+    global _index
+    _index = KnowledgeIndex(MCP_KNOWLEDGE)
+
+
+def reload_knowledge(force: bool = False) -> bool:
+    """Pick up changes to the knowledge file and rebuild the index.
+
+    Without ``force`` the file is checked at most every
+    KNOWLEDGE_RELOAD_INTERVAL seconds. Returns True if anything changed.
+    """
+    changed = MCP_KNOWLEDGE.reload() if force else MCP_KNOWLEDGE.reload_if_changed()
+    if changed:
+        rebuild_index()
+    return changed
+
+
+def search_knowledge(query: str, limit: int = 5) -> list:
+    """Ranked BM25 search through the knowledge base."""
+    reload_knowledge()
     results = []
-    
-    for key, item in MCP_KNOWLEDGE.items():
-        # Check if query matches keywords or appears in question/answer
-        keywords_match = any(keyword in query_lower for keyword in item["keywords"])
-        question_match = query_lower in item["question"].lower()
-        answer_match = query_lower in item["answer"].lower()
-        
-        if keywords_match or question_match or answer_match:
-            results.append({
+    for key, score in _index.search(query, limit):
+        item = MCP_KNOWLEDGE.get(key)
+        if item is None:  # removed by a concurrent reload
+            continue
+        results.append({
+            "id": key,
+            "question": item["question"],
+            "answer": item["answer"],
+            "relevance": round(score, 3)
+        })
+    return results
+
+def search_knowledge_batch(queries: list, limit: int = 5) -> list:
+    """Ranked BM25 search for several queries; returns one result list per query."""
+    reload_knowledge()
+    ranked = _index.search_batch(queries, limit)
+
+    # Read every matched entry from the store once, however many queries hit it
+    entries = {}
+    for key in {key for matches in ranked for key, _ in matches}:
+        entries[key] = MCP_KNOWLEDGE.get(key)
+
+    results = []
+    for matches in ranked:
+        results.append([
+            {
                 "id": key,
-                "question": item["question"],
-                "answer": item["answer"],
-                "relevance": 1.0 if keywords_match else 0.5
-            })
-    
-    # Sort by relevance
-    results.sort(key=lambda x: x["relevance"], reverse=True)
-    return results[:5]  # Return top 5 results
+                "question": entries[key]["question"],
+                "answer": entries[key]["answer"],
+                "relevance": round(score, 3)
+            }
+            for key, score in matches
+            if entries[key] is not None  # removed by a concurrent reload
+        ])
+    return results
+
 
 def get_all_topics() -> list:
     """Get all available topics in the knowledge base."""
-    return [{"id": key, "question": item["question"]} for key, item in MCP_KNOWLEDGE.items()] 
\ No newline at end of file
+    reload_knowledge()
+    return [{"id": key, "question": question} for key, question in MCP_KNOWLEDGE.questions().items()] 
\ No newline at end of file
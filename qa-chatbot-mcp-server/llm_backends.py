@@ -0,0 +1,146 @@
+"""
+LLM backends for the chatbot.
+The OpenAI backend is used in production; the fake backend simulates latency,
+token rate and failures locally so the API can be benchmarked offline.
+"""
+
+import asyncio
+import os
+import random
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional
+
+import openai
+
+
+class LLMBackend(ABC):
+    """Interface every chat completion backend implements."""
+
+    name = "base"
+
+    @property
+    def params(self) -> dict:
+        """Parameters that affect the answer (used in the response cache key)."""
+        return {"backend": self.name}
+
+    async def complete(self, messages: List[Dict[str, str]]) -> str:
+        """Return the full answer for a conversation."""
+        chunks = [chunk async for chunk in self.stream(messages)]
+        return "".join(chunks)
+
+    @abstractmethod
+    def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Yield the answer as text chunks while it is generated."""
+
+
+class OpenAIBackend(LLMBackend):
+    """Chat completions through the async OpenAI client."""
+
+    name = "openai"
+
+    def __init__(self, model: str = "gpt-4o-mini", max_tokens: int = 1000, temperature: float = 0.7):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._client: Optional[openai.AsyncOpenAI] = None
+
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        # Created on first use so the app imports without an API key
+        if self._client is None:
+            self._client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    @property
+    def params(self) -> dict:
+        return {
+            "backend": self.name,
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+
+    async def complete(self, messages: List[Dict[str, str]]) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+        return response.choices[0].message.content
+
+    async def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+class FakeLLMError(RuntimeError):
+    """Failure injected by the fake backend."""
+
+
+class FakeBackend(LLMBackend):
+    """Local stand-in with configurable latency, token rate and failure rate."""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        tokens_per_second: float = 50.0,
+        failure_rate: float = 0.0,
+        answer_tokens: int = 60,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self.answer_tokens = answer_tokens
+        self._random = random.Random(seed)
+
+    @property
+    def params(self) -> dict:
+        return {"backend": self.name, "answer_tokens": self.answer_tokens}
+
+    async def stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        # Time to first token
+        await asyncio.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise FakeLLMError("Injected fake LLM failure")
+
+        question = messages[-1]["content"].rsplit("User question:", 1)[-1].strip()
+        words = f"This is a simulated answer to: {question}".split()
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for i in range(self.answer_tokens):
+            yield ("" if i == 0 else " ") + words[i % len(words)]
+            if delay:
+                await asyncio.sleep(delay)
+
+
+def get_backend(name: Optional[str] = None) -> LLMBackend:
+    """Create the backend selected by LLM_BACKEND (``openai`` or ``fake``)."""
+    name = name or os.getenv("LLM_BACKEND", "openai")
+    if name == "fake":
+        return FakeBackend(
+            latency=float(os.getenv("FAKE_LLM_LATENCY", "0.2")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKEN_RATE", "50")),
+            failure_rate=float(os.getenv("FAKE_LLM_FAILURE_RATE", "0")),
+            answer_tokens=int(os.getenv("FAKE_LLM_ANSWER_TOKENS", "60"))
+        )
+    if name == "openai":
+        return OpenAIBackend(
+            model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+            max_tokens=int(os.getenv("LLM_MAX_TOKENS", "1000")),
+            temperature=float(os.getenv("LLM_TEMPERATURE", "0.7"))
+        )
+    raise ValueError(f"Unknown LLM backend: {name}")
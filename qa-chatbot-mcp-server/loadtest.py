@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Load-test harness for the chat API.
+Fires /chat (or /chat/stream) requests at a fixed target QPS and reports
+latency percentiles, time to first token and throughput.
+
+Run the API with LLM_BACKEND=fake to benchmark without network or cost:
+
+    LLM_BACKEND=fake uv run python main.py api
+    uv run python loadtest.py --qps 20 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List, Optional
+
+import httpx
+
+DEFAULT_QUESTIONS = [
+    "What is Model Context Protocol?",
+    "How do I create an MCP server in Python?",
+    "What are the core components of MCP?",
+    "How does MCP differ from REST APIs?",
+    "What are common MCP errors and solutions?",
+    "What are MCP best practices?"
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+async def send_chat(client: httpx.AsyncClient, message: str, stream: bool) -> dict:
+    """Send one chat request and time it."""
+    start = time.perf_counter()
+    first_token: Optional[float] = None
+    try:
+        if stream:
+            async with client.stream("POST", "/chat/stream", json={"message": message}) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    event = json.loads(line[len("data: "):])
+                    if event["type"] == "token" and first_token is None:
+                        first_token = time.perf_counter() - start
+                    elif event["type"] == "error":
+                        raise RuntimeError(event["detail"])
+        else:
+            response = await client.post("/chat", json={"message": message})
+            response.raise_for_status()
+        ok = True
+    except (httpx.HTTPError, RuntimeError):
+        ok = False
+    return {"ok": ok, "latency": time.perf_counter() - start, "ttft": first_token}
+
+
+async def run_load_test(
+    base_url: str,
+    qps: float,
+    duration: float,
+    stream: bool = False,
+    unique: bool = False,
+    timeout: float = 60.0
+) -> dict:
+    """Drive the API at a constant arrival rate and collect per-request results."""
+    total = int(qps * duration)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            # Open-loop schedule: requests go out on time even if earlier ones are slow
+            delay = start + i / qps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            message = DEFAULT_QUESTIONS[i % len(DEFAULT_QUESTIONS)]
+            if unique:
+                message = f"{message} (request {i})"
+            tasks.append(asyncio.create_task(send_chat(client, message, stream)))
+        results = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    latencies = [r["latency"] for r in results if r["ok"]]
+    ttfts = [r["ttft"] for r in results if r["ok"] and r["ttft"] is not None]
+    report = {
+        "requests": total,
+        "succeeded": len(latencies),
+        "failed": total - len(latencies),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            f"p{pct}": round(percentile(latencies, pct) * 1000, 1) for pct in (50, 95, 99)
+        }
+    }
+    if ttfts:
+        report["ttft_ms"] = {
+            f"p{pct}": round(percentile(ttfts, pct) * 1000, 1) for pct in (50, 95, 99)
+        }
+    return report
+
+
+def main():
+    """Parse arguments, run the load test and print the report."""
+    parser = argparse.ArgumentParser(description="Load test the MCP Q&A Chatbot API")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--qps", type=float, default=10.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test duration in seconds")
+    parser.add_argument("--stream", action="store_true", help="Use /chat/stream and measure time to first token")
+    parser.add_argument("--unique", action="store_true", help="Make every message unique to bypass the response cache")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+
+    print(f"🚦 {args.qps} QPS for {args.duration}s against {args.url}")
+    report = asyncio.run(run_load_test(
+        args.url, args.qps, args.duration, args.stream, args.unique, args.timeout
+    ))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
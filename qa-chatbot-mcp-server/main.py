@@ -20,7 +20,8 @@ except ImportError:
 
 def check_environment():
     """Check if environment is properly configured."""
-    required_vars = ["OPENAI_API_KEY"]
+    # The fake LLM backend runs offline and needs no API key
+    required_vars = [] if os.getenv("LLM_BACKEND") == "fake" else ["OPENAI_API_KEY"]
     missing_vars = []
     
     for var in required_vars:
@@ -65,6 +66,13 @@ def run_frontend():
         print("❌ streamlit not installed. Running with uv run")
         subprocess.run(["uv", "run", "python", "-m", "streamlit", "run", "streamlit_app.py"])
 
+def build_embeddings():
+    """Precompute knowledge base embeddings for dense retrieval."""
+    print("🧮 Building knowledge base embeddings...")
+    from embeddings import build_embeddings as build
+    index = build()
+    print(f"✅ Embedded {len(index.ids)} entries with {index.embedder.name}")
+
 def install_dependencies():
     """Install required dependencies."""
     print("📦 Installing dependencies...")
@@ -73,7 +81,7 @@ def install_dependencies():
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="MCP Q&A Chatbot")
-    parser.add_argument("command", choices=["api", "frontend", "install"], 
+    parser.add_argument("command", choices=["api", "frontend", "install", "embed"], 
                        help="Command to run")
     parser.add_argument("--check-env", action="store_true", 
                        help="Check environment configuration")
@@ -83,7 +91,7 @@ def main():
     print("🤖 MCP Q&A Chatbot")
     print("=" * 40)
     
-    if args.check_env or args.command != "install":
+    if args.check_env or args.command not in ("install", "embed"):
         if not check_environment():
             print("\n💡 To set up your environment:")
             print("1. Create a .env file in the project root")
@@ -97,6 +105,8 @@ def main():
         run_api_server()
     elif args.command == "frontend":
         run_frontend()
+    elif args.command == "embed":
+        build_embeddings()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,166 @@
+"""
+Response cache for chat completions.
+Answers are keyed on a hash of the normalized question, the retrieved
+knowledge ids and the knowledge file version, the trimmed history and the
+model parameters, with LRU + TTL
+eviction in memory or in an on-disk SQLite file that survives restarts.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so trivial variations share a key."""
+    return " ".join(text.lower().split())
+
+
+def make_cache_key(
+    message: str,
+    source_ids: List[str],
+    history: List[Dict[str, str]],
+    params: Dict,
+    knowledge_version: str = "",
+) -> str:
+    """Stable hash of everything that determines the model's answer."""
+    payload = {
+        "message": normalize_text(message),
+        "sources": list(source_ids),
+        "knowledge": knowledge_version,
+        "history": [
+            {"role": msg.get("role", ""), "content": normalize_text(msg.get("content", ""))}
+            for msg in history
+        ],
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def make_context_key(
+    source_ids: List[str],
+    history: List[Dict[str, str]],
+    params: Dict,
+    knowledge_version: str = "",
+) -> str:
+    """Hash of the retrieved context, history and params, ignoring the question."""
+    return make_cache_key("", source_ids, history, params, knowledge_version)
+
+
+class MemoryBackend:
+    """In-process LRU store; entries are (stored_at, value)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, stored_at: float, value: dict) -> None:
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """On-disk LRU store so cached answers survive restarts."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_cache_last_access "
+            "ON response_cache (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[tuple]:
+        row = self._conn.execute(
+            "SELECT stored_at, value FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn.execute(
+            "UPDATE response_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+        )
+        self._conn.commit()
+        return row[0], json.loads(row[1])
+
+    def set(self, key: str, stored_at: float, value: dict) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO response_cache (key, value, stored_at, last_access) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), stored_at, stored_at),
+        )
+        self._conn.execute(
+            "DELETE FROM response_cache WHERE key IN ("
+            "SELECT key FROM response_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """LRU + TTL cache with hit/miss counters."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600, path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.backend = SQLiteBackend(path, max_entries) if path else MemoryBackend(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.backend.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl_seconds:
+                self.backend.delete(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: dict) -> None:
+        with self._lock:
+            self.backend.set(key, time.time(), value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "sqlite" if isinstance(self.backend, SQLiteBackend) else "memory",
+                "entries": len(self.backend),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
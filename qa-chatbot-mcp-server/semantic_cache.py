@@ -0,0 +1,106 @@
+"""
+Semantic cache for near-duplicate chat questions.
+Normalized question embeddings are kept in one NumPy matrix; a new question
+reuses a stored answer when it is similar enough, was answered from the
+same retrieved context and is younger than the TTL.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """Bounded cosine-similarity cache with LRU + TTL eviction and per-entry hits."""
+
+    def __init__(self, embedder, max_entries: int = 500, threshold: float = 0.92, ttl_seconds: float = 3600):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._vectors: Optional[np.ndarray] = None  # allocated on first store
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._entries = [None] * max_entries
+        self._size = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def _embed(self, question: str) -> np.ndarray:
+        return self.embedder.embed([question])[0].astype(np.float32)
+
+    def get(self, question: str, context_key: str) -> Optional[dict]:
+        """Return the answer of the most similar cached question with the same context."""
+        vector = self._embed(question)
+        now = time.time()
+        with self._lock:
+            self._clock += 1
+            if self._size:
+                similarities = self._vectors[:self._size] @ vector
+                candidates = np.flatnonzero(similarities >= self.threshold)
+                for slot in candidates[np.argsort(-similarities[candidates])]:
+                    entry = self._entries[slot]
+                    if now - entry["created_at"] > self.ttl_seconds:
+                        self._last_used[slot] = 0  # expired: first to be evicted
+                        continue
+                    if entry["context_key"] != context_key:
+                        continue
+                    entry["hits"] += 1
+                    entry["last_hit"] = now
+                    self._last_used[slot] = self._clock
+                    self.hits += 1
+                    return {"response": entry["response"], "similarity": float(similarities[slot])}
+            self.misses += 1
+            return None
+
+    def set(self, question: str, context_key: str, response: str) -> None:
+        """Store an answer, evicting the least recently used entry when full."""
+        vector = self._embed(question)
+        with self._lock:
+            self._clock += 1
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+            self._vectors[slot] = vector
+            self._last_used[slot] = self._clock
+            self._entries[slot] = {
+                "question": question,
+                "context_key": context_key,
+                "response": response,
+                "hits": 0,
+                "created_at": time.time(),
+                "last_hit": None
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._size,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def entry_stats(self, limit: int = 20) -> list:
+        """Cached questions with their hit counts, most hit first."""
+        with self._lock:
+            entries = [self._entries[slot] for slot in range(self._size)]
+        entries.sort(key=lambda entry: entry["hits"], reverse=True)
+        return [
+            {
+                "question": entry["question"],
+                "hits": entry["hits"],
+                "created_at": entry["created_at"],
+                "last_hit": entry["last_hit"]
+            }
+            for entry in entries[:limit]
+        ]
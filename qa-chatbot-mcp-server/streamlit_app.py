@@ -5,10 +5,20 @@ Simple Streamlit Frontend for MCP Q&A Chatbot
 import streamlit as st
 import requests
 import json
+import os
 from typing import List, Dict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configuration
-API_BASE_URL = "http://localhost:8000"
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "60"))
+API_RETRIES = int(os.getenv("API_RETRIES", "3"))
+API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.5"))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+TOPICS_CACHE_TTL = int(os.getenv("TOPICS_CACHE_TTL", "600"))
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "300"))
 
 # Page configuration
 st.set_page_config(
@@ -51,30 +61,125 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def call_api(endpoint: str, method: str = "GET", data: dict = None):
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Shared keep-alive session with a connection pool and retries with backoff."""
+    retry = Retry(
+        total=API_RETRIES,
+        backoff_factor=API_RETRY_BACKOFF,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=["GET"]  # Never replay chat requests
+    )
+    adapter = HTTPAdapter(pool_connections=API_POOL_SIZE, pool_maxsize=API_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def request_json(endpoint: str, method: str = "GET", data: dict = None, params: dict = None):
+    """Call the FastAPI backend and return the JSON body, raising on errors."""
+    if method not in ("GET", "POST"):
+        raise ValueError(f"Unsupported method: {method}")
+    
+    response = get_http_session().request(
+        method,
+        f"{API_BASE_URL}/{endpoint}",
+        json=data,
+        params=params,
+        timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+    )
+    response.raise_for_status()
+    return response.json()
+
+def call_api(endpoint: str, method: str = "GET", data: dict = None, params: dict = None):
     """Call the FastAPI backend."""
     try:
-        url = f"{API_BASE_URL}/{endpoint}"
-        
-        if method == "GET":
-            response = requests.get(url)
-        elif method == "POST":
-            response = requests.post(url, json=data)
-        else:
-            raise ValueError(f"Unsupported method: {method}")
-        
-        response.raise_for_status()
-        return response.json()
+        return request_json(endpoint, method, data, params)
+    except requests.exceptions.RequestException as e:
+        st.error(f"API Error: {str(e)}")
+        return None
+
+@st.cache_data(ttl=TOPICS_CACHE_TTL, show_spinner=False)
+def fetch_topics():
+    """Topic list, cached across reruns (errors are raised, not cached)."""
+    return request_json("knowledge/topics")
+
+@st.cache_data(ttl=SEARCH_CACHE_TTL, show_spinner=False)
+def fetch_search_results(query: str):
+    """Knowledge search results, cached per query across reruns."""
+    return request_json("knowledge/search", params={"query": query})
+
+def cached_call(fetch, *args):
+    """Run a cached fetch and report API errors like call_api."""
+    try:
+        return fetch(*args)
     except requests.exceptions.RequestException as e:
         st.error(f"API Error: {str(e)}")
         return None
 
-def display_message(message: str, is_user: bool = True):
+def stream_chat(data: dict):
+    """Call the streaming chat endpoint and yield parsed server-sent events."""
+    try:
+        url = f"{API_BASE_URL}/chat/stream"
+        with get_http_session().post(
+            url,
+            json=data,
+            stream=True,
+            timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data: "):
+                    yield json.loads(line[len("data: "):])
+    except requests.exceptions.RequestException as e:
+        yield {"type": "error", "detail": f"API Error: {str(e)}"}
+
+def ask_question(question: str):
+    """Send a question, render the answer as it streams in and store it in history."""
+    st.session_state.messages.append({
+        'role': 'user',
+        'content': question
+    })
+    
+    # Prepare chat request
+    chat_data = {
+        'message': question,
+        'history': [
+            {'role': msg['role'], 'content': msg['content']} 
+            for msg in st.session_state.messages[-6:]  # Last 6 messages
+        ]
+    }
+    
+    # Render tokens incrementally as they arrive
+    placeholder = st.empty()
+    placeholder.markdown("🤔 Thinking...")
+    answer = ""
+    sources = []
+    
+    for event in stream_chat(chat_data):
+        if event["type"] == "sources":
+            sources = event["sources"]
+        elif event["type"] == "token":
+            answer += event["content"]
+            display_message(answer + " ▌", is_user=False, container=placeholder)
+        elif event["type"] == "error":
+            st.error(event["detail"])
+            return False
+    
+    # Add bot response to history
+    st.session_state.messages.append({
+        'role': 'assistant',
+        'content': answer,
+        'sources': sources
+    })
+    return True
+
+def display_message(message: str, is_user: bool = True, container=None):
     """Display a chat message."""
     css_class = "user-message" if is_user else "bot-message"
     role = "You" if is_user else "MCP Assistant"
     
-    st.markdown(f"""
+    (container or st).markdown(f"""
     <div class="chat-message {css_class}">
         <strong>{role}:</strong><br>
         {message}
@@ -106,7 +211,7 @@ def main():
         
         # Show available topics
         if st.button("🔍 Show All Topics"):
-            topics_data = call_api("knowledge/topics")
+            topics_data = cached_call(fetch_topics)
             if topics_data:
                 st.markdown("**Available Topics:**")
                 for topic in topics_data.get("topics", []):
@@ -119,7 +224,7 @@ def main():
         search_query = st.text_input("Search for specific topics:", placeholder="e.g., authentication, server, tools")
         
         if search_query:
-            search_results = call_api(f"knowledge/search?query={search_query}")
+            search_results = cached_call(fetch_search_results, search_query)
             if search_results:
                 st.markdown("**Search Results:**")
                 for result in search_results:
@@ -165,33 +270,7 @@ def main():
     with col1:
         if st.button("🚀 Send", type="primary"):
             if user_input.strip():
-                # Add user message to history
-                st.session_state.messages.append({
-                    'role': 'user',
-                    'content': user_input
-                })
-                
-                # Prepare chat request
-                chat_data = {
-                    'message': user_input,
-                    'history': [
-                        {'role': msg['role'], 'content': msg['content']} 
-                        for msg in st.session_state.messages[-6:]  # Last 6 messages
-                    ]
-                }
-                
-                # Call chat API
-                with st.spinner("🤔 Thinking..."):
-                    response = call_api("chat", method="POST", data=chat_data)
-                
-                if response:
-                    # Add bot response to history
-                    st.session_state.messages.append({
-                        'role': 'assistant',
-                        'content': response['response'],
-                        'sources': response.get('sources', [])
-                    })
-                    
+                if ask_question(user_input):
                     # Rerun to update display
                     st.rerun()
                 else:
@@ -219,32 +298,7 @@ def main():
     for i, question in enumerate(example_questions):
         with cols[i % 2]:
             if st.button(f"💬 {question}", key=f"example_{i}"):
-                st.session_state.messages.append({
-                    'role': 'user',
-                    'content': question
-                })
-                
-                # Prepare chat request
-                chat_data = {
-                    'message': question,
-                    'history': [
-                        {'role': msg['role'], 'content': msg['content']} 
-                        for msg in st.session_state.messages[-6:]
-                    ]
-                }
-                
-                # Call chat API
-                with st.spinner("🤔 Thinking..."):
-                    response = call_api("chat", method="POST", data=chat_data)
-                
-                if response:
-                    # Add bot response to history
-                    st.session_state.messages.append({
-                        'role': 'assistant',
-                        'content': response['response'],
-                        'sources': response.get('sources', [])
-                    })
-                    
+                if ask_question(question):
                     # Rerun to update display
                     st.rerun()
     